@@ -0,0 +1,25 @@
+import os
+from decouple import config
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = config('WEB_CONCURRENCY', default=2, cast=int)
+timeout = 120
+
+# ASGI profile: each uvicorn worker runs an event loop, so slow storage
+# calls and open notification streams no longer pin a whole worker.
+if config('ASGI_MODE', default=False, cast=bool):
+    wsgi_app = 'socialconnect.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'socialconnect.wsgi:application'
+
+# Load the app once in the master and fork workers from it; warm_up()
+# imports the rest of the app and freezes the GC so the workers share
+# that memory copy-on-write and boot without importing anything.
+preload_app = config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+
+def when_ready(server):
+    if preload_app:
+        from utils.startup import warm_up
+        warm_up()
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import time
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .models import Notification
+from utils.async_views import AsyncAPIView
+
+class AsyncNotificationSSEView(AsyncAPIView):
+    poll_interval = 1
+    heartbeat_interval = 5
+    
+    async def get(self, request):
+        user = request.user
+        
+        async def event_stream():
+            yield f"data: {json.dumps({'type': 'connection', 'message': 'Connected to notification stream'})}\n\n"
+            
+            last_heartbeat_time = time.monotonic()
+            
+            while True:
+                try:
+                    new_notifications = Notification.objects.filter(
+                        recipient=user,
+                        created_at__gt=timezone.now() - timezone.timedelta(seconds=2)
+                    ).select_related('sender', 'post')[:5]
+                    
+                    async for notification in new_notifications:
+                        notification_data = {
+                            'type': 'new_notification',
+                            'notification': {
+                                'id': str(notification.id),
+                                'sender': {
+                                    'username': notification.sender.username,
+                                    'first_name': notification.sender.first_name,
+                                    'last_name': notification.sender.last_name,
+                                },
+                                'notification_type': notification.notification_type,
+                                'message': notification.message,
+                                'is_read': notification.is_read,
+                                'created_at': notification.created_at.isoformat(),
+                                'post': {
+                                    'id': str(notification.post.id)
+                                } if notification.post else None,
+                            }
+                        }
+                        yield f"data: {json.dumps(notification_data)}\n\n"
+                    
+                    if time.monotonic() - last_heartbeat_time >= self.heartbeat_interval:
+                        unread_count = await Notification.objects.filter(
+                            recipient=user,
+                            is_read=False
+                        ).acount()
+                        
+                        yield f"data: {json.dumps({'type': 'heartbeat', 'unread_count': unread_count})}\n\n"
+                        last_heartbeat_time = time.monotonic()
+                    
+                    await asyncio.sleep(self.poll_interval)
+                    
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                    break
+        
+        response = StreamingHttpResponse(
+            event_stream(),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['Access-Control-Allow-Origin'] = '*'
+        response['Access-Control-Allow-Headers'] = 'Cache-Control'
+        
+        return response
@@ -0,0 +1,27 @@
+from users.read_serializers import user_basic_card, user_basic_values
+from utils.read_serializers import datetime_formatter, format_uuid
+
+# Compiled, read-only equivalent of NotificationSerializer. See
+# users.read_serializers.
+
+
+def serialize_notifications(queryset):
+    """Same output as NotificationSerializer(queryset, many=True).data."""
+    rows = queryset.values(
+        'id', 'notification_type', 'post_id', 'message', 'is_read', 'created_at',
+        *user_basic_values('recipient__'), *user_basic_values('sender__')
+    )
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': format_uuid(row['id']),
+            'recipient': user_basic_card(row, 'recipient__'),
+            'sender': user_basic_card(row, 'sender__'),
+            'notification_type': row['notification_type'],
+            'post': row['post_id'],
+            'message': row['message'],
+            'is_read': row['is_read'],
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in rows
+    ]
@@ -3,7 +3,10 @@ from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from .models import Notification
 from posts.models import Post, Like, Comment
+from posts.signals import like_changed
 from users.models import Follow
+from users.signals import follow_changed
+from utils.versions import bump
 
 User = get_user_model()
 
@@ -30,6 +33,27 @@ def create_like_notification(sender, instance, created, **kwargs):
             message=message
         )
 
+@receiver(follow_changed)
+def create_follow_changed_notification(sender, follower, following_id, created, **kwargs):
+    if created:
+        Notification.objects.create(
+            recipient_id=following_id,
+            sender=follower,
+            notification_type='follow',
+            message=f"{follower.username} started following you"
+        )
+
+@receiver(like_changed)
+def create_like_changed_notification(sender, user, post_id, author_id, created, **kwargs):
+    if created and user.id != author_id:
+        Notification.objects.create(
+            recipient_id=author_id,
+            sender=user,
+            notification_type='like',
+            post_id=post_id,
+            message=f"{user.username} liked your post"
+        )
+
 @receiver(post_save, sender=Comment)
 def create_comment_notification(sender, instance, created, **kwargs):
     if created and instance.author != instance.post.author:
@@ -51,3 +75,9 @@ def update_post_like_count_on_delete(sender, instance, **kwargs):
 @receiver(post_delete, sender=Comment)
 def update_post_comment_count_on_delete(sender, instance, **kwargs):
     instance.post.update_counts()
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def bump_notification_version(sender, instance, **kwargs):
+    bump('notifications', instance.recipient_id)
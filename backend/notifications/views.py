@@ -4,6 +4,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
 from .models import Notification
 from .serializers import NotificationSerializer
+from .read_serializers import serialize_notifications
+from utils.http_cache import ConditionalGetMixin
+from utils.versions import bump, version_key
 
 from django.http import StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -15,6 +18,7 @@ import time
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 6
     
     def get_queryset(self):
         return Notification.objects.filter(
@@ -28,9 +32,9 @@ class NotificationListView(generics.ListAPIView):
         unread_count = unread_notifications.count()
         if unread_notifications.exists():
             unread_notifications.update(is_read=True)
+            bump('notifications', request.user.id)
         
-        serializer = self.get_serializer(notifications, many=True)
-        response = Response(serializer.data)
+        response = Response(serialize_notifications(notifications))
         
         response['X-Unread-Count'] = str(unread_count)
         
@@ -59,11 +63,15 @@ class MarkAllNotificationsReadView(generics.GenericAPIView):
             recipient=request.user,
             is_read=False
         ).update(is_read=True)
+        bump('notifications', request.user.id)
         return Response({'status': 'all notifications marked as read'})
 
-class UnreadNotificationCountView(generics.GenericAPIView):
+class UnreadNotificationCountView(ConditionalGetMixin, generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
+    def get_version_keys(self, request):
+        return [version_key('notifications', request.user.id)]
+    
     def get(self, request):
         unread_count = Notification.objects.filter(
             recipient=request.user,
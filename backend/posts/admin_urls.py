@@ -5,11 +5,14 @@ app_name = 'admin'
 
 urlpatterns = [
     path('', admin_views.AdminPostListView.as_view(), name='post-list'),
+    path('export/', admin_views.AdminPostExportView.as_view(), name='post-export'),
     path('<uuid:pk>/', admin_views.AdminPostDetailView.as_view(), name='post-detail'),
     path('<uuid:pk>/delete/', admin_views.AdminPostDeleteView.as_view(), name='post-delete'),
     path('bulk-delete/', admin_views.AdminPostBulkDeleteView.as_view(), name='post-bulk-delete'),
+    path('bulk-deactivate/', admin_views.AdminPostBulkDeactivateView.as_view(), name='post-bulk-deactivate'),
     
     path('comments/', admin_views.AdminCommentListView.as_view(), name='comment-list'),
+    path('comments/export/', admin_views.AdminCommentExportView.as_view(), name='comment-export'),
     path('comments/<uuid:pk>/delete/', admin_views.AdminCommentDeleteView.as_view(), name='comment-delete'),
     
     path('content-stats/', admin_views.AdminContentStatsView.as_view(), name='content-stats'),
@@ -1,17 +1,22 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
+from django.conf import settings
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
 from .models import Post, Comment, Like
+from .moderation import soft_delete_posts, soft_delete_comments, deactivate_posts
 from .serializers import PostSerializer, CommentSerializer, AdminCommentSerializer
 from users.permissions import IsAdminRole
+from utils.bulk import clean_ids
+from utils.exports import ExportMixin
 
 class AdminPostListView(generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAdminRole]
-    queryset = Post.objects.all().order_by('-created_at')
+    queryset = Post.objects.filter(deleted_at__isnull=True).order_by('-created_at')
+    read_replica = True
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -34,65 +39,82 @@ class AdminPostListView(generics.ListAPIView):
         
         return queryset
 
+class AdminPostExportView(ExportMixin, AdminPostListView):
+    export_filename = 'posts'
+    export_columns = [
+        ('id', 'id'),
+        ('author_id', 'author_id'),
+        ('author_username', 'author__username'),
+        ('content', 'content'),
+        ('image_url', 'image_url'),
+        ('category', 'category'),
+        ('is_active', 'is_active'),
+        ('like_count', 'like_count'),
+        ('comment_count', 'comment_count'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+
 class AdminPostDetailView(generics.RetrieveAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAdminRole]
-    queryset = Post.objects.all()
+    queryset = Post.objects.filter(deleted_at__isnull=True)
 
 class AdminPostDeleteView(generics.DestroyAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAdminRole]
-    queryset = Post.objects.all()
+    queryset = Post.objects.filter(deleted_at__isnull=True)
     
     def destroy(self, request, *args, **kwargs):
         post = self.get_object()
         post_title = post.content[:50] + "..." if len(post.content) > 50 else post.content
-        
-        if post.image_url:
-            try:
-                from utils.supabase_storage import get_supabase_storage
-                supabase_storage = get_supabase_storage()
-                
-                url_parts = post.image_url.split('/')
-                if len(url_parts) >= 2:
-                    file_path = f"{url_parts[-2]}/{url_parts[-1]}"
-                    supabase_storage.delete_image(file_path)
-            except Exception as e:
-                print(f"Warning: Could not delete image from Supabase: {str(e)}")
-        
-        post.delete()
+        soft_delete_posts([post.id])
         return Response({'status': f'post "{post_title}" deleted'})
 
-class AdminPostBulkDeleteView(generics.GenericAPIView):
+class AdminPostBulkView(generics.GenericAPIView):
     permission_classes = [IsAdminRole]
     
-    def post(self, request):
+    def get_post_ids(self, request):
         post_ids = request.data.get('post_ids', [])
-        
         if not post_ids:
-            return Response(
-                {'error': 'No post IDs provided'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        deleted_count = 0
-        for post_id in post_ids:
-            try:
-                post = Post.objects.get(id=post_id)
-                post.delete()
-                deleted_count += 1
-            except Post.DoesNotExist:
-                continue
+            raise ValueError('No post IDs provided')
+        return clean_ids(post_ids, settings.MODERATION_MAX_IDS)
+
+class AdminPostBulkDeleteView(AdminPostBulkView):
+    
+    def post(self, request):
+        try:
+            post_ids = self.get_post_ids(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        deleted_count = soft_delete_posts(post_ids)
         
         return Response({
             'status': f'{deleted_count} posts deleted successfully',
             'deleted_count': deleted_count
         })
 
+class AdminPostBulkDeactivateView(AdminPostBulkView):
+    
+    def post(self, request):
+        try:
+            post_ids = self.get_post_ids(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        deactivated_count = deactivate_posts(post_ids)
+        
+        return Response({
+            'status': f'{deactivated_count} posts deactivated successfully',
+            'deactivated_count': deactivated_count
+        })
+
 class AdminCommentListView(generics.ListAPIView):
     serializer_class = AdminCommentSerializer
     permission_classes = [IsAdminRole]
-    queryset = Comment.objects.all().order_by('-created_at')
+    queryset = Comment.objects.filter(deleted_at__isnull=True).order_by('-created_at')
+    read_replica = True
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -111,19 +133,32 @@ class AdminCommentListView(generics.ListAPIView):
         
         return queryset
 
+class AdminCommentExportView(ExportMixin, AdminCommentListView):
+    export_filename = 'comments'
+    export_columns = [
+        ('id', 'id'),
+        ('post_id', 'post_id'),
+        ('author_id', 'author_id'),
+        ('author_username', 'author__username'),
+        ('content', 'content'),
+        ('is_active', 'is_active'),
+        ('created_at', 'created_at'),
+    ]
+
 class AdminCommentDeleteView(generics.DestroyAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsAdminRole]
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.filter(deleted_at__isnull=True)
     
     def destroy(self, request, *args, **kwargs):
         comment = self.get_object()
         comment_content = comment.content[:50] + "..." if len(comment.content) > 50 else comment.content
-        comment.delete()
+        soft_delete_comments([comment.id])
         return Response({'status': f'comment "{comment_content}" deleted'})
 
 class AdminContentStatsView(generics.GenericAPIView):
     permission_classes = [IsAdminRole]
+    read_replica = True
     
     def get(self, request):
         today = timezone.now().date()
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'posts'
+
+    def ready(self):
+        import posts.signals
+        from utils.bulk import check_deletable
+        from posts.models import Post
+        check_deletable(Post)
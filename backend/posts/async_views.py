@@ -0,0 +1,96 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from .models import Post
+from .serializers import PostCreateSerializer, PostUpdateSerializer
+from .views import PostListCreateView, PostDetailView
+from .moderation import soft_delete_posts, storage_configured, image_path_from_url
+from utils.async_views import AsyncAPIView, run_blocking
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def get_storage():
+    from utils.supabase_storage import get_supabase_storage
+    return await run_blocking(get_supabase_storage)
+
+class AsyncPostListCreateView(AsyncAPIView):
+    sync_view = PostListCreateView
+    read_replica = True
+    
+    async def post(self, request):
+        serializer = PostCreateSerializer(data=self.get_data(request))
+        if not serializer.is_valid():
+            return self.respond(serializer.errors, status=400)
+        
+        post = Post(author=request.user, **serializer.validated_data)
+        await post.asave()
+        
+        image_file = request.FILES.get('image')
+        if image_file:
+            if not storage_configured():
+                logger.warning("Supabase credentials not configured. Image upload skipped.")
+            else:
+                try:
+                    storage = await get_storage()
+                    file_path, public_url = await run_blocking(storage.upload_image, image_file)
+                    post.image_url = public_url
+                    await post.asave(update_fields=['image_url'])
+                except Exception as e:
+                    logger.error(f"Image upload failed: {str(e)}")
+        
+        return self.respond(PostCreateSerializer(post).data, status=201)
+
+class AsyncPostDetailView(AsyncAPIView):
+    sync_view = PostDetailView
+    
+    async def get_post(self, request, pk):
+        view = PostDetailView(request=request, kwargs={'pk': pk})
+        queryset = await sync_to_async(view.get_queryset)()
+        try:
+            return await queryset.aget(pk=pk)
+        except Post.DoesNotExist:
+            return None
+    
+    async def put(self, request, pk):
+        return await self.update(request, pk, partial=False)
+    
+    async def patch(self, request, pk):
+        return await self.update(request, pk, partial=True)
+    
+    async def update(self, request, pk, partial):
+        post = await self.get_post(request, pk)
+        if post is None:
+            return self.respond({'detail': 'Not found.'}, status=404)
+        
+        serializer = PostUpdateSerializer(post, data=self.get_data(request), partial=partial)
+        if not serializer.is_valid():
+            return self.respond(serializer.errors, status=400)
+        
+        for attr, value in serializer.validated_data.items():
+            setattr(post, attr, value)
+        await post.asave()
+        
+        image_file = request.FILES.get('image')
+        if image_file:
+            if not storage_configured():
+                logger.warning("Supabase credentials not configured. Image update skipped.")
+            else:
+                try:
+                    storage = await get_storage()
+                    if post.image_url and image_path_from_url(post.image_url):
+                        await run_blocking(storage.delete_image, image_path_from_url(post.image_url))
+                    file_path, public_url = await run_blocking(storage.upload_image, image_file)
+                    post.image_url = public_url
+                    await post.asave(update_fields=['image_url'])
+                except Exception as e:
+                    logger.error(f"Image update failed: {str(e)}")
+        
+        return self.respond(PostUpdateSerializer(post).data)
+    
+    async def delete(self, request, pk):
+        post = await self.get_post(request, pk)
+        if post is None:
+            return self.respond({'detail': 'Not found.'}, status=404)
+        
+        await sync_to_async(soft_delete_posts)([post.id])
+        return HttpResponse(status=204)
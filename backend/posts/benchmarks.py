@@ -0,0 +1,71 @@
+import os
+import resource
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from .models import Post
+
+User = get_user_model()
+
+# Shared by the audit_queries and run_benchmarks commands: who the
+# requests are made as, and which read endpoints they cover.
+
+
+def pick_viewer(username=None):
+    """The named user, or the one following the most accounts."""
+    if username:
+        return User.objects.filter(username=username).first()
+    return User.objects.filter(is_active=True).annotate(total=Count('following_set')).order_by('-total').first()
+
+
+def read_endpoints(viewer):
+    """[(name, path)] for the main read endpoints, as seen by viewer; None without data."""
+    posts = Post.objects.filter(is_active=True).order_by('-comment_count')
+    post = posts.filter(author=viewer).first() or posts.first()
+    if viewer is None or post is None:
+        return None
+
+    ids = ','.join(str(post_id) for post_id in Post.objects.filter(is_active=True).values_list('id', flat=True)[:20])
+    user_ids = ','.join(str(user_id) for user_id in User.objects.values_list('id', flat=True)[:20])
+    return [
+        ('posts', '/api/posts/'),
+        ('posts by author', f'/api/posts/?author={post.author_id}'),
+        ('post detail', f'/api/posts/{post.id}/'),
+        ('comments', f'/api/posts/{post.id}/comments/'),
+        ('feed', '/api/posts/feed/'),
+        ('ranked feed', '/api/posts/feed/?mode=ranked'),
+        ('trending', '/api/posts/trending/'),
+        ('like status', f'/api/posts/like-status/?ids={ids}'),
+        ('users', '/api/users/'),
+        ('discover', '/api/users/discover/'),
+        ('user detail', f'/api/users/{viewer.id}/'),
+        ('followers', f'/api/users/{viewer.id}/followers/'),
+        ('following', f'/api/users/{viewer.id}/following/'),
+        ('follow status', f'/api/users/follow-status/?ids={user_ids}'),
+        ('notifications', '/api/notifications/'),
+    ]
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))]
+
+
+def read_rss_kb(pids=None):
+    """Summed resident set size in KiB of the given processes (default: this one)."""
+    total = 0
+    for process_id in pids or [os.getpid()]:
+        try:
+            with open(f'/proc/{process_id}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except OSError:
+            return None
+    return total
+
+
+def peak_rss_kb():
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -0,0 +1,26 @@
+from users.caches import user_cache
+from utils.object_cache import ObjectCache, model_fields, from_row, row_values
+from .models import Post
+
+POST_FIELDS = model_fields(Post)
+
+
+def load_posts(post_ids):
+    return {post.id: row_values(post, POST_FIELDS) for post in Post.objects.filter(id__in=post_ids)}
+
+
+def build_post(payload):
+    return from_row(Post, POST_FIELDS, payload)
+
+
+post_cache = ObjectCache('post', load_posts, build_post)
+
+
+def attach_authors(posts, versions=None):
+    """Sets post.author on each post from the user cache, with one multi-get."""
+    authors = user_cache.get_many([post.author_id for post in posts], versions)
+    for post in posts:
+        author = authors.get(str(post.author_id))
+        if author is not None:
+            Post.author.field.set_cached_value(post, author)
+    return posts
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from posts.benchmarks import pick_viewer, read_endpoints
+from utils.query_audit import audit, plans_supported
+
+class Command(BaseCommand):
+    help = 'Run the main read endpoints and report queries that need a full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', nargs='?', help='Viewer (default: the user who follows the most accounts)')
+        parser.add_argument('--verbose-sql', action='store_true', help='Print the full SQL of offending queries')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error when any endpoint scans a table')
+
+    def handle(self, *args, **options):
+        viewer = pick_viewer(options['username'])
+        endpoints = read_endpoints(viewer)
+        if endpoints is None:
+            raise CommandError('Needs at least one user and one active post')
+        if not plans_supported():
+            self.stdout.write(self.style.WARNING('No plan parser for this database; queries are run but not checked'))
+
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(viewer).access_token}')
+        offending = 0
+
+        # A dummy cache makes every endpoint reach the database instead of
+        # answering from cached pages or 304s.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            CACHES={**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            for _, path in endpoints:
+                response, findings = audit(lambda: client.get(path))
+                status = self.style.SUCCESS('ok') if not findings else self.style.ERROR(f'{len(findings)} scanning')
+                shown_path = path if len(path) <= 60 else path[:57] + '...'
+                self.stdout.write(f'{response.status_code} {shown_path:<60} {status}')
+                for sql, tables in findings:
+                    shown = sql if options['verbose_sql'] else sql[:160] + ('...' if len(sql) > 160 else '')
+                    self.stdout.write(f"    full scan of {', '.join(tables)}: {shown}")
+                offending += bool(findings)
+
+        if offending and options['fail']:
+            raise CommandError(f'{offending} endpoints issue queries without a usable index')
+        self.stdout.write(f'{len(endpoints) - offending}/{len(endpoints)} endpoints use indexes only')
@@ -0,0 +1,55 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from posts.views import PersonalizedFeedView
+from posts.ranking import rank_feed
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = 'Compare chronological and ranked feed latency for a user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+
+        factory = APIRequestFactory()
+        view = PersonalizedFeedView.as_view()
+
+        def feed_request(params):
+            request = factory.get('/api/posts/feed/', params)
+            force_authenticate(request, user=user)
+            response = view(request)
+            response.render()
+
+        feed_view = PersonalizedFeedView()
+        feed_view.request = type('Request', (), {'user': user})()
+        queryset = feed_view.get_queryset()
+
+        cases = [
+            ('chronological feed', lambda: feed_request({})),
+            ('ranked feed', lambda: feed_request({'mode': 'ranked'})),
+            ('ranking pass only', lambda: rank_feed(user, queryset)),
+        ]
+
+        for label, run in cases:
+            run()
+            timings = []
+            for _ in range(options['iterations']):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{label:<20} p50={statistics.median(timings):.2f}ms '
+                f'p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms '
+                f'max={timings[-1]:.2f}ms'
+            )
@@ -0,0 +1,80 @@
+import time
+import orjson
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.request import Request
+from posts.models import Post
+from posts.serializers import FeedPostSerializer
+from users.serializers import UserSerializer
+from utils.fragments import fragment_cache
+from utils.renderers import ORJSONRenderer
+
+User = get_user_model()
+
+
+class StockFeedPostSerializer(FeedPostSerializer):
+    author = UserSerializer(read_only=True)
+
+
+class Command(BaseCommand):
+    help = 'Compare the stock JSON renderer with the orjson renderer and author fragments on a feed page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--username', help='Viewer for is_following/is_liked fields (default: first user)')
+
+    def handle(self, *args, **options):
+        viewer = User.objects.filter(username=options['username']).first() if options['username'] else User.objects.first()
+        if viewer is None:
+            raise CommandError('No users found; create some users and posts first')
+
+        posts = list(Post.objects.filter(is_active=True).select_related('author__profile').order_by('-created_at')[:options['posts']])
+        if not posts:
+            raise CommandError('No posts found; create some posts first')
+
+        request = APIRequestFactory().get('/api/posts/feed/')
+        force_authenticate(request, user=viewer)
+        context = {'request': Request(request)}
+
+        stock = JSONRenderer()
+        fast = ORJSONRenderer()
+        plain_data = StockFeedPostSerializer(posts, many=True, context=context).data
+        fragment_data = FeedPostSerializer(posts, many=True, context=dict(context)).data
+
+        stock_bytes = stock.render(plain_data)
+        fast_bytes = fast.render(plain_data)
+        fragment_bytes = fast.render(fragment_data)
+        identical = stock_bytes == fast_bytes == fragment_bytes
+        equivalent = orjson.loads(stock_bytes) == orjson.loads(fragment_bytes)
+        self.stdout.write(
+            f'{len(posts)} posts, {len(stock_bytes)} bytes per page; '
+            f'byte-identical output: {identical}; equivalent JSON: {equivalent}'
+        )
+
+        render_cases = [
+            ('render: JSONRenderer', lambda: stock.render(plain_data)),
+            ('render: ORJSONRenderer', lambda: fast.render(plain_data)),
+            ('render: ORJSON + fragments', lambda: fast.render(fragment_data)),
+        ]
+        end_to_end_cases = [
+            ('serialize+render: stock', lambda: stock.render(
+                StockFeedPostSerializer(posts, many=True, context=dict(context)).data)),
+            ('serialize+render: ORJSON + fragments', lambda: fast.render(
+                FeedPostSerializer(posts, many=True, context=dict(context)).data)),
+        ]
+
+        fragment_cache.clear()
+        for label, run in render_cases + end_to_end_cases:
+            run()
+            started = time.perf_counter()
+            for _ in range(options['iterations']):
+                output = run()
+            elapsed = time.perf_counter() - started
+            per_call = elapsed / options['iterations']
+            self.stdout.write(
+                f'{label:<38} {per_call * 1e6:9.1f}us/page '
+                f'{len(output) / per_call / 1e6:8.1f} MB/s'
+            )
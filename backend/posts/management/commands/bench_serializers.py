@@ -0,0 +1,90 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from notifications.models import Notification
+from notifications.read_serializers import serialize_notifications
+from notifications.serializers import NotificationSerializer
+from posts.read_serializers import serialize_posts
+from posts.serializers import PostSerializer
+from posts.views import PersonalizedFeedView
+from users.models import Follow
+from users.read_serializers import serialize_users, serialize_follows
+from users.serializers import UserSerializer, FollowSerializer
+from utils.renderers import ORJSONRenderer
+from utils.status_loader import StatusLoader
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF serializers with the compiled read-path serializers per page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', nargs='?', help='Viewer (default: the user with the most followers)')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options['username']:
+            viewer = User.objects.filter(username=options['username']).first()
+        else:
+            viewer = User.objects.annotate(total=Count('followers_set')).order_by('-total').first()
+        if viewer is None:
+            raise CommandError('No matching user; create some users first')
+
+        factory = APIRequestFactory()
+        size = options['page_size']
+
+        def context():
+            # A fresh request per run, so the per-request StatusLoader starts empty.
+            request = factory.get('/')
+            force_authenticate(request, user=viewer)
+            return {'request': Request(request)}
+
+        feed_view = PersonalizedFeedView()
+        feed_view.request = context()['request']
+        feed = feed_view.get_queryset()[:size]
+        users = User.objects.all().order_by('-created_at')[:size]
+        followers = Follow.objects.filter(following=viewer).select_related('follower')[:size]
+        notifications = Notification.objects.filter(recipient=viewer).select_related('sender', 'post')[:size]
+
+        # Querysets are cloned with .all() on every run so neither side is
+        # served from a previous run's result cache.
+        cases = [
+            ('feed', lambda: PostSerializer(feed.all(), many=True, context=context()).data,
+             lambda: serialize_posts(feed.all(), StatusLoader(viewer))),
+            ('users', lambda: UserSerializer(users.all(), many=True, context=context()).data,
+             lambda: serialize_users(users.all(), StatusLoader(viewer))),
+            ('followers', lambda: FollowSerializer(followers.all(), many=True, context=context()).data,
+             lambda: serialize_follows(followers.all())),
+            ('notifications', lambda: NotificationSerializer(notifications.all(), many=True, context=context()).data,
+             lambda: serialize_notifications(notifications.all())),
+        ]
+
+        renderer = ORJSONRenderer()
+        for label, drf, compiled in cases:
+            drf_bytes = renderer.render(drf())
+            compiled_bytes = renderer.render(compiled())
+            if drf_bytes != compiled_bytes:
+                self.stdout.write(self.style.ERROR(f'{label}: compiled output differs from the DRF serializer'))
+                continue
+
+            timings = {}
+            for name, run in (('drf', drf), ('compiled', compiled)):
+                samples = []
+                for _ in range(options['iterations']):
+                    started = time.perf_counter()
+                    renderer.render(run())
+                    samples.append((time.perf_counter() - started) * 1000)
+                timings[name] = statistics.median(samples)
+
+            rows = len(compiled())
+            self.stdout.write(
+                f'{label:<14} {rows:>3} rows, byte-identical  '
+                f"drf={timings['drf']:.2f}ms compiled={timings['compiled']:.2f}ms "
+                f"speedup={timings['drf'] / timings['compiled']:.1f}x"
+            )
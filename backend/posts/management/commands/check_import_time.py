@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker imports before it can serve: settings, the apps and every
+# view module through the URLconf.
+BOOT = 'import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns'
+
+
+class Command(BaseCommand):
+    help = 'Profile app startup with python -X importtime; fail when over budget or when a deferred module is imported'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float, default=None,
+                            help='Allowed total import time (default: settings.IMPORT_TIME_BUDGET_MS)')
+        parser.add_argument('--runs', type=int, default=3, help='Profile this many times and keep the fastest run')
+        parser.add_argument('--top', type=int, default=15, help='Number of slowest modules to list')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be positive')
+        budget_ms = settings.IMPORT_TIME_BUDGET_MS if options['budget_ms'] is None else options['budget_ms']
+
+        modules = min((self.profile() for _ in range(options['runs'])), key=total_ms)
+        self.stdout.write(f'{"self ms":>9} {"cumul ms":>9}  module')
+        for name, self_ms, cumulative_ms, _ in sorted(modules, key=lambda module: module[1], reverse=True)[:options['top']]:
+            self.stdout.write(f'{self_ms:>9.1f} {cumulative_ms:>9.1f}  {name}')
+
+        total = total_ms(modules)
+        imported = {name for name, _, _, _ in modules}
+        deferred = [
+            module for module in settings.DEFERRED_IMPORTS
+            if any(name == module or name.startswith(module + '.') for name in imported)
+        ]
+
+        self.stdout.write(f'{len(modules)} modules, {total:.1f}ms total (budget {budget_ms:g}ms)')
+        problems = []
+        if total > budget_ms:
+            problems.append(f'startup imports take {total:.1f}ms, over the {budget_ms:g}ms budget')
+        for module in deferred:
+            problems.append(f'{module} is imported at startup: {self.importer(modules, module)}')
+
+        if problems:
+            for problem in problems:
+                self.stdout.write(self.style.ERROR(problem))
+            raise CommandError(f'{len(problems)} import-time problems')
+        self.stdout.write(self.style.SUCCESS('import time within budget'))
+
+    def profile(self):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Loading the app failed:\n{result.stderr[-2000:]}')
+        return parse_importtime(result.stderr)
+
+    def importer(self, modules, module):
+        # -X importtime lists a module after everything it imported, with
+        # its importer being the next line that is one level shallower.
+        for index, (name, _, _, depth) in enumerate(modules):
+            if name == module or name.startswith(module + '.'):
+                for parent, _, _, parent_depth in modules[index + 1:]:
+                    if parent_depth < depth and not parent.startswith(module):
+                        return f'imported by {parent}'
+                return 'imported directly'
+        return 'imported'
+
+
+def parse_importtime(output):
+    """[(module, self_ms, cumulative_ms, depth)] in the order -X importtime prints them."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return modules
+
+
+def total_ms(modules):
+    return sum(cumulative_ms for _, _, cumulative_ms, depth in modules if depth == 0)
@@ -0,0 +1,92 @@
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from posts.benchmarks import read_rss_kb
+
+
+class Command(BaseCommand):
+    help = 'Drive concurrent requests at a running server and report throughput, latency and memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='e.g. http://127.0.0.1:8000')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Path to request; repeat to mix endpoints (default /api/posts/)')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--token', help='JWT access token sent as a Bearer token')
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--pid', type=int, action='append', default=[],
+                            help='Server process id(s) whose RSS is sampled; repeat for each worker')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be positive')
+
+        base_url = options['base_url'].rstrip('/')
+        paths = options['paths'] or ['/api/posts/']
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+
+        timings = []
+        statuses = {}
+        errors = []
+        lock = threading.Lock()
+
+        def hit(index):
+            request = urllib.request.Request(base_url + paths[index % len(paths)], headers=headers)
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=options['timeout']) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                return
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                timings.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        peak_rss = [read_rss_kb(options['pid']) if options['pid'] else None]
+        sampling = threading.Event()
+
+        def sample_rss():
+            while not sampling.wait(0.2):
+                rss = read_rss_kb(options['pid'])
+                if rss is not None:
+                    peak_rss[0] = max(peak_rss[0] or 0, rss)
+
+        sampler = None
+        if options['pid']:
+            sampler = threading.Thread(target=sample_rss, daemon=True)
+            sampler.start()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(hit, range(options['requests'])))
+        duration = time.perf_counter() - started
+
+        if sampler is not None:
+            sampling.set()
+            sampler.join()
+
+        self.stdout.write(f"{len(timings)} responses in {duration:.2f}s "
+                          f"({len(timings) / duration:.1f} req/s) at concurrency {options['concurrency']}")
+        if timings:
+            timings.sort()
+            self.stdout.write(
+                f'latency p50={statistics.median(timings):.1f}ms '
+                f'p95={timings[max(int(len(timings) * 0.95) - 1, 0)]:.1f}ms '
+                f'max={timings[-1]:.1f}ms'
+            )
+        self.stdout.write('status codes: ' + ', '.join(f'{code}={count}' for code, count in sorted(statuses.items())))
+        if errors:
+            self.stdout.write(self.style.WARNING(f'{len(errors)} connection errors, e.g. {errors[0]}'))
+        if peak_rss[0] is not None:
+            self.stdout.write(f'peak server RSS: {peak_rss[0] / 1024:.1f} MiB')
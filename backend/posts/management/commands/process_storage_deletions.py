@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from posts.models import StorageDeletion
+from posts.moderation import process_storage_deletions, storage_configured
+
+class Command(BaseCommand):
+    help = 'Remove storage objects queued by bulk moderation, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.STORAGE_DELETE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None)
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Reset the attempt count of entries that reached the retry limit')
+
+    def handle(self, *args, **options):
+        if not storage_configured():
+            raise CommandError('SUPABASE_URL and SUPABASE_SERVICE_KEY must be set')
+
+        if options['retry_failed']:
+            StorageDeletion.objects.filter(attempts__gte=settings.STORAGE_DELETE_MAX_ATTEMPTS).update(attempts=0)
+
+        removed, failed = process_storage_deletions(options['batch_size'], options['max_batches'])
+        remaining = StorageDeletion.objects.count()
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} objects failed and stay queued'))
+        self.stdout.write(
+            self.style.SUCCESS(f'Removed {removed} storage objects, {remaining} still queued')
+        )
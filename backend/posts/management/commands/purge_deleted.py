@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from posts.moderation import purge_deleted_comments, purge_deleted_posts
+from users.moderation import purge_deleted_users
+
+class Command(BaseCommand):
+    help = 'Remove soft-deleted comments, posts and users in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-hours', type=float, default=settings.PURGE_DELETED_AFTER_HOURS)
+        parser.add_argument('--batch-size', type=int, default=settings.PURGE_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between batches to leave room for live traffic')
+        parser.add_argument('--only', choices=['comments', 'posts', 'users'], action='append')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than_hours'])
+        kinds = options['only'] or ['comments', 'posts', 'users']
+
+        def progress(model, total):
+            self.stdout.write(f'  {model._meta.verbose_name_plural}: {total} purged')
+
+        purges = {
+            'comments': purge_deleted_comments,
+            'posts': purge_deleted_posts,
+            'users': purge_deleted_users,
+        }
+        for kind in ['comments', 'posts', 'users']:
+            if kind not in kinds:
+                continue
+            self.stdout.write(f'Purging {kind} deleted before {cutoff.isoformat()}')
+            total = purges[kind](cutoff, options['batch_size'], progress, options['pause'])
+            self.stdout.write(self.style.SUCCESS(f'Purged {total} {kind}'))
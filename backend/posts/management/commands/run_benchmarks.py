@@ -0,0 +1,157 @@
+import gc
+import json
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from notifications.models import Notification
+from posts.benchmarks import peak_rss_kb, percentile, pick_viewer, read_endpoints, read_rss_kb
+from posts.models import Post, Like, Comment
+from users.models import Follow
+from utils.query_budget import collect, stop
+
+User = get_user_model()
+
+DATASET_MODELS = (User, Follow, Post, Like, Comment, Notification)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the read endpoints in-process and compare against a saved JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', nargs='?', help='Viewer (default: the user who follows the most accounts)')
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', action='append', default=[], help='Endpoint name to run; repeatable')
+        parser.add_argument('--cache', action='store_true',
+                            help='Keep the configured cache (default: a dummy cache, so every request hits the database)')
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write the results to PATH as JSON')
+        parser.add_argument('--baseline', metavar='PATH', help='Fail when results regress against this JSON baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative slowdown of p50/p95 and growth of peak RSS (default 0.25)')
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help='Latency increases smaller than this are never regressions')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        viewer = pick_viewer(options['username'])
+        endpoints = read_endpoints(viewer)
+        if endpoints is None:
+            raise CommandError('Needs at least one user and one active post; see seed_benchmark')
+        if options['only']:
+            endpoints = [(name, path) for name, path in endpoints if name in options['only']]
+
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(viewer).access_token}')
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['cache']:
+            overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        results = {}
+        with override_settings(**overrides):
+            for name, path in endpoints:
+                results[name] = self.measure(client, path, options['iterations'], options['warmup'])
+                self.report(name, results[name])
+
+        run = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': {model._meta.label: model._base_manager.count() for model in DATASET_MODELS},
+            'iterations': options['iterations'],
+            'cache': options['cache'],
+            'peak_rss_kb': peak_rss_kb(),
+            'endpoints': results,
+        }
+        self.stdout.write(f"peak RSS {run['peak_rss_kb'] / 1024:.1f} MiB")
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as baseline_file:
+                json.dump(run, baseline_file, indent=2)
+            self.stdout.write(f"baseline written to {options['save_baseline']}")
+
+        if baseline is not None:
+            regressions = self.compare(run, baseline, options['tolerance'], options['min_delta_ms'])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f'regression: {regression}'))
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('no regressions against the baseline'))
+
+    def measure(self, client, path, iterations, warmup):
+        for _ in range(warmup):
+            client.get(path)
+
+        gc.collect()
+        rss_before = read_rss_kb()
+        timings, queries, statuses = [], [], set()
+        for _ in range(iterations):
+            stats, token = collect()
+            started = time.perf_counter()
+            try:
+                response = client.get(path)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                stop(token)
+            timings.append(elapsed)
+            queries.append(stats.count)
+            statuses.add(response.status_code)
+
+        timings.sort()
+        rss_after = read_rss_kb()
+        return {
+            'path': path,
+            'status': max(statuses),
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries': max(queries),
+            'rss_growth_kb': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        }
+
+    def report(self, name, result):
+        status = result['status']
+        shown_status = self.style.SUCCESS(str(status)) if status < 400 else self.style.ERROR(str(status))
+        self.stdout.write(
+            f"{shown_status} {name:<16} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+            f"p99={result['p99_ms']:>8.2f}ms queries={result['queries']:>3}"
+            + (f" rss+={result['rss_growth_kb']}KiB" if result['rss_growth_kb'] else '')
+        )
+
+    def compare(self, run, baseline, tolerance, min_delta_ms):
+        if run['dataset'] != baseline.get('dataset'):
+            self.stdout.write(self.style.WARNING('dataset differs from the baseline; latencies may not be comparable'))
+
+        regressions = []
+        for name, result in run['endpoints'].items():
+            before = baseline.get('endpoints', {}).get(name)
+            if before is None:
+                continue
+            if result['status'] != before['status']:
+                regressions.append(f"{name}: status {before['status']} -> {result['status']}")
+            if result['queries'] > before['queries']:
+                regressions.append(f"{name}: {before['queries']} -> {result['queries']} queries")
+            # p99 is reported but not compared; with a few dozen samples it
+            # is close to the maximum and too noisy to gate on.
+            for key in ('p50_ms', 'p95_ms'):
+                allowed = before[key] * (1 + tolerance) + min_delta_ms
+                if result[key] > allowed:
+                    regressions.append(f"{name}: {key} {before[key]:.2f} -> {result[key]:.2f}")
+
+        if baseline.get('peak_rss_kb') and run['peak_rss_kb'] > baseline['peak_rss_kb'] * (1 + tolerance):
+            regressions.append(f"peak RSS {baseline['peak_rss_kb']} -> {run['peak_rss_kb']} KiB")
+        return regressions
@@ -0,0 +1,276 @@
+import time
+import uuid
+from datetime import timedelta
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import Notification
+from posts.models import Post, Like, Comment
+from posts.trending import COMMENT_WEIGHT, DECAY_RATE, LIKE_WEIGHT, TRENDING_EPOCH
+from users.models import Follow, Profile
+from utils.bulk import delete_set
+from utils.seeding import analyze, normalized, power_law, write_rows
+
+User = get_user_model()
+
+WORDS = (
+    'the a to and of in is it you that for on with this just was have are not but my '
+    'what so be at all like new get out up today about time people think good really '
+    'one day now how when love know see work team post first week great need going '
+    'project help anyone question update launch release build ship code idea coffee '
+    'weekend news thanks everyone working excited finally learning design data'
+).split()
+
+CATEGORIES = ([choice for choice, _ in Post.CATEGORY_CHOICES], [0.8, 0.05, 0.15])
+PRIVACY = ([choice for choice, _ in Profile.PRIVACY_CHOICES], [0.85, 0.05, 0.1])
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic social graph with power-law followers and engagement for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--follows-per-user', type=float, default=40.0, help='Average out-degree')
+        parser.add_argument('--likes-per-post', type=float, default=8.0)
+        parser.add_argument('--comments-per-post', type=float, default=2.0)
+        parser.add_argument('--days', type=int, default=30, help='Posts are spread over this many past days')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='bench_', help='Username prefix of generated users')
+        parser.add_argument('--password', default='benchmark-password')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated users (and all their data) first')
+
+    def handle(self, *args, **options):
+        n_users, n_posts = options['users'], options['posts']
+        if n_users < 2 or n_posts < 1:
+            raise CommandError('Needs at least 2 users and 1 post')
+
+        self.rng = np.random.default_rng(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+        prefix = options['prefix']
+
+        with transaction.atomic():
+            existing = User.objects.filter(username__startswith=prefix)
+            if existing.exists():
+                if not options['clear']:
+                    raise CommandError(f'Users named {prefix}* already exist; pass --clear to replace them')
+                counts = delete_set(existing)
+                self.stdout.write('cleared ' + ', '.join(f'{count} {label}' for label, count in counts.items() if count))
+
+            # How many followers a user attracts and how often they post,
+            # like and comment; both heavy-tailed and independent.
+            popularity = power_law(self.rng, n_users, 1.1)
+            activity = power_law(self.rng, n_users, 1.5)
+
+            users = self.seed_users(n_users, prefix, make_password(options['password']))
+            follows = self.seed_follows(users, popularity, options['follows_per_user'])
+            posts = self.seed_posts(
+                users, popularity, activity, n_posts, options['days'],
+                options['likes_per_post'], options['comments_per_post']
+            )
+            self.seed_notifications(users, follows, posts)
+
+        analyze([User, Profile, Follow, Post, Like, Comment, Notification])
+        self.stdout.write(self.style.SUCCESS(f'Seeded {n_users} users; log in as {prefix}0 with the --password given'))
+
+    def ids(self, count):
+        # Drawn from the seeded generator so reruns produce the same ids.
+        blob = self.rng.bytes(16 * count)
+        return [uuid.UUID(bytes=blob[index * 16:index * 16 + 16], version=4) for index in range(count)]
+
+    def ago(self, seconds):
+        return [self.now - timedelta(seconds=float(value)) for value in seconds]
+
+    def after(self, start, seconds):
+        return [min(self.now, at + timedelta(seconds=float(value))) for at, value in zip(start, seconds)]
+
+    def write(self, model, rows):
+        started = time.perf_counter()
+        written = write_rows(model, rows, self.chunk_size)
+        self.stdout.write(f'{model._meta.label:<26} {written:>10} rows in {time.perf_counter() - started:.1f}s')
+        return written
+
+    def text(self, count, max_words, max_length):
+        lengths = self.rng.integers(3, max_words, count)
+        words = self.rng.integers(0, len(WORDS), lengths.sum())
+        texts, start = [], 0
+        for length in lengths:
+            texts.append(' '.join(WORDS[index] for index in words[start:start + length])[:max_length])
+            start += length
+        return texts
+
+    def seed_users(self, count, prefix, password):
+        ids = self.ids(count)
+        joined = self.ago(self.rng.uniform(30 * DAY, 400 * DAY, count))
+        usernames = [f'{prefix}{index}' for index in range(count)]
+
+        self.write(User, (
+            {
+                'id': ids[index],
+                'password': password,
+                'username': usernames[index],
+                'email': f'{usernames[index]}@example.com',
+                'first_name': 'Bench',
+                'last_name': f'User {index}',
+                'date_joined': joined[index],
+                'created_at': joined[index],
+                'updated_at': joined[index],
+            }
+            for index in range(count)
+        ))
+
+        privacy = self.rng.choice(PRIVACY[0], count, p=PRIVACY[1])
+        bios = self.text(count, 12, 160)
+        self.write(Profile, (
+            {
+                'user_id': ids[index],
+                'bio': bios[index],
+                'privacy': str(privacy[index]),
+                'created_at': joined[index],
+                'updated_at': joined[index],
+            }
+            for index in range(count)
+        ))
+
+        return {'ids': ids, 'usernames': usernames}
+
+    def seed_follows(self, users, popularity, per_user):
+        count = len(users['ids'])
+        out_degree = np.minimum(self.rng.poisson(power_law(self.rng, count, 1.5, mean=per_user)), count - 1)
+        follower = np.repeat(np.arange(count, dtype=np.int64), out_degree)
+        following = self.rng.choice(count, follower.size, p=normalized(popularity))
+
+        # Popular accounts get drawn repeatedly; keep each pair once.
+        pairs = np.unique(follower * count + following)
+        follower, following = np.divmod(pairs, count)
+        keep = follower != following
+        follower, following = follower[keep], following[keep]
+
+        created = self.ago(self.rng.uniform(0, 30 * DAY, follower.size))
+        ids = self.ids(follower.size)
+        self.write(Follow, (
+            {
+                'id': ids[index],
+                'follower_id': users['ids'][follower[index]],
+                'following_id': users['ids'][following[index]],
+                'created_at': created[index],
+            }
+            for index in range(follower.size)
+        ))
+        return follower, following, created
+
+    def seed_posts(self, users, popularity, activity, count, days, likes_per_post, comments_per_post):
+        rng = self.rng
+        author = rng.choice(len(users['ids']), count, p=normalized(activity))
+        category = rng.choice(CATEGORIES[0], count, p=CATEGORIES[1])
+        created_seconds = rng.uniform(0, days * DAY, count)
+        created = self.ago(created_seconds)
+
+        # Engagement follows the author's reach, times a per-post factor.
+        appeal = normalized(popularity[author] * power_law(rng, count, 1.3))
+        like_post = rng.choice(count, int(count * likes_per_post), p=appeal)
+        like_user = rng.choice(len(users['ids']), like_post.size, p=normalized(activity))
+        pairs = np.unique(like_post.astype(np.int64) * len(users['ids']) + like_user)
+        like_post, like_user = np.divmod(pairs, len(users['ids']))
+        like_delay = np.minimum(rng.exponential(6 * HOUR, like_post.size), created_seconds[like_post])
+
+        comment_post = rng.choice(count, int(count * comments_per_post), p=appeal)
+        comment_user = rng.choice(len(users['ids']), comment_post.size, p=normalized(activity))
+        comment_delay = np.minimum(rng.exponential(3 * HOUR, comment_post.size), created_seconds[comment_post])
+
+        # Same log-space score posts.trending accumulates event by event.
+        event_base = self.now.timestamp() - TRENDING_EPOCH - created_seconds
+        hot_score = np.zeros(count)
+        np.logaddexp.at(hot_score, like_post, np.log(LIKE_WEIGHT) + DECAY_RATE * (event_base[like_post] + like_delay))
+        np.logaddexp.at(hot_score, comment_post, np.log(COMMENT_WEIGHT) + DECAY_RATE * (event_base[comment_post] + comment_delay))
+        like_count = np.bincount(like_post, minlength=count)
+        comment_count = np.bincount(comment_post, minlength=count)
+
+        ids = self.ids(count)
+        contents = self.text(count, 45, 280)
+        self.write(Post, (
+            {
+                'id': ids[index],
+                'author_id': users['ids'][author[index]],
+                'content': contents[index],
+                'category': str(category[index]),
+                'like_count': int(like_count[index]),
+                'comment_count': int(comment_count[index]),
+                'hot_score': float(hot_score[index]),
+                'created_at': created[index],
+                'updated_at': created[index],
+            }
+            for index in range(count)
+        ))
+
+        like_times = self.after([created[index] for index in like_post], like_delay)
+        like_ids = self.ids(like_post.size)
+        self.write(Like, (
+            {
+                'id': like_ids[index],
+                'user_id': users['ids'][like_user[index]],
+                'post_id': ids[like_post[index]],
+                'created_at': like_times[index],
+            }
+            for index in range(like_post.size)
+        ))
+
+        comment_times = self.after([created[index] for index in comment_post], comment_delay)
+        comment_ids = self.ids(comment_post.size)
+        comment_texts = self.text(comment_post.size, 30, 200)
+        self.write(Comment, (
+            {
+                'id': comment_ids[index],
+                'author_id': users['ids'][comment_user[index]],
+                'post_id': ids[comment_post[index]],
+                'content': comment_texts[index],
+                'created_at': comment_times[index],
+            }
+            for index in range(comment_post.size)
+        ))
+
+        return {
+            'ids': ids,
+            'author': author,
+            'likes': (like_post, like_user, like_times),
+            'comments': (comment_post, comment_user, comment_times),
+        }
+
+    def seed_notifications(self, users, follows, posts):
+        """What notifications.signals would have created for the same events."""
+        user_ids, usernames = users['ids'], users['usernames']
+
+        def events():
+            follower, following, created = follows
+            for index in range(follower.size):
+                yield following[index], follower[index], 'follow', None, 'started following you', created[index]
+            for kind, key, message in (('like', 'likes', 'liked your post'), ('comment', 'comments', 'commented on your post')):
+                post_index, user_index, times = posts[key]
+                for index in range(post_index.size):
+                    recipient = posts['author'][post_index[index]]
+                    if recipient != user_index[index]:
+                        yield recipient, user_index[index], kind, posts['ids'][post_index[index]], message, times[index]
+
+        def rows():
+            for recipient, sender, kind, post_id, message, created_at in events():
+                yield {
+                    'id': uuid.UUID(bytes=self.rng.bytes(16), version=4),
+                    'recipient_id': user_ids[recipient],
+                    'sender_id': user_ids[sender],
+                    'notification_type': kind,
+                    'post_id': post_id,
+                    'message': f'{usernames[sender]} {message}',
+                    # Older notifications have mostly been seen.
+                    'is_read': bool((self.now - created_at).total_seconds() > 2 * DAY and self.rng.random() < 0.9),
+                    'created_at': created_at,
+                }
+
+        self.write(Notification, rows())
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_like_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_score'], name='posts_post_hot_sco_0fd92b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', '-hot_score'], name='posts_post_categor_67cbcb_idx'),
+        ),
+    ]
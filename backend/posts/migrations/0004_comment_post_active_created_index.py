@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'is_active', 'created_at'], name='posts_comme_post_id_1363a8_idx'),
+        ),
+    ]
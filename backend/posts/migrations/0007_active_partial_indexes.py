@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_soft_delete'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='posts_comme_post_id_1363a8_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['post', 'created_at'], name='posts_comment_post_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['post'], name='posts_like_post_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user'], include=('post',), name='posts_like_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['author', '-created_at'], name='posts_post_author_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='posts_post_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storagedeletion',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,9 +1,11 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
+import logging
 import uuid
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 class Post(models.Model):
     CATEGORY_CHOICES = [
@@ -20,14 +22,23 @@ class Post(models.Model):
     is_active = models.BooleanField(default=True)
     like_count = models.PositiveIntegerField(default=0)
     comment_count = models.PositiveIntegerField(default=0)
+    hot_score = models.FloatField(default=0.0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by a delete request; the row is removed later by purge_deleted.
+    deleted_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['author', 'created_at']),
             models.Index(fields=['category', 'created_at']),
+            models.Index(fields=['-hot_score']),
+            models.Index(fields=['category', '-hot_score']),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='posts_post_deleted_idx'),
+            # Feeds and profile timelines only ever read active posts.
+            models.Index(fields=['author', '-created_at'], condition=models.Q(is_active=True), name='posts_post_author_active_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='posts_post_active_created_idx'),
         ]
     
     def __str__(self):
@@ -46,13 +57,13 @@ class Post(models.Model):
                 self.comment_count = self.comments.filter(is_active=True).count()
             self.save(update_fields=['like_count', 'comment_count'])
         except Exception as e:
-            print(f"Error updating post counts: {e}")
+            logger.error(f"Error updating post counts: {e}")
     
     def save(self, *args, **kwargs):
         try:
             super().save(*args, **kwargs)
         except Exception as e:
-            print(f"Error saving post: {e}")
+            logger.error(f"Error saving post: {e}")
             raise
 
 class Comment(models.Model):
@@ -62,9 +73,14 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['post', 'created_at'], condition=models.Q(is_active=True), name='posts_comment_post_active_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='posts_comment_deleted_idx'),
+        ]
     
     def __str__(self):
         try:
@@ -100,6 +116,12 @@ class Like(models.Model):
     class Meta:
         unique_together = ('user', 'post')
         ordering = ['-created_at']
+        indexes = [
+            # Like counts per post, and "posts liked by user" for ranking;
+            # (user, post) existence checks use the unique_together index.
+            models.Index(fields=['post'], condition=models.Q(is_active=True), name='posts_like_post_active_idx'),
+            models.Index(fields=['user'], include=['post'], condition=models.Q(is_active=True), name='posts_like_user_active_idx'),
+        ]
     
     def __str__(self):
         try:
@@ -125,3 +147,19 @@ class Like(models.Model):
             super().delete(*args, **kwargs)
         except Exception as e:
             super().delete(*args, **kwargs)
+
+class StorageDeletion(models.Model):
+    # Storage objects whose rows are gone; removed in batches by
+    # posts.moderation.process_storage_deletions after the delete commits.
+    # A worker claims a batch until claimed_until while it talks to storage.
+    file_path = models.CharField(max_length=500)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return self.file_path
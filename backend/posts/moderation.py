@@ -0,0 +1,295 @@
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from decouple import config
+from notifications.models import Notification
+from utils.bulk import Invalidations, chunked, delete_set, purge_in_batches
+from .models import Post, Comment, Like, StorageDeletion
+from .serializers import comments_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Bulk post moderation. Every operation runs in one transaction, touches
+# the database in chunks of MODERATION_CHUNK_SIZE ids with set-wise
+# statements, and leaves storage cleanup to a queue that is drained in
+# batches after the commit. Delete requests only soft-delete (set
+# deleted_at); the purge_* functions, run by the purge_deleted command,
+# remove the rows later in short batched transactions.
+
+
+def image_path_from_url(image_url):
+    url_parts = (image_url or '').split('/')
+    if len(url_parts) >= 2 and url_parts[-1]:
+        return f"{url_parts[-2]}/{url_parts[-1]}"
+    return None
+
+
+def queue_storage_deletions(urls):
+    paths = {image_path_from_url(url) for url in urls}
+    paths.discard(None)
+    StorageDeletion.objects.bulk_create([StorageDeletion(file_path=path) for path in sorted(paths)])
+    return len(paths)
+
+
+def refresh_post_counts(post_ids):
+    """Recomputes like_count and comment_count for post_ids in one UPDATE per chunk."""
+    def active_count(model):
+        return Coalesce(Subquery(
+            model.objects.filter(post=OuterRef('pk'), is_active=True)
+            .order_by().values('post').annotate(total=Count('id')).values('total')
+        ), Value(0))
+
+    for chunk in chunked(post_ids, settings.MODERATION_CHUNK_SIZE):
+        Post.objects.filter(id__in=chunk).update(
+            like_count=active_count(Like),
+            comment_count=active_count(Comment),
+        )
+
+
+def recount_posts(post_ids, invalidations):
+    """
+    Refreshes the counts of post_ids and invalidates the posts and their
+    authors' post lists, which feeds embed the counts in.
+    """
+    refresh_post_counts(post_ids)
+    invalidations.bump('post', post_ids)
+    invalidations.bump('posts-by', Post.objects.filter(id__in=post_ids).values_list('author_id', flat=True).distinct())
+
+
+def collect_post_deletion(posts, invalidations):
+    """
+    Records what depends on the posts in queryset `posts` and queues their
+    images; call before deleting them.
+    """
+    rows = list(posts.values_list('id', 'author_id', 'image_url'))
+    post_ids = [post_id for post_id, _, _ in rows]
+    author_ids = {author_id for _, author_id, _ in rows}
+
+    invalidations.bump('post', post_ids)
+    invalidations.bump('posts-by', author_ids)
+    invalidations.bump('user', author_ids)
+    invalidations.bump('likes', Like.objects.filter(post_id__in=post_ids).values_list('user_id', flat=True).distinct())
+    invalidations.bump('notifications', Notification.objects.filter(
+        post_id__in=post_ids
+    ).values_list('recipient_id', flat=True).distinct())
+    invalidations.delete(comments_cache_key(post_id) for post_id in post_ids)
+    queue_storage_deletions(image_url for _, _, image_url in rows if image_url)
+
+
+def delete_posts(post_ids):
+    """
+    Deletes the posts with the given ids together with their likes,
+    comments and notifications, and queues their images for removal.
+    Returns the number of posts deleted.
+    """
+    invalidations = Invalidations()
+    deleted = 0
+
+    with transaction.atomic():
+        for chunk in chunked(post_ids, settings.MODERATION_CHUNK_SIZE):
+            posts = Post.objects.filter(id__in=chunk)
+            collect_post_deletion(posts, invalidations)
+            deleted += delete_set(posts)[Post._meta.label]
+
+        invalidations.on_commit()
+        transaction.on_commit(schedule_storage_cleanup)
+
+    return deleted
+
+
+def _hide_posts(posts, post_ids, **values):
+    invalidations = Invalidations()
+    hidden = 0
+
+    with transaction.atomic():
+        for chunk in chunked(post_ids, settings.MODERATION_CHUNK_SIZE):
+            rows = list(posts.filter(id__in=chunk).values_list('id', 'author_id'))
+            author_ids = {author_id for _, author_id in rows}
+            invalidations.bump('post', [post_id for post_id, _ in rows])
+            invalidations.bump('posts-by', author_ids)
+            invalidations.bump('user', author_ids)
+            hidden += posts.filter(id__in=[post_id for post_id, _ in rows]).update(
+                is_active=False, updated_at=timezone.now(), **values
+            )
+
+        invalidations.on_commit()
+
+    return hidden
+
+
+def deactivate_posts(post_ids):
+    """Hides the posts with the given ids; returns how many were active."""
+    return _hide_posts(Post.objects.filter(is_active=True, deleted_at__isnull=True), post_ids)
+
+
+def soft_delete_posts(post_ids):
+    """
+    Marks the posts with the given ids deleted and hides them. Their rows,
+    likes, comments and images are removed later by purge_deleted_posts.
+    Returns how many posts were marked.
+    """
+    return _hide_posts(Post.objects.filter(deleted_at__isnull=True), post_ids, deleted_at=timezone.now())
+
+
+def soft_delete_comments(comment_ids):
+    """Marks the comments with the given ids deleted and recounts their posts."""
+    invalidations = Invalidations()
+    deleted = 0
+
+    with transaction.atomic():
+        for chunk in chunked(comment_ids, settings.MODERATION_CHUNK_SIZE):
+            comments = Comment.objects.filter(id__in=chunk, deleted_at__isnull=True)
+            post_ids = set(comments.values_list('post_id', flat=True))
+            deleted += comments.update(is_active=False, deleted_at=timezone.now())
+            recount_posts(post_ids, invalidations)
+            invalidations.delete(comments_cache_key(post_id) for post_id in post_ids)
+
+        invalidations.on_commit()
+
+    return deleted
+
+
+def delete_likes(like_ids):
+    """Deletes likes by id and recounts the posts they were on."""
+    invalidations = Invalidations()
+    likes = Like.objects.filter(id__in=like_ids)
+    rows = list(likes.values_list('post_id', 'user_id'))
+    delete_set(likes)
+
+    post_ids = {post_id for post_id, _ in rows}
+    recount_posts(post_ids, invalidations)
+    invalidations.bump('likes', {user_id for _, user_id in rows})
+    invalidations.on_commit()
+
+
+def delete_comments(comment_ids):
+    """Deletes comments by id and recounts the posts they were on."""
+    invalidations = Invalidations()
+    comments = Comment.objects.filter(id__in=comment_ids)
+    post_ids = set(comments.values_list('post_id', flat=True))
+    delete_set(comments)
+
+    recount_posts(post_ids, invalidations)
+    invalidations.delete(comments_cache_key(post_id) for post_id in post_ids)
+    invalidations.on_commit()
+
+
+def delete_notifications(notification_ids):
+    invalidations = Invalidations()
+    notifications = Notification.objects.filter(id__in=notification_ids)
+    invalidations.bump('notifications', notifications.values_list('recipient_id', flat=True).distinct())
+    delete_set(notifications)
+    invalidations.on_commit()
+
+
+def purge_posts(posts, batch_size, progress=None, pause=0):
+    """
+    Removes the posts matching queryset `posts`, batch_size at a time.
+    Likes, comments and notifications of each batch are removed in batches
+    first, so no single statement grows with a post's popularity.
+    """
+    purged = 0
+
+    while True:
+        post_ids = list(posts.order_by().values_list('id', flat=True)[:batch_size])
+        if not post_ids:
+            return purged
+
+        purge_in_batches(Like.objects.filter(post_id__in=post_ids), batch_size, delete_likes, pause=pause)
+        purge_in_batches(Comment.objects.filter(post_id__in=post_ids), batch_size, delete_comments, pause=pause)
+        purge_in_batches(Notification.objects.filter(post_id__in=post_ids), batch_size, delete_notifications, pause=pause)
+        purged += delete_posts(post_ids)
+        if progress:
+            progress(Post, purged)
+
+
+def purge_deleted_posts(cutoff, batch_size, progress=None, pause=0):
+    """Removes posts soft-deleted before cutoff."""
+    return purge_posts(Post.objects.filter(deleted_at__lte=cutoff), batch_size, progress, pause)
+
+
+def purge_deleted_comments(cutoff, batch_size, progress=None, pause=0):
+    """Removes comments soft-deleted before cutoff."""
+    return purge_in_batches(Comment.objects.filter(deleted_at__lte=cutoff), batch_size, delete_comments, progress, pause)
+
+
+def storage_configured():
+    return bool(config('SUPABASE_URL', default='') and config('SUPABASE_SERVICE_KEY', default=''))
+
+
+def claim_storage_deletions(batch_size):
+    """
+    Claims up to batch_size queued entries for STORAGE_DELETE_CLAIM_SECONDS
+    in a short transaction, so no row lock is held while storage is
+    called. Entries of a worker that died are claimable again once their
+    claim runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            StorageDeletion.objects.select_for_update(skip_locked=True)
+            .filter(attempts__lt=settings.STORAGE_DELETE_MAX_ATTEMPTS)
+            .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+            .order_by('id')[:batch_size]
+        )
+        if batch:
+            StorageDeletion.objects.filter(id__in=[item.id for item in batch]).update(
+                claimed_until=now + timedelta(seconds=settings.STORAGE_DELETE_CLAIM_SECONDS)
+            )
+    return batch
+
+
+def process_storage_deletions(batch_size=None, max_batches=None):
+    """
+    Removes queued storage objects, one storage request per batch. A
+    failed batch is kept with its error and retried on a later run, up to
+    STORAGE_DELETE_MAX_ATTEMPTS. Returns (removed, failed).
+    """
+    from utils.supabase_storage import get_supabase_storage
+
+    batch_size = batch_size or settings.STORAGE_DELETE_BATCH_SIZE
+    storage = get_supabase_storage()
+    removed = failed = batches = 0
+
+    while max_batches is None or batches < max_batches:
+        batch = claim_storage_deletions(batch_size)
+        if not batch:
+            break
+
+        batch_ids = [item.id for item in batch]
+        try:
+            storage.delete_images([item.file_path for item in batch])
+        except Exception as e:
+            StorageDeletion.objects.filter(id__in=batch_ids).update(
+                attempts=F('attempts') + 1, last_error=str(e)[:1000], claimed_until=None
+            )
+            failed += len(batch)
+            break
+
+        StorageDeletion.objects.filter(id__in=batch_ids).delete()
+        removed += len(batch)
+        batches += 1
+
+    return removed, failed
+
+
+def _drain_storage_queue():
+    try:
+        removed, failed = process_storage_deletions()
+        if failed:
+            logger.warning(f"Storage cleanup removed {removed} objects, {failed} left queued")
+    except Exception as e:
+        logger.warning(f"Storage cleanup failed: {str(e)}")
+    finally:
+        connections.close_all()
+
+
+def schedule_storage_cleanup():
+    """Drains the storage queue on a background thread when storage is configured."""
+    if storage_configured() and StorageDeletion.objects.exists():
+        threading.Thread(target=_drain_storage_queue, name='storage-cleanup', daemon=True).start()
@@ -0,0 +1,133 @@
+import threading
+import time
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import Post, Like, Comment
+
+FEED_CANDIDATE_LIMIT = 500
+FEATURE_CACHE_TTL = 60
+FEATURE_CACHE_MAX_ENTRIES = 50000
+AFFINITY_CACHE_TTL = 300
+
+
+class LinearScorer:
+    """Weighted sum of log-scaled engagement, exponential recency and author affinity."""
+
+    weights = {
+        'recency': 3.0,
+        'likes': 1.0,
+        'comments': 1.5,
+        'affinity': 2.0,
+    }
+    recency_half_life_hours = 12.0
+
+    def __init__(self, weights=None):
+        if weights:
+            self.weights = {**self.weights, **weights}
+
+    def score(self, features):
+        recency = np.exp2(-features['age_hours'] / self.recency_half_life_hours)
+        return (
+            self.weights['recency'] * recency +
+            self.weights['likes'] * np.log1p(features['like_count']) +
+            self.weights['comments'] * np.log1p(features['comment_count']) +
+            self.weights['affinity'] * np.log1p(features['affinity'])
+        )
+
+
+def get_scorer():
+    scorer_path = getattr(settings, 'FEED_RANKING_SCORER', 'posts.ranking.LinearScorer')
+    return import_string(scorer_path)()
+
+
+class FeatureCache:
+    """Process-local (author_id, created_ts, like_count, comment_count) per post."""
+
+    def __init__(self, ttl=FEATURE_CACHE_TTL, max_entries=FEATURE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, post_ids):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for post_id in post_ids:
+                entry = self._entries.get(post_id)
+                if entry is not None and entry[0] > now:
+                    found[post_id] = entry[1]
+        return found
+
+    def set_many(self, features):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            if len(self._entries) + len(features) > self.max_entries:
+                now = time.monotonic()
+                self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+                if len(self._entries) + len(features) > self.max_entries:
+                    self._entries.clear()
+            for post_id, value in features.items():
+                self._entries[post_id] = (expires, value)
+
+
+feature_cache = FeatureCache()
+
+
+def get_post_features(post_ids):
+    features = feature_cache.get_many(post_ids)
+
+    missing = [post_id for post_id in post_ids if post_id not in features]
+    if missing:
+        rows = Post.objects.filter(id__in=missing).values_list(
+            'id', 'author_id', 'created_at', 'like_count', 'comment_count'
+        )
+        fresh = {
+            post_id: (author_id, created_at.timestamp(), like_count, comment_count)
+            for post_id, author_id, created_at, like_count, comment_count in rows
+        }
+        feature_cache.set_many(fresh)
+        features.update(fresh)
+
+    return features
+
+
+def get_author_affinity(user):
+    cache_key = f'feed:affinity:{user.id}'
+    affinity = cache.get(cache_key)
+    if affinity is None:
+        affinity = {}
+        liked = Like.objects.filter(user=user, is_active=True).values('post__author_id').annotate(total=Count('id'))
+        commented = Comment.objects.filter(author=user, is_active=True).values('post__author_id').annotate(total=Count('id'))
+        for row in list(liked) + list(commented):
+            affinity[row['post__author_id']] = affinity.get(row['post__author_id'], 0) + row['total']
+        cache.set(cache_key, affinity, AFFINITY_CACHE_TTL)
+    return affinity
+
+
+def rank_feed(user, queryset, scorer=None, candidate_limit=FEED_CANDIDATE_LIMIT):
+    candidate_ids = list(queryset.values_list('id', flat=True)[:candidate_limit])
+    if not candidate_ids:
+        return []
+
+    features = get_post_features(candidate_ids)
+    candidate_ids = [post_id for post_id in candidate_ids if post_id in features]
+    affinity = get_author_affinity(user)
+
+    rows = [features[post_id] for post_id in candidate_ids]
+    now = timezone.now().timestamp()
+    created = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+    vectors = {
+        'age_hours': np.maximum(now - created, 0.0) / 3600.0,
+        'like_count': np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)),
+        'comment_count': np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows)),
+        'affinity': np.fromiter((affinity.get(row[0], 0) for row in rows), dtype=np.float64, count=len(rows)),
+    }
+
+    scores = (scorer or get_scorer()).score(vectors)
+    order = np.argsort(-scores, kind='stable')
+    return [candidate_ids[index] for index in order]
@@ -0,0 +1,42 @@
+from users.read_serializers import UserRelations, user_card, user_values
+from utils.read_serializers import datetime_formatter, format_uuid
+
+# Compiled, read-only equivalent of PostSerializer for the feed and post
+# lists. See users.read_serializers.
+
+POST_FIELDS = ('id', 'content', 'image_url', 'category', 'is_active',
+               'like_count', 'comment_count', 'created_at', 'updated_at')
+
+
+def serialize_posts(queryset, loader):
+    """Same output as PostSerializer(queryset, many=True).data."""
+    rows = list(queryset.values(*POST_FIELDS, *user_values('author__')))
+    if not rows:
+        return []
+
+    relations = UserRelations([row['author__id'] for row in rows], loader)
+    liked = loader.liked([row['id'] for row in rows])
+
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': format_uuid(row['id']),
+            'content': row['content'],
+            'image_url': row['image_url'],
+            'category': row['category'],
+            'author': user_card(row, relations, format_datetime, prefix='author__'),
+            'is_active': row['is_active'],
+            'like_count': row['like_count'],
+            'comment_count': row['comment_count'],
+            'created_at': format_datetime(row['created_at']),
+            'updated_at': format_datetime(row['updated_at']),
+            'is_liked_by_user': row['id'] in liked,
+        }
+        for row in rows
+    ]
+
+
+def serialize_posts_in_order(queryset, post_ids, loader):
+    """serialize_posts for the posts of queryset with the given ids, in that order."""
+    posts = {post['id']: post for post in serialize_posts(queryset.filter(id__in=post_ids), loader)}
+    return [posts[str(post_id)] for post_id in post_ids if str(post_id) in posts]
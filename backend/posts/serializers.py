@@ -1,9 +1,29 @@
+from django.core.cache import cache
+from django.db import models
 from rest_framework import serializers
+from .caches import attach_authors
 from .models import Post, Comment, Like
-from users.serializers import UserSerializer
+from users.models import User
+from users.serializers import UserSerializer, AuthorSerializer
+from utils.fragments import FragmentCacheMixin
+from utils.status_loader import status_loader
+
+COMMENTS_PAGE_SIZE = 20
+COMMENTS_CACHE_TTL = 300
+
+def comments_cache_key(post_id):
+    return f'comments:first-page:{post_id}'
+
+class CommentAuthorSerializer(FragmentCacheMixin, serializers.ModelSerializer):
+    avatar_url = serializers.CharField(source='profile.avatar_url', read_only=True, default='')
+    fragment_namespace = 'user'
+    
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'avatar_url']
 
 class CommentSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
+    author = CommentAuthorSerializer(read_only=True)
     
     class Meta:
         model = Comment
@@ -27,12 +47,29 @@ class AdminCommentSerializer(serializers.ModelSerializer):
             }
         return None
 
+class PostListSerializer(serializers.ListSerializer):
+    """
+    Loads like and author follow statuses for the whole list in one query
+    each, and the authors from the two-tier user cache.
+    """
+    
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.Manager) else data)
+        attach_authors(posts, self.context.setdefault('fragment_versions', {}))
+        request = self.context.get('request')
+        if posts and request and request.user.is_authenticated:
+            loader = status_loader(request)
+            loader.liked([post.id for post in posts])
+            loader.following([post.author_id for post in posts])
+        return super().to_representation(posts)
+
 class PostSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
+    author = AuthorSerializer(read_only=True)
     is_liked_by_user = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
+        list_serializer_class = PostListSerializer
         fields = ['id', 'content', 'image_url', 'category', 'author',
                  'is_active', 'like_count', 'comment_count', 'created_at', 'updated_at',
                  'is_liked_by_user']
@@ -40,7 +77,7 @@ class PostSerializer(serializers.ModelSerializer):
     def get_is_liked_by_user(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
+            return status_loader(request).is_liked(obj.id)
         return False
 
 class PostCreateSerializer(serializers.ModelSerializer):
@@ -86,8 +123,8 @@ class PostUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 class PostDetailSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    author = AuthorSerializer(read_only=True)
+    comments = serializers.SerializerMethodField()
     is_liked_by_user = serializers.SerializerMethodField()
     
     class Meta:
@@ -96,10 +133,19 @@ class PostDetailSerializer(serializers.ModelSerializer):
                  'is_active', 'like_count', 'comment_count', 'created_at', 'updated_at',
                  'comments', 'is_liked_by_user']
     
+    def get_comments(self, obj):
+        first_page = cache.get(comments_cache_key(obj.id))
+        if first_page is not None:
+            return first_page['results']
+        comments = Comment.objects.filter(
+            post_id=obj.id, is_active=True
+        ).select_related('author__profile').order_by('-created_at')[:COMMENTS_PAGE_SIZE]
+        return CommentSerializer(comments, many=True).data
+    
     def get_is_liked_by_user(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
+            return status_loader(request).is_liked(obj.id)
         return False
 
 class CommentCreateSerializer(serializers.ModelSerializer):    
@@ -124,11 +170,12 @@ class LikeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'post', 'created_at']
 
 class FeedPostSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
+    author = AuthorSerializer(read_only=True)
     is_liked_by_user = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
+        list_serializer_class = PostListSerializer
         fields = ['id', 'content', 'image_url', 'category', 'author', 
                  'like_count', 'comment_count', 'is_liked_by_user',
                  'created_at']
@@ -137,5 +184,5 @@ class FeedPostSerializer(serializers.ModelSerializer):
     def get_is_liked_by_user(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
+            return status_loader(request).is_liked(obj.id)
         return False
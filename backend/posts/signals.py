@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+from .models import Post, Like, Comment
+from .serializers import comments_cache_key
+from .trending import trending_board, record_like, record_comment, LIKE_WEIGHT
+from users.models import Follow
+from utils.versions import add_dependent, bump, version_key
+
+# Sent by LikePostView after a like actually changed state. The upsert
+# bypasses Like.save(), so post_save receivers do not run for it.
+# Arguments: user, post_id, author_id, category, liked, created.
+like_changed = Signal()
+
+def feed_keys(author_ids):
+    # A feed shows the posts and author cards of everyone its owner
+    # follows, so changes to an author fan out to their followers' feed
+    # versions, and PersonalizedFeedView validates against one key.
+    followers = Follow.objects.filter(
+        following_id__in=author_ids, is_active=True
+    ).values_list('follower_id', flat=True)
+    return [version_key('feed', user_id) for user_id in {*followers, *author_ids}]
+
+add_dependent('posts-by', feed_keys)
+add_dependent('user', feed_keys)
+
+@receiver(post_save, sender=Like)
+def record_like_engagement(sender, instance, created, **kwargs):
+    if instance.is_active and (created or kwargs.get('update_fields') is None):
+        record_like(instance.post)
+
+@receiver(post_save, sender=Comment)
+def record_comment_engagement(sender, instance, created, **kwargs):
+    if created:
+        record_comment(instance.post)
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_comments_cache(sender, instance, **kwargs):
+    cache.delete(comments_cache_key(instance.post_id))
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_versions(sender, instance, **kwargs):
+    bump('post', instance.id)
+    bump('posts-by', instance.author_id)
+    if kwargs.get('created', True):
+        bump('user', instance.author_id)
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def bump_like_versions(sender, instance, **kwargs):
+    bump('likes', instance.user_id)
+
+@receiver(like_changed)
+def handle_like_changed(sender, user, post_id, author_id, category, liked, **kwargs):
+    if liked:
+        trending_board.record(post_id, category, LIKE_WEIGHT)
+    bump('likes', user.id)
+    bump('post', post_id)
+    # Feeds embed like_count and are keyed on the author's posts.
+    bump('posts-by', author_id)
@@ -0,0 +1,178 @@
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from .models import Post
+
+# Scores are kept in log space relative to a fixed epoch, so an event's
+# contribution never has to be re-decayed: log(w) + DECAY_RATE * (t - EPOCH).
+# Comparing two stored scores is equivalent to comparing the decayed
+# hotness of both posts at any common point in time.
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+TRENDING_HALF_LIFE = 6 * 60 * 60
+DECAY_RATE = math.log(2) / TRENDING_HALF_LIFE
+
+TRENDING_TOP_K = 50
+SNAPSHOT_INTERVAL = 30
+SNAPSHOT_CHUNK_SIZE = 500
+SNAPSHOT_LOCK_KEY = 'trending:snapshot-lock'
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+
+ALL_CATEGORIES = 'all'
+
+logger = logging.getLogger(__name__)
+
+
+def event_score(weight, at=None):
+    at = time.time() if at is None else at
+    return math.log(weight) + DECAY_RATE * (at - TRENDING_EPOCH)
+
+
+def log_add(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def hotness(score, at=None):
+    at = time.time() if at is None else at
+    return math.exp(score - DECAY_RATE * (at - TRENDING_EPOCH))
+
+
+class TrendingBoard:
+    """
+    Per-process top-K of trending posts for each category.
+
+    Engagement events are folded into in-memory pending scores; every
+    SNAPSHOT_INTERVAL seconds a background thread writes them to
+    Post.hot_score and rebuilds each board from the (category, -hot_score)
+    index, so workers converge on the same ranking without a DB write per
+    event or any snapshot work on the request path.
+    """
+
+    def __init__(self, top_k=TRENDING_TOP_K, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.top_k = top_k
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._boards = None
+        self._last_snapshot = 0.0
+        self._snapshotting = False
+
+    def record(self, post_id, category, weight, at=None):
+        score = event_score(weight, at)
+        with self._lock:
+            self._merge(post_id, category, score)
+        self.maybe_snapshot()
+
+    def _merge(self, post_id, category, score):
+        previous = self._pending.get(post_id)
+        self._pending[post_id] = (
+            category,
+            score if previous is None else log_add(previous[1], score),
+        )
+
+    def maybe_snapshot(self):
+        """Starts a snapshot on a background thread when one is due and none is running."""
+        with self._lock:
+            if self._snapshotting or time.monotonic() - self._last_snapshot < self.snapshot_interval:
+                return
+            self._snapshotting = True
+            self._last_snapshot = time.monotonic()
+        threading.Thread(target=self._run_snapshot, name='trending-snapshot', daemon=True).start()
+
+    def _run_snapshot(self):
+        try:
+            self.snapshot()
+        except Exception as e:
+            logger.error(f"Error snapshotting trending scores: {e}")
+        finally:
+            self._snapshotting = False
+            connections.close_all()
+
+    def snapshot(self):
+        # One worker writes at a time. The others keep their pending
+        # scores for their next snapshot and only reload the boards.
+        if cache.add(SNAPSHOT_LOCK_KEY, os.getpid(), self.snapshot_interval):
+            try:
+                self._flush()
+            finally:
+                cache.delete(SNAPSHOT_LOCK_KEY)
+
+        boards = self._load_boards()
+        with self._lock:
+            self._boards = boards
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        try:
+            while pending:
+                chunk = list(pending.items())[:SNAPSHOT_CHUNK_SIZE]
+                # One set-wise UPDATE per chunk, adding each post's pending
+                # score to hot_score in log space.
+                delta = Case(
+                    *[When(id=post_id, then=Value(score)) for post_id, (_, score) in chunk],
+                    output_field=FloatField()
+                )
+                Post.objects.filter(id__in=[post_id for post_id, _ in chunk]).update(
+                    hot_score=Greatest(F('hot_score'), delta) +
+                    Ln(Value(1.0) + Exp(-Abs(F('hot_score') - delta)))
+                )
+                for post_id, _ in chunk:
+                    del pending[post_id]
+        except Exception:
+            with self._lock:
+                for post_id, (category, score) in pending.items():
+                    self._merge(post_id, category, score)
+            raise
+
+    def _load_boards(self):
+        return {
+            category: self._load_board(category)
+            for category in [ALL_CATEGORIES] + [choice for choice, _ in Post.CATEGORY_CHOICES]
+        }
+
+    def _load_board(self, category):
+        queryset = Post.objects.filter(is_active=True)
+        if category != ALL_CATEGORIES:
+            queryset = queryset.filter(category=category)
+        return dict(queryset.order_by('-hot_score').values_list('id', 'hot_score')[:self.top_k])
+
+    def top(self, category=ALL_CATEGORIES, limit=None):
+        limit = min(limit or self.top_k, self.top_k)
+        if self._boards is None:
+            # First use in this process: the boards are only read here.
+            boards = self._load_boards()
+            with self._lock:
+                self._boards = self._boards or boards
+        self.maybe_snapshot()
+
+        with self._lock:
+            scores = dict(self._boards.get(category, {}))
+            for post_id, (post_category, score) in self._pending.items():
+                if category != ALL_CATEGORIES and post_category != category:
+                    continue
+                current = scores.get(post_id)
+                scores[post_id] = score if current is None else log_add(current, score)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+trending_board = TrendingBoard()
+
+
+def record_like(post):
+    trending_board.record(post.id, post.category, LIKE_WEIGHT)
+
+
+def record_comment(post):
+    trending_board.record(post.id, post.category, COMMENT_WEIGHT)
@@ -1,15 +1,27 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'posts'
 
+if settings.ASGI_MODE:
+    from .async_views import (
+        AsyncPostListCreateView as PostListCreateView,
+        AsyncPostDetailView as PostDetailView,
+    )
+else:
+    PostListCreateView = views.PostListCreateView
+    PostDetailView = views.PostDetailView
+
 urlpatterns = [
-    path('', views.PostListCreateView.as_view(), name='post-list-create'),
-    path('<uuid:pk>/', views.PostDetailView.as_view(), name='post-detail'),
+    path('', PostListCreateView.as_view(), name='post-list-create'),
+    path('<uuid:pk>/', PostDetailView.as_view(), name='post-detail'),
     
     path('feed/', views.PersonalizedFeedView.as_view(), name='feed'),
+    path('trending/', views.TrendingPostsView.as_view(), name='trending'),
     
     path('<uuid:post_id>/like/', views.LikePostView.as_view(), name='post-like'),
+    path('like-status/', views.LikeStatusBatchView.as_view(), name='post-like-status-batch'),
     path('<uuid:post_id>/like-status/', views.LikeStatusView.as_view(), name='post-like-status'),
     
     path('<uuid:post_id>/comments/', views.CommentListCreateView.as_view(), name='comment-list-create'),
@@ -2,9 +2,26 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
 from django.db.models import Q
 from .models import Post, Comment, Like
-from .serializers import PostSerializer, CommentSerializer, LikeSerializer
+from django.core.cache import cache
+from .serializers import (
+    PostSerializer, CommentSerializer, LikeSerializer,
+    comments_cache_key, COMMENTS_CACHE_TTL
+)
+from .caches import post_cache, attach_authors
+from .pagination import CommentCursorPagination
+from .read_serializers import serialize_posts, serialize_posts_in_order
+from utils.db_router import primary_reads
+from utils.http_cache import ConditionalGetMixin
+from utils.object_cache import CachedObjectMixin
+from utils.versions import version_key
+from utils.status_loader import status_loader, parse_ids
+from utils.upserts import set_active, increment
+from .signals import like_changed
+from .trending import trending_board, hotness, ALL_CATEGORIES
+from .moderation import soft_delete_posts, soft_delete_comments
 from users.models import Follow, User
 from utils.supabase_storage import get_supabase_storage
 from decouple import config
@@ -13,13 +30,15 @@ import os
 
 logger = logging.getLogger(__name__)
 
+BATCH_STATUS_MAX_IDS = 100
+
 def paginate_queryset(queryset, page, page_size=20):
     start_index = (page - 1) * page_size
     end_index = start_index + page_size
     
     items = queryset[start_index:end_index]
     
-    total_items = queryset.count()
+    total_items = len(queryset) if isinstance(queryset, list) else queryset.count()
     total_pages = (total_items + page_size - 1) // page_size
     
     return {
@@ -39,6 +58,8 @@ def paginate_queryset(queryset, page, page_size=20):
 class PostListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
+    read_replica = True
+    query_budget = 10
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -104,10 +125,8 @@ class PostListCreateView(generics.ListCreateAPIView):
         
         paginated_data = paginate_queryset(queryset, page, page_size=20)
         
-        serializer = self.get_serializer(paginated_data['items'], many=True)
-        
         response_data = {
-            'posts': serializer.data,
+            'posts': serialize_posts(paginated_data['items'], status_loader(request)),
             'pagination': paginated_data['pagination']
         }
         
@@ -121,7 +140,7 @@ class PostListCreateView(generics.ListCreateAPIView):
             if image_file:
                 try:
                     if not config('SUPABASE_URL') or not config('SUPABASE_SERVICE_KEY'):
-                        print("WARNING: Supabase credentials not configured. Image upload skipped.")
+                        logger.warning("Supabase credentials not configured. Image upload skipped.")
                         return
                     
                     supabase_storage = get_supabase_storage()
@@ -131,27 +150,54 @@ class PostListCreateView(generics.ListCreateAPIView):
                     post.save(update_fields=['image_url'])
                                         
                 except Exception as e:
-                    print(f"Image upload failed: {str(e)}")
-                    print("Post created successfully but image upload failed")
-            else:
-                print("No image file provided in request")
+                    logger.error(f"Image upload failed, post created without an image: {str(e)}")
                 
         except Exception as e:
-            print(f"Error in perform_create: {str(e)}")
             logger.error(f"Error in perform_create: {str(e)}")
             raise
 
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
+def get_post_author_id(post_id):
+    cache_key = f'post-author:{post_id}'
+    author_id = cache.get(cache_key)
+    if author_id is None:
+        author_id = Post.objects.filter(id=post_id).values_list('author_id', flat=True).first()
+        if author_id is not None:
+            cache.set(cache_key, author_id, None)
+    return author_id
+
+class PostDetailView(ConditionalGetMixin, CachedObjectMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     queryset = Post.objects.all()
+    object_cache = post_cache
+    query_budget = 12
+    
+    def get_version_keys(self, request, *args, **kwargs):
+        return [
+            version_key('post', kwargs['pk']),
+            version_key('user', get_post_author_id(kwargs['pk'])),
+            version_key('follows', request.user.id),
+            version_key('likes', request.user.id),
+        ]
     
     def get_serializer_class(self):
-        print(f"PostDetailView.get_serializer_class called for method: {self.request.method}")
         if self.request.method in ['PUT', 'PATCH']:
             from .serializers import PostUpdateSerializer
             return PostUpdateSerializer
         return PostSerializer
     
+    def get_object(self):
+        post = super().get_object()
+        if self.request.method in ('GET', 'HEAD'):
+            attach_authors([post], getattr(self, 'versions', None))
+        return post
+    
+    def is_visible(self, post):
+        # Same rule as get_queryset, without the followed-authors subquery.
+        user = self.request.user
+        if user.is_staff:
+            return True
+        return post.is_active and (post.author_id == user.id or status_loader(self.request).is_following(post.author_id))
+    
     def get_queryset(self):
         try:
             user = self.request.user
@@ -166,7 +212,7 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
                 except Exception as e:
                     return Post.objects.filter(author=user, is_active=True)
         except Exception as e:
-            print(f"Error in PostDetailView.get_queryset: {e}")
+            logger.error(f"Error in PostDetailView.get_queryset: {e}")
             return Post.objects.filter(author=user, is_active=True)
     
     def perform_update(self, serializer):
@@ -177,7 +223,7 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
             if image_file:
                 try:
                     if not config('SUPABASE_URL') or not config('SUPABASE_SERVICE_KEY'):
-                        print("WARNING: Supabase credentials not configured. Image update skipped.")
+                        logger.warning("Supabase credentials not configured. Image update skipped.")
                         return
                     
                     supabase_storage = get_supabase_storage()
@@ -189,45 +235,38 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
                                 file_path = f"{url_parts[-2]}/{url_parts[-1]}"
                                 supabase_storage.delete_image(file_path)
                         except Exception as e:
-                            print(f"Warning: Could not delete old image: {str(e)}")
+                            logger.warning(f"Could not delete old image: {str(e)}")
                     
                     file_path, public_url = supabase_storage.upload_image(image_file)
                     post.image_url = public_url
                     post.save(update_fields=['image_url'])
                     
                 except Exception as e:
-                    print(f"Image update failed: {str(e)}")
-                    print("Post updated successfully but image update failed")
-
-            else:
-                print("No new image provided for post")
+                    logger.error(f"Image update failed, post updated without it: {str(e)}")
                 
         except Exception as e:
-            print(f"Error in perform_update: {str(e)}")
+            logger.error(f"Error in perform_update: {str(e)}")
             raise
     
     def perform_destroy(self, instance):
-        try:
-            if instance.image_url:
-                try:
-                    supabase_storage = get_supabase_storage()
-                    file_path = instance.image_url.split('/')[-2] + '/' + instance.image_url.split('/')[-1]
-                    supabase_storage.delete_image(file_path)
-                except Exception as e:
-                    print(f"Warning: Could not delete image: {str(e)}")
-        except Exception as e:
-            print(f"Error in perform_destroy: {str(e)}")
-        
-        try:
-            instance.delete()
-        except Exception as e:
-            print(f"Error deleting post instance: {str(e)}")
-            raise
+        # The row, its likes, comments and image go with purge_deleted.
+        soft_delete_posts([instance.id])
 
-class PersonalizedFeedView(generics.ListAPIView):
+class PersonalizedFeedView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
+    read_replica = True
+    query_budget = 14
+    
+    def get_version_keys(self, request, *args, **kwargs):
+        # 'feed' is bumped for every follower when an author changes
+        # (posts.signals.feed_keys).
+        return [
+            version_key('follows', request.user.id),
+            version_key('likes', request.user.id),
+            version_key('feed', request.user.id),
+        ]
     
     def get_queryset(self):
         try:
@@ -252,12 +291,17 @@ class PersonalizedFeedView(generics.ListAPIView):
         
         page = int(request.query_params.get('page', 1))
         
-        paginated_data = paginate_queryset(queryset, page, page_size=20)
-        
-        serializer = self.get_serializer(paginated_data['items'], many=True)
+        if request.query_params.get('mode') == 'ranked':
+            # Deferred: ranking pulls in numpy (see DEFERRED_IMPORTS).
+            from .ranking import rank_feed
+            paginated_data = paginate_queryset(rank_feed(request.user, queryset), page, page_size=20)
+            posts = serialize_posts_in_order(Post.objects.all(), paginated_data['items'], status_loader(request))
+        else:
+            paginated_data = paginate_queryset(queryset, page, page_size=20)
+            posts = serialize_posts(paginated_data['items'], status_loader(request))
         
         response_data = {
-            'posts': serializer.data,
+            'posts': posts,
             'pagination': paginated_data['pagination']
         }
         
@@ -265,45 +309,54 @@ class PersonalizedFeedView(generics.ListAPIView):
 
 class LikePostView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 6
     
     def post(self, request, post_id):
-        post = get_object_or_404(Post, id=post_id)
-        
-        existing_like = Like.objects.filter(user=request.user, post=post).first()
-        
-        if existing_like:
-            if existing_like.is_active:
-                return Response(
-                    {'error': 'You have already liked this post'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            else:
-                existing_like.is_active = True
-                existing_like.save()
-        else:
-            Like.objects.create(user=request.user, post=post)
-        
-        post.update_counts()
-        return Response({'message': 'Post liked successfully'})
+        try:
+            result = set_active(Like, True, user=request.user.id, post=post_id)
+        except IntegrityError:
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        return self.respond(request, post_id, result, liked=True)
     
     def delete(self, request, post_id):
-        post = get_object_or_404(Post, id=post_id)
+        result = set_active(Like, False, user=request.user.id, post=post_id)
+        return self.respond(request, post_id, result, liked=False)
+    
+    def respond(self, request, post_id, result, liked):
+        # Second and last round trip: apply the counter delta on a real
+        # transition, otherwise just read the current count.
+        if result.changed:
+            post = increment(Post, post_id, 'like_count', 1 if liked else -1, returning=('author_id', 'category'))
+        else:
+            post = Post.objects.filter(id=post_id).values('like_count', 'author_id', 'category').first()
         
-        try:
-            like = Like.objects.get(user=request.user, post=post)
-            like.is_active = False
-            like.save()
-            post.update_counts()
-            return Response({'message': 'Post unliked successfully'})
-        except Like.DoesNotExist:
-            return Response(
-                {'error': 'You have not liked this post'}, 
-                status=status.HTTP_400_BAD_REQUEST
+        if post is None:
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if result.changed:
+            like_changed.send(
+                sender=Like, user=request.user, post_id=post_id, author_id=post['author_id'],
+                category=post['category'], liked=liked, created=result.created
             )
+        
+        if liked:
+            message = 'Post liked successfully' if result.changed else 'You have already liked this post'
+        else:
+            message = 'Post unliked successfully' if result.changed else 'You have not liked this post'
+        
+        return Response({
+            'message': message,
+            'is_liked': liked,
+            'like_count': post['like_count'],
+            'changed': result.changed,
+        })
 
-class LikeStatusView(APIView):
+class LikeStatusView(ConditionalGetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_version_keys(self, request, post_id):
+        return [version_key('post', post_id), version_key('likes', request.user.id)]
+    
     def get(self, request, post_id):
         post = get_object_or_404(Post, id=post_id)
         is_liked = Like.objects.filter(user=request.user, post=post, is_active=True).exists()
@@ -314,18 +367,100 @@ class LikeStatusView(APIView):
             'like_count': post.like_count
         })
 
+class LikeStatusBatchView(ConditionalGetMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    max_ids = BATCH_STATUS_MAX_IDS
+    query_budget = 4
+    
+    def get_version_keys(self, request):
+        keys = [version_key('likes', request.user.id)]
+        try:
+            keys += [version_key('post', post_id) for post_id in parse_ids(request, self.max_ids)]
+        except ValueError:
+            pass
+        return keys
+    
+    def get(self, request):
+        try:
+            post_ids = parse_ids(request, self.max_ids)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        like_counts = dict(Post.objects.filter(id__in=post_ids).values_list('id', 'like_count'))
+        liked = status_loader(request).liked(like_counts)
+        
+        return Response({
+            'statuses': {
+                str(post_id): {'is_liked': post_id in liked, 'like_count': like_counts[post_id]}
+                for post_id in post_ids if post_id in like_counts
+            }
+        })
+
+class TrendingPostsView(generics.ListAPIView):
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+    read_replica = True
+    query_budget = 14
+    
+    def list(self, request, *args, **kwargs):
+        category = request.query_params.get('category') or ALL_CATEGORIES
+        valid_categories = [ALL_CATEGORIES] + [choice for choice, _ in Post.CATEGORY_CHOICES]
+        if category not in valid_categories:
+            return Response(
+                {'error': f'Invalid category. Must be one of: {", ".join(valid_categories)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        scores = {str(post_id): score for post_id, score in trending_board.top(category)}
+        visible = Post.objects.filter(is_active=True).filter(
+            Q(author__profile__privacy='public') | Q(author=request.user)
+        )
+        
+        trending_posts = serialize_posts_in_order(visible, list(scores), status_loader(request))
+        for post_data in trending_posts:
+            post_data['trending_score'] = round(hotness(scores[post_data['id']]), 4)
+        
+        return Response({
+            'category': category,
+            'posts': trending_posts
+        })
+
 class CommentListCreateView(generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentCursorPagination
+    read_replica = True
+    query_budget = {'GET': 5, 'POST': 15}
     
     def get_queryset(self):
-        post = get_object_or_404(Post, id=self.kwargs['post_id'])
-        return Comment.objects.filter(post=post, is_active=True).order_by('-created_at')
+        return Comment.objects.filter(
+            post_id=self.kwargs['post_id'], is_active=True
+        ).select_related('author__profile')
+    
+    def list(self, request, *args, **kwargs):
+        is_first_page = self.paginator.cursor_query_param not in request.query_params
+        if is_first_page:
+            cached_page = cache.get(comments_cache_key(self.kwargs['post_id']))
+            if cached_page is not None:
+                return Response(cached_page)
+        
+        if not is_first_page:
+            return super().list(request, *args, **kwargs)
+        
+        # The first page is cached for everyone, so it must not come from
+        # a replica that has not caught up with the latest comments.
+        with primary_reads():
+            response = super().list(request, *args, **kwargs)
+            if not response.data['results']:
+                get_object_or_404(Post, id=self.kwargs['post_id'])
+        cache.set(comments_cache_key(self.kwargs['post_id']), response.data, COMMENTS_CACHE_TTL)
+        
+        return response
     
     def perform_create(self, serializer):
         post = get_object_or_404(Post, id=self.kwargs['post_id'])
-        comment = serializer.save(author=self.request.user, post=post)
-        post.update_counts()
+        serializer.save(author=self.request.user, post=post)
 
 class CommentDeleteView(generics.DestroyAPIView):
     serializer_class = CommentSerializer
@@ -335,17 +470,16 @@ class CommentDeleteView(generics.DestroyAPIView):
         return Comment.objects.filter(author=self.request.user, is_active=True)
     
     def perform_destroy(self, instance):
-        post = instance.post
-        instance.delete()
-        post.update_counts()
+        soft_delete_comments([instance.id])
 
 class AdminPostListView(generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAdminUser]
     pagination_class = None
+    read_replica = True
     
     def get_queryset(self):
-        return Post.objects.all().order_by('-created_at')
+        return Post.objects.filter(deleted_at__isnull=True).order_by('-created_at')
     
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -354,10 +488,8 @@ class AdminPostListView(generics.ListAPIView):
         
         paginated_data = paginate_queryset(queryset, page, page_size=20)
         
-        serializer = self.get_serializer(paginated_data['items'], many=True)
-        
         response_data = {
-            'posts': serializer.data,
+            'posts': serialize_posts(paginated_data['items'], status_loader(request)),
             'pagination': paginated_data['pagination']
         }
         
@@ -369,21 +501,4 @@ class AdminPostDeleteView(generics.DestroyAPIView):
     queryset = Post.objects.all()
     
     def perform_destroy(self, instance):
-        try:
-            if instance.image_url:
-                supabase_storage = get_supabase_storage()
-                file_path = instance.image_url.split('/')[-2] + '/' + instance.image_url.split('/')[-1]
-                supabase_storage.delete_image(file_path)
-        except Exception as e:
-            print(f"Image deletion failed: {str(e)}")
-        
-        if instance.image_url:
-            try:
-                url_parts = instance.image_url.split('/')
-                if len(url_parts) >= 2:
-                    file_path = f"{url_parts[-2]}/{url_parts[-1]}"
-                    supabase_storage.delete_image(file_path)
-            except Exception as e:
-                print(f"Warning: Could not delete image from Supabase: {str(e)}")
-        
-        instance.delete()
+        soft_delete_posts([instance.id])
@@ -1,7 +1,9 @@
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,6 +37,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'utils.metrics.MetricsMiddleware',
+    'utils.rate_limit.RateLimitMiddleware',
+    'utils.query_budget.QueryBudgetMiddleware',
+    'utils.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -65,20 +71,225 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'socialconnect.wsgi.application'
+ASGI_APPLICATION = 'socialconnect.asgi.application'
+
+# ASGI deployment profile: serve socialconnect.asgi with uvicorn workers
+# and route storage-bound and streaming endpoints to their async views.
+ASGI_MODE = config('ASGI_MODE', default=False, cast=bool)
+
+# Per-request SQL instrumentation (utils.query_budget). Views declare
+# query_budget = N; requests over budget or repeating one statement
+# QUERY_REPEAT_THRESHOLD times are logged, or raise in strict mode.
+QUERY_TIMING_HEADERS = config('QUERY_TIMING_HEADERS', default=DEBUG, cast=bool)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
 
 # Database
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.postgresql')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',
-        'USER': 'postgres.sjcfsrzkaomsojuimlhy',
-        'PASSWORD': 'wGNP94adbqJ3LRn3',
-        'HOST': 'aws-1-ap-south-1.pooler.supabase.com',
-        'PORT': '5432',
-        'OPTIONS': {
-            'sslmode': 'require',
-        },
+        'ENGINE': DB_ENGINE,
+        'NAME': config('DB_NAME', default='postgres'),
+        'USER': config('DB_USER', default='postgres.sjcfsrzkaomsojuimlhy'),
+        'PASSWORD': config('DB_PASSWORD', default='wGNP94adbqJ3LRn3'),
+        'HOST': config('DB_HOST', default='aws-1-ap-south-1.pooler.supabase.com'),
+        'PORT': config('DB_PORT', default='5432'),
+        # Keep connections open between requests instead of paying a
+        # TCP + TLS handshake to the pooler on every request, and ping
+        # them before reuse so a dropped connection never reaches a view.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+}
+
+if DB_ENGINE == 'django.db.backends.postgresql':
+    DATABASES['default']['OPTIONS']['sslmode'] = config('DB_SSLMODE', default='require')
+
+# Optional read replica. Read-only views marked with read_replica = True
+# are routed to it unless the client wrote something in the last
+# REPLICA_STICKY_SECONDS (read-your-writes).
+REPLICA_DB_HOST = config('REPLICA_DB_HOST', default='')
+REPLICA_DB_NAME = config('REPLICA_DB_NAME', default='')
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)
+
+if REPLICA_DB_HOST or REPLICA_DB_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': REPLICA_DB_NAME or DATABASES['default']['NAME'],
+        'HOST': REPLICA_DB_HOST or DATABASES['default']['HOST'],
+        'PORT': config('REPLICA_DB_PORT', default=DATABASES['default']['PORT']),
+        'USER': config('REPLICA_DB_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('REPLICA_DB_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_ROUTERS = ['utils.db_router.ReadReplicaRouter']
+    MIDDLEWARE.append('utils.db_router.ReadReplicaMiddleware')
+
+# Bulk moderation: ids per set-wise statement, ids accepted per request,
+# and the batching and claiming of deferred storage deletions.
+MODERATION_CHUNK_SIZE = config('MODERATION_CHUNK_SIZE', default=500, cast=int)
+MODERATION_MAX_IDS = config('MODERATION_MAX_IDS', default=10000, cast=int)
+STORAGE_DELETE_BATCH_SIZE = config('STORAGE_DELETE_BATCH_SIZE', default=100, cast=int)
+STORAGE_DELETE_MAX_ATTEMPTS = config('STORAGE_DELETE_MAX_ATTEMPTS', default=5, cast=int)
+STORAGE_DELETE_CLAIM_SECONDS = config('STORAGE_DELETE_CLAIM_SECONDS', default=300, cast=int)
+
+# Admin exports (?output=csv|ndjson): rows fetched per server-side cursor
+# round trip and encoded per streamed chunk.
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Deleted posts, comments and users are soft-deleted and removed by the
+# purge_deleted command once they are PURGE_DELETED_AFTER_HOURS old,
+# PURGE_BATCH_SIZE rows per transaction.
+PURGE_DELETED_AFTER_HOURS = config('PURGE_DELETED_AFTER_HOURS', default=24, cast=int)
+PURGE_BATCH_SIZE = config('PURGE_BATCH_SIZE', default=200, cast=int)
+
+# Logging
+# Records go through a bounded queue to a background thread that writes
+# JSON lines (LOG_FORMAT=text for plain lines) to stdout. Warnings and
+# errors from one call site are limited to LOG_RATE_LIMIT per
+# LOG_RATE_INTERVAL seconds, then one in LOG_SAMPLE_EVERY is kept.
+# LOG_LEVELS sets per-logger levels, e.g. "posts=DEBUG,django.db.backends=INFO".
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_LEVELS = dict(item.split('=', 1) for item in config('LOG_LEVELS', default='', cast=Csv()) if '=' in item)
+LOG_FORMAT = config('LOG_FORMAT', default='json')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'rate_limit': {
+            '()': 'utils.log.RateLimitFilter',
+            'limit': config('LOG_RATE_LIMIT', default=10, cast=int),
+            'interval': config('LOG_RATE_INTERVAL', default=60, cast=int),
+            'sample_every': config('LOG_SAMPLE_EVERY', default=100, cast=int),
+        },
+    },
+    'formatters': {
+        'json': {'()': 'utils.log.JsonFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'background': {
+            '()': 'utils.log.BackgroundHandler',
+            'queue_size': config('LOG_QUEUE_SIZE', default=10000, cast=int),
+            'formatter': LOG_FORMAT,
+            'filters': ['rate_limit'],
+        },
+    },
+    'root': {
+        'handlers': ['background'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        # Django's own console handler would write these a second time.
+        'django': {'handlers': [], 'level': LOG_LEVEL},
+        **{name.strip(): {'level': level.strip().upper()} for name, level in LOG_LEVELS.items()},
+    },
+}
+
+# Metrics
+# Request, error, SQL and logging counters in the Prometheus text format
+# at /metrics, summed over all workers through the cache. Scrapers send
+# "Authorization: Bearer <METRICS_TOKEN>"; without a token the endpoint
+# is only served when DEBUG is on.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_PUBLISH_INTERVAL = config('METRICS_PUBLISH_INTERVAL', default=15, cast=int)
+METRICS_WORKER_TTL = config('METRICS_WORKER_TTL', default=300, cast=int)
+METRICS_MAX_WORKERS = config('METRICS_MAX_WORKERS', default=64, cast=int)
+
+# Startup
+# Heavy dependencies that must only be imported where they are used, never
+# while loading the app (enforced by check_import_time, which the test
+# suite runs). A preloading gunicorn master imports them before forking;
+# see utils.startup.
+DEFERRED_IMPORTS = ['supabase', 'numpy']
+IMPORT_TIME_BUDGET_MS = config('IMPORT_TIME_BUDGET_MS', default=1500, cast=int)
+
+# Profiling
+# Off unless PROFILING_SAMPLE_RATE > 0; admins can still profile a single
+# request with ?__profile=1. Collapsed stacks are kept in PROFILING_DIR,
+# which must be shared by the workers to aggregate across them.
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_INTERVAL_MS = config('PROFILING_INTERVAL_MS', default=5, cast=int)
+PROFILING_DIR = config('PROFILING_DIR', default=os.path.join(tempfile.gettempdir(), 'socialconnect-profiles'))
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=500, cast=int)
+
+# Cache
+# Version stamps, validators and cached pages must be shared by every
+# worker and instance and updated atomically, so production (DEBUG off)
+# needs Redis or Memcached, e.g. CACHE_BACKEND=
+# django.core.cache.backends.redis.RedisCache with
+# CACHE_LOCATION=redis://host:6379/0. Development defaults to a
+# per-process LocMem cache.
+SHARED_CACHE_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+if not DEBUG and CACHE_BACKEND not in SHARED_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f'CACHE_BACKEND must be one of {", ".join(SHARED_CACHE_BACKENDS)} when DEBUG is off, not {CACHE_BACKEND}'
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    # Rate limit buckets, kept apart so they can use their own store and
+    # are never culled with other entries; see RATE_LIMIT_CACHE_ALIAS.
+    'ratelimit': {
+        'BACKEND': config('RATE_LIMIT_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('RATE_LIMIT_CACHE_LOCATION', default='ratelimit'),
+    },
+}
+if CACHE_BACKEND == 'django.core.cache.backends.locmem.LocMemCache':
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int)}
+if CACHES['ratelimit']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    CACHES['ratelimit']['OPTIONS'] = {'MAX_ENTRIES': config('RATE_LIMIT_CACHE_MAX_ENTRIES', default=100000, cast=int)}
+
+# Two-tier cache
+# Per-process LRU in front of the shared cache for hot reads (object cache
+# entries). Local entries live at most TIERED_CACHE_LOCAL_TTL seconds, and
+# explicit deletes reach other workers within TIERED_CACHE_SYNC_INTERVAL.
+TIERED_CACHE_MAX_ENTRIES = config('TIERED_CACHE_MAX_ENTRIES', default=5000, cast=int)
+TIERED_CACHE_LOCAL_TTL = config('TIERED_CACHE_LOCAL_TTL', default=60, cast=int)
+TIERED_CACHE_SYNC_INTERVAL = config('TIERED_CACHE_SYNC_INTERVAL', default=1.0, cast=float)
+
+# Object cache
+# Post and User/Profile rows for the detail endpoints, keyed by version so
+# writes invalidate them; OBJECT_CACHE_BETA > 1 refreshes hot entries
+# earlier before they expire.
+OBJECT_CACHE_ALIAS = config('OBJECT_CACHE_ALIAS', default='default')
+OBJECT_CACHE_TTL = config('OBJECT_CACHE_TTL', default=300, cast=int)
+OBJECT_CACHE_BETA = config('OBJECT_CACHE_BETA', default=1.0, cast=float)
+
+# Rate limiting
+# Views opt in with rate_limit = '<scope>'. Each scope allows `rate`
+# requests (e.g. '10/minute', '5/15m') in bursts of up to `burst`
+# (default: the rate's count), per client IP or per user ('key': 'user'
+# uses the bearer token's user and falls back to the IP). Set
+# RATE_LIMIT_PROXY_COUNT to the number of proxies in front of the app
+# that append to X-Forwarded-For; without it every client behind a proxy
+# shares one bucket. The cache must have an atomic incr (LocMem, Redis,
+# Memcached) or the app refuses to start. The default per-process LocMem
+# cache counts per worker, so a client can get up to WEB_CONCURRENCY
+# times the rate; point RATE_LIMIT_CACHE_BACKEND at Redis or Memcached
+# to share buckets between workers.
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMIT_CACHE_ALIAS = config('RATE_LIMIT_CACHE_ALIAS', default='ratelimit')
+RATE_LIMIT_PROXY_COUNT = config('RATE_LIMIT_PROXY_COUNT', default=0, cast=int)
+RATE_LIMITS = {
+    'login': {'rate': config('RATE_LIMIT_LOGIN', default='10/minute'), 'key': 'ip'},
+    'register': {'rate': config('RATE_LIMIT_REGISTER', default='10/hour'), 'key': 'ip'},
+    'password-reset': {'rate': config('RATE_LIMIT_PASSWORD_RESET', default='5/hour'), 'key': 'ip'},
+    'verification': {'rate': config('RATE_LIMIT_VERIFICATION', default='5/hour'), 'key': 'ip'},
+    'change-password': {'rate': config('RATE_LIMIT_CHANGE_PASSWORD', default='10/hour'), 'key': 'user'},
 }
 
 # Authentication backends
@@ -129,7 +340,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'utils.renderers.ORJSONRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'utils.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
 }
 
@@ -3,6 +3,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
+from utils.metrics import metrics_view
+from utils.profiling import ProfileListView, ProfileDownloadView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,8 +14,11 @@ urlpatterns = [
     path('api/notifications/', include('notifications.urls')),
     path('api/admin/users/', include('users.admin_urls')),
     path('api/admin/posts/', include('posts.admin_urls')),
+    path('api/admin/profiles/', ProfileListView.as_view(), name='profile-list'),
+    path('api/admin/profiles/download/', ProfileDownloadView.as_view(), name='profile-download'),
     
     path('api/test/', lambda request: HttpResponse('Backend is working!'), name='test'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,28 @@
+from posts.models import Comment, Like, Post
+from users.models import Follow, User
+
+
+def make_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name, password='x', first_name=name.title(), last_name='Test'
+    )
+
+
+def make_network(users=6, posts_per_user=3):
+    """
+    A small social graph: the first user follows everyone else, and
+    every user likes and comments on each other's posts. Returns the
+    first user.
+    """
+    people = [make_user(f'user{number}') for number in range(users)]
+    viewer = people[0]
+    Follow.objects.bulk_create(Follow(follower=viewer, following=other) for other in people[1:])
+    posts = Post.objects.bulk_create(
+        Post(author=author, content=f'post {number} by {author.username}')
+        for author in people for number in range(posts_per_user)
+    )
+    Like.objects.bulk_create(Like(user=user, post=post) for user in people for post in posts if post.author_id != user.id)
+    Comment.objects.bulk_create(
+        Comment(author=user, post=post, content='nice') for user in people[:2] for post in posts if post.author_id != user.id
+    )
+    return viewer
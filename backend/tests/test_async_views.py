@@ -0,0 +1,55 @@
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, TestCase
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from rest_framework_simplejwt.tokens import AccessToken
+from posts.async_views import AsyncPostDetailView
+from posts.models import Post
+from users.models import User
+
+
+class AsyncPostDetailViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='author@example.com', username='author', password='x', first_name='Au', last_name='Thor'
+        )
+        cls.post = Post.objects.create(author=cls.user, content='original')
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.view = AsyncPostDetailView.as_view()
+
+    async def edit(self, method, data):
+        request = getattr(self.factory, method)(
+            f'/api/posts/{self.post.id}/', data=encode_multipart(BOUNDARY, data), content_type=MULTIPART_CONTENT,
+            headers=self.headers
+        )
+        return await self.view(request, pk=self.post.id)
+
+    async def test_multipart_put_updates_the_post(self):
+        response = await self.edit('put', {'content': 'edited', 'category': 'question'})
+        self.assertEqual(response.status_code, 200, response.content)
+        await self.post.arefresh_from_db()
+        self.assertEqual((self.post.content, self.post.category), ('edited', 'question'))
+
+    async def test_multipart_patch_reads_the_image(self):
+        image = SimpleUploadedFile('photo.png', b'not really a png', content_type='image/png')
+        with mock.patch('posts.async_views.storage_configured', return_value=False), \
+                self.assertLogs('posts.async_views', 'WARNING') as logs:
+            response = await self.edit('patch', {'content': 'with a photo', 'image': image})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn('Image update skipped', logs.output[0])
+        await self.post.arefresh_from_db()
+        self.assertEqual(self.post.content, 'with a photo')
+
+    async def test_form_encoded_patch_updates_the_post(self):
+        request = self.factory.patch(
+            f'/api/posts/{self.post.id}/', data='content=form+edit', content_type='application/x-www-form-urlencoded',
+            headers=self.headers
+        )
+        response = await self.view(request, pk=self.post.id)
+        self.assertEqual(response.status_code, 200, response.content)
+        await self.post.arefresh_from_db()
+        self.assertEqual(self.post.content, 'form edit')
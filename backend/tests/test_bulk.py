@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+from unittest import mock
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.test import SimpleTestCase, TestCase
+from posts.models import Comment, Like, Post
+from users.models import User
+from utils.bulk import check_deletable, delete_set, set_value
+from tests.data import make_network
+
+
+class DeleteSetTests(TestCase):
+    def test_deletes_posts_and_their_cascade(self):
+        make_network()
+        posts = Post.objects.filter(author__username='user1')
+        post_ids = list(posts.values_list('id', flat=True))
+        likes = Like.objects.filter(post__in=post_ids).count()
+
+        counts = delete_set(Post.objects.filter(id__in=post_ids))
+
+        self.assertEqual(counts['posts.Post'], len(post_ids))
+        self.assertEqual(counts['posts.Like'], likes)
+        self.assertFalse(Post.objects.filter(id__in=post_ids).exists())
+        self.assertFalse(Comment.objects.filter(post__in=post_ids).exists())
+        self.assertTrue(Post.objects.exists())
+
+
+class OnDeleteHandlerTests(SimpleTestCase):
+    def field(self, on_delete, **kwargs):
+        return models.ForeignKey(User, on_delete=on_delete, **kwargs)
+
+    def test_set_values(self):
+        self.assertIsNone(set_value(self.field(models.SET_NULL, null=True)))
+        self.assertEqual(set_value(self.field(models.SET('fallback'))), 'fallback')
+        self.assertEqual(set_value(self.field(models.SET(lambda: 'called'))), 'called')
+
+    def test_app_models_are_deletable(self):
+        check_deletable(User)
+        check_deletable(Post)
+
+    def test_custom_handlers_fail_the_check(self):
+        def custom(collector, field, sub_objs, using):
+            pass
+
+        relation = SimpleNamespace(related_model=Like, field=SimpleNamespace(name='post', remote_field=SimpleNamespace(on_delete=custom)))
+        with mock.patch('utils.bulk.get_candidate_relations_to_delete', return_value=[relation]):
+            with self.assertRaises(ImproperlyConfigured):
+                check_deletable(Post)
@@ -0,0 +1,170 @@
+from unittest import mock, skipUnless
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from users.models import User
+from utils.db_router import REPLICA_ALIAS, ReadReplicaMiddleware, ReadReplicaRouter, _use_replica, primary_reads
+
+HAS_REPLICA = REPLICA_ALIAS in settings.DATABASES
+
+
+class ReplicaView(APIView):
+    read_replica = True
+
+
+class PrimaryView(APIView):
+    pass
+
+
+class ReadReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+        patcher = mock.patch.dict(settings.DATABASES, {REPLICA_ALIAS: settings.DATABASES['default']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_use_primary_outside_replica_views(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_reads_use_replica_inside_replica_views(self):
+        token = _use_replica.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(User), REPLICA_ALIAS)
+        finally:
+            _use_replica.reset(token)
+
+    def test_primary_reads_overrides_replica_routing(self):
+        token = _use_replica.set(True)
+        try:
+            with primary_reads():
+                self.assertEqual(self.router.db_for_read(User), 'default')
+            self.assertEqual(self.router.db_for_read(User), REPLICA_ALIAS)
+        finally:
+            _use_replica.reset(token)
+
+    def test_reads_use_primary_without_replica(self):
+        del settings.DATABASES[REPLICA_ALIAS]
+        token = _use_replica.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        finally:
+            _use_replica.reset(token)
+
+    def test_writes_and_migrations_use_primary(self):
+        token = _use_replica.set(True)
+        try:
+            self.assertEqual(self.router.db_for_write(User), 'default')
+            self.assertTrue(self.router.allow_migrate('default', 'users'))
+            self.assertFalse(self.router.allow_migrate(REPLICA_ALIAS, 'users'))
+        finally:
+            _use_replica.reset(token)
+
+
+class ReadReplicaMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def sync_middleware(self, view, status=200):
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            self.seen.append(_use_replica.get())
+            return HttpResponse(status=status)
+
+        middleware = ReadReplicaMiddleware(get_response)
+        return middleware
+
+    def async_middleware(self, view, status=200):
+        async def get_response(request):
+            # Django adapts a sync process_view the same way under ASGI.
+            await sync_to_async(middleware.process_view)(request, view, (), {})
+            self.seen.append(_use_replica.get())
+            return HttpResponse(status=status)
+
+        middleware = ReadReplicaMiddleware(get_response)
+        return middleware
+
+    def test_safe_requests_to_replica_views_read_from_replica(self):
+        self.sync_middleware(ReplicaView.as_view())(self.factory.get('/'))
+        self.assertEqual(self.seen, [True])
+        self.assertFalse(_use_replica.get())
+
+    def test_views_without_read_replica_read_from_primary(self):
+        self.sync_middleware(PrimaryView.as_view())(self.factory.get('/'))
+        self.assertEqual(self.seen, [False])
+
+    def test_writes_pin_the_client_to_primary(self):
+        self.sync_middleware(ReplicaView.as_view())(self.factory.post('/'))
+        self.sync_middleware(ReplicaView.as_view())(self.factory.get('/'))
+        self.assertEqual(self.seen, [False, False])
+
+    def test_failed_writes_do_not_pin(self):
+        self.sync_middleware(ReplicaView.as_view(), status=400)(self.factory.post('/'))
+        self.sync_middleware(ReplicaView.as_view())(self.factory.get('/'))
+        self.assertEqual(self.seen, [False, True])
+
+    async def test_async_safe_requests_read_from_replica(self):
+        middleware = self.async_middleware(ReplicaView.as_view())
+        await middleware(self.factory.get('/'))
+        self.assertEqual(self.seen, [True])
+        self.assertFalse(_use_replica.get())
+
+    async def test_async_writes_pin_the_client_to_primary(self):
+        await self.async_middleware(ReplicaView.as_view())(self.factory.post('/'))
+        await self.async_middleware(ReplicaView.as_view())(self.factory.get('/'))
+        self.assertEqual(self.seen, [False, False])
+
+
+@skipUnless(HAS_REPLICA, 'set REPLICA_DB_NAME or REPLICA_DB_HOST to test against a replica')
+class ReplicaRoutingTests(TransactionTestCase):
+    # The runner sets up every alias named here, even for skipped classes.
+    databases = {'default', REPLICA_ALIAS} if HAS_REPLICA else {'default'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='reader@example.com', username='reader', password='x', first_name='Re', last_name='Ader'
+        )
+        self.other = User.objects.create_user(
+            email='writer@example.com', username='writer', password='x', first_name='Wri', last_name='Ter'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_users(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            response = self.client.get('/api/users/')
+        self.assertEqual(response.status_code, 200)
+        return len(primary), len(replica)
+
+    def test_read_only_views_read_from_replica(self):
+        primary, replica = self.get_users()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_reads_after_a_write_use_primary(self):
+        response = self.client.post(f'/api/users/{self.other.id}/follow/')
+        self.assertLess(response.status_code, 400)
+        primary, replica = self.get_users()
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_primary_reads_inside_replica_views(self):
+        token = _use_replica.set(True)
+        try:
+            with CaptureQueriesContext(connections['default']) as primary, primary_reads():
+                list(User.objects.all())
+            with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+                list(User.objects.all())
+        finally:
+            _use_replica.reset(token)
+        self.assertEqual(len(primary), 1)
+        self.assertEqual(len(replica), 1)
@@ -0,0 +1,14 @@
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_startup_imports_within_budget(self):
+        # Fails when app startup goes over IMPORT_TIME_BUDGET_MS or pulls
+        # in a module from DEFERRED_IMPORTS.
+        out = StringIO()
+        try:
+            call_command('check_import_time', runs=3, top=10, stdout=out)
+        except CommandError as e:
+            self.fail(f'{e}\n{out.getvalue()}')
@@ -0,0 +1,53 @@
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from posts.benchmarks import read_endpoints
+from utils.query_audit import audit, capture_queries, full_scans, indexes_used, plans_supported
+from tests.data import make_network
+
+# Partial indexes and an endpoint whose queries should be planned on them.
+PARTIAL_INDEXES = {
+    'posts_post_author_active_idx': 'posts by author',
+    'posts_comment_post_active_idx': 'comments',
+    'users_follow_follower_act_idx': 'feed',
+    'users_follow_following_act_idx': 'user detail',
+    'posts_like_user_active_idx': 'ranked feed',
+}
+
+
+# A dummy default cache makes every endpoint reach the database.
+@override_settings(CACHES={**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+@skipUnless(plans_supported(), 'query plans are only parsed on PostgreSQL and SQLite')
+class EndpointIndexTests(TransactionTestCase):
+    # capture_queries() opens a connection to every database, replicas
+    # included, and the data is committed so that any of them can read it.
+    databases = '__all__'
+
+    def setUp(self):
+        self.viewer = make_network()
+        self.client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.viewer).access_token}')
+        self.endpoints = dict(read_endpoints(self.viewer))
+
+    def test_read_endpoints_never_scan_large_tables(self):
+        for name, path in self.endpoints.items():
+            with self.subTest(name):
+                response, findings = audit(lambda: self.client.get(path))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(findings, [])
+
+    def test_partial_indexes_serve_their_endpoints(self):
+        for index, name in PARTIAL_INDEXES.items():
+            with self.subTest(index):
+                _, statements = capture_queries(lambda: self.client.get(self.endpoints[name]))
+                used = set().union(*(indexes_used(sql, using) for using, sql in statements))
+                self.assertIn(index, used)
+
+
+class UnsupportedVendorTests(TestCase):
+    def test_plans_are_skipped(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            self.assertFalse(plans_supported())
+            self.assertEqual(full_scans('SELECT * FROM posts_post'), [])
+            self.assertEqual(indexes_used('SELECT * FROM posts_post'), set())
@@ -0,0 +1,82 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from notifications.views import NotificationListView
+from posts.models import Post
+from posts.views import (
+    CommentListCreateView, LikePostView, LikeStatusBatchView, PersonalizedFeedView, PostDetailView,
+    PostListCreateView, TrendingPostsView,
+)
+from users.models import User
+from users.views import (
+    DiscoverUsersView, FollowStatusBatchView, UserDetailView, UserFollowersView, UserFollowingView, UserListView,
+)
+from utils.query_budget import QueryBudgetExceeded, query_budget
+from tests.data import make_network
+
+
+def declared_budget(view_class, method):
+    budget = view_class.query_budget
+    return budget[method] if isinstance(budget, dict) else budget
+
+
+# Reads stay on the primary: a replica can't see rows of the test's open
+# transaction. Routing itself is covered by tests.test_db_router.
+@override_settings(DATABASE_ROUTERS=[])
+class DeclaredQueryBudgetTests(TestCase):
+    """Every view that declares a query_budget stays within it on a cold cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = make_network()
+        cls.other = User.objects.exclude(id=cls.viewer.id).first()
+        cls.own_post = Post.objects.filter(author=cls.viewer).first()
+        cls.post = Post.objects.exclude(author=cls.viewer).first()
+
+    def setUp(self):
+        self.client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.viewer).access_token}')
+
+    def assertWithinBudget(self, view_class, method, path, data=None):
+        cache.clear()
+        with query_budget(declared_budget(view_class, method)):
+            response = getattr(self.client, method.lower())(path, data, content_type='application/json')
+        self.assertLess(response.status_code, 400, response.content)
+
+    def test_read_endpoints(self):
+        post_ids = ','.join(str(post_id) for post_id in Post.objects.values_list('id', flat=True))
+        user_ids = ','.join(str(user_id) for user_id in User.objects.values_list('id', flat=True))
+        endpoints = [
+            (PostListCreateView, '/api/posts/'),
+            (PostDetailView, f'/api/posts/{self.post.id}/'),
+            (PersonalizedFeedView, '/api/posts/feed/'),
+            (PersonalizedFeedView, '/api/posts/feed/?mode=ranked'),
+            (TrendingPostsView, '/api/posts/trending/'),
+            (LikeStatusBatchView, f'/api/posts/like-status/?ids={post_ids}'),
+            (CommentListCreateView, f'/api/posts/{self.post.id}/comments/'),
+            (UserListView, '/api/users/'),
+            (UserDetailView, f'/api/users/{self.other.id}/'),
+            (FollowStatusBatchView, f'/api/users/follow-status/?ids={user_ids}'),
+            (UserFollowersView, f'/api/users/{self.other.id}/followers/'),
+            (UserFollowingView, f'/api/users/{self.viewer.id}/following/'),
+            (DiscoverUsersView, '/api/users/discover/'),
+            (NotificationListView, '/api/notifications/'),
+        ]
+        for view_class, path in endpoints:
+            with self.subTest(path):
+                self.assertWithinBudget(view_class, 'GET', path)
+
+    def test_like_and_unlike(self):
+        path = f'/api/posts/{self.own_post.id}/like/'
+        self.assertWithinBudget(LikePostView, 'POST', path)
+        self.assertWithinBudget(LikePostView, 'POST', path)
+        self.assertWithinBudget(LikePostView, 'DELETE', path)
+
+    def test_comment(self):
+        self.assertWithinBudget(CommentListCreateView, 'POST', f'/api/posts/{self.post.id}/comments/', {'content': 'hi'})
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_fails_requests_over_budget(self):
+        with mock.patch.object(LikePostView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.post(f'/api/posts/{self.own_post.id}/like/')
@@ -0,0 +1,56 @@
+from datetime import timedelta
+from unittest import mock
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from posts.models import StorageDeletion
+from posts.moderation import process_storage_deletions
+
+
+class FakeStorage:
+    def __init__(self, test, error=None):
+        self.test = test
+        self.error = error
+        self.deleted = []
+
+    def delete_images(self, paths):
+        # Storage is called with the batch claimed but no transaction open.
+        self.test.assertFalse(connection.in_atomic_block)
+        claimed = StorageDeletion.objects.filter(file_path__in=paths, claimed_until__gt=timezone.now())
+        self.test.assertEqual(claimed.count(), len(paths))
+        if self.error:
+            raise self.error
+        self.deleted.extend(paths)
+
+
+@override_settings(STORAGE_DELETE_MAX_ATTEMPTS=3)
+class ProcessStorageDeletionsTests(TransactionTestCase):
+    def setUp(self):
+        StorageDeletion.objects.bulk_create(StorageDeletion(file_path=f'posts/{number}.png') for number in range(5))
+
+    def process(self, storage, **kwargs):
+        with mock.patch('utils.supabase_storage.get_supabase_storage', return_value=storage):
+            return process_storage_deletions(**kwargs)
+
+    def test_removes_objects_in_batches(self):
+        storage = FakeStorage(self)
+        self.assertEqual(self.process(storage, batch_size=2), (5, 0))
+        self.assertEqual(len(storage.deleted), 5)
+        self.assertFalse(StorageDeletion.objects.exists())
+
+    def test_failed_batches_stay_queued_and_unclaimed(self):
+        self.assertEqual(self.process(FakeStorage(self, error=RuntimeError('storage down')), batch_size=2), (0, 2))
+        failed = StorageDeletion.objects.filter(attempts=1)
+        self.assertEqual(failed.count(), 2)
+        self.assertFalse(failed.filter(claimed_until__isnull=False).exists())
+        self.assertEqual(failed.first().last_error, 'storage down')
+
+    def test_claimed_entries_are_skipped_until_the_claim_expires(self):
+        now = timezone.now()
+        StorageDeletion.objects.filter(file_path='posts/0.png').update(claimed_until=now + timedelta(minutes=5))
+        StorageDeletion.objects.filter(file_path='posts/1.png').update(claimed_until=now - timedelta(minutes=5))
+
+        storage = FakeStorage(self)
+        self.assertEqual(self.process(storage), (4, 0))
+        self.assertNotIn('posts/0.png', storage.deleted)
+        self.assertIn('posts/1.png', storage.deleted)
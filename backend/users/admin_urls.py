@@ -5,6 +5,9 @@ app_name = 'admin'
 
 urlpatterns = [
     path('', admin_views.AdminUserListView.as_view(), name='user-list'),
+    path('export/', admin_views.AdminUserExportView.as_view(), name='user-export'),
+    path('bulk-deactivate/', admin_views.AdminUserBulkDeactivateView.as_view(), name='user-bulk-deactivate'),
+    path('bulk-delete/', admin_views.AdminUserBulkDeleteView.as_view(), name='user-bulk-delete'),
     path('<uuid:pk>/', admin_views.AdminUserDetailView.as_view(), name='user-detail'),
     path('<uuid:pk>/deactivate/', admin_views.AdminUserDeactivateView.as_view(), name='user-deactivate'),
     path('<uuid:pk>/activate/', admin_views.AdminUserActivateView.as_view(), name='user-activate'),
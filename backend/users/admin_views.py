@@ -1,13 +1,19 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
+from .caches import user_cache
 from .serializers import UserSerializer
 from .permissions import IsAdminRole
+from .moderation import deactivate_users, soft_delete_users
 from posts.models import Post
+from utils.bulk import clean_ids
+from utils.exports import ExportMixin
+from utils.object_cache import CachedObjectMixin
 
 User = get_user_model()
 
@@ -15,9 +21,10 @@ class AdminUserListView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAdminRole]
     pagination_class = None
+    read_replica = True
     
     def get_queryset(self):
-        queryset = User.objects.all().order_by('-created_at')
+        queryset = User.objects.filter(deleted_at__isnull=True).order_by('-created_at')
         search = self.request.query_params.get('search', None)
         if search:
             queryset = queryset.filter(
@@ -60,14 +67,34 @@ class AdminUserListView(generics.ListAPIView):
         
         return Response(response_data)
 
-class AdminUserDetailView(generics.RetrieveAPIView):
+class AdminUserExportView(ExportMixin, AdminUserListView):
+    export_filename = 'users'
+    export_columns = [
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+        ('role', 'role'),
+        ('is_active', 'is_active'),
+        ('is_verified', 'is_verified'),
+        ('location', 'profile__location'),
+        ('created_at', 'created_at'),
+        ('last_login', 'last_login'),
+    ]
+
+class AdminUserDetailView(CachedObjectMixin, generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAdminRole]
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
+    object_cache = user_cache
+    
+    def is_visible(self, user):
+        return user.deleted_at is None
 
 class AdminUserDeactivateView(generics.GenericAPIView):
     permission_classes = [IsAdminRole]
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
     
     def post(self, request, pk):
         user = self.get_object()
@@ -77,7 +104,7 @@ class AdminUserDeactivateView(generics.GenericAPIView):
 
 class AdminUserActivateView(generics.GenericAPIView):
     permission_classes = [IsAdminRole]
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
     
     def post(self, request, pk):
         user = self.get_object()
@@ -87,33 +114,66 @@ class AdminUserActivateView(generics.GenericAPIView):
 
 class AdminUserDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAdminRole]
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
     
     def destroy(self, request, *args, **kwargs):
         try:
             user = self.get_object()
             username = user.username
-                        
-            from posts.models import Post, Comment, Like
-            from .models import Follow, EmailVerificationToken, PasswordResetToken
-            
-            posts_count = Post.objects.filter(author=user).count()
-            comments_count = Comment.objects.filter(author=user).count()
-            likes_count = Like.objects.filter(user=user).count()
-            follows_count = Follow.objects.filter(follower=user).count() + Follow.objects.filter(following=user).count()
+            soft_delete_users([user.id])
             
-            user.delete()
-            
-            return Response({'status': f'user {username} deleted permanently'})
+            return Response({'status': f'user {username} deleted'})
         except Exception as e:
             return Response(
                 {'error': f'Failed to delete user: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class AdminUserBulkView(generics.GenericAPIView):
+    permission_classes = [IsAdminRole]
+    
+    def get_user_ids(self, request):
+        user_ids = request.data.get('user_ids', [])
+        if not user_ids:
+            raise ValueError('No user IDs provided')
+        user_ids = clean_ids(user_ids, settings.MODERATION_MAX_IDS)
+        if request.user.id in user_ids:
+            raise ValueError('You cannot include your own account')
+        return user_ids
+
+class AdminUserBulkDeactivateView(AdminUserBulkView):
+    
+    def post(self, request):
+        try:
+            user_ids = self.get_user_ids(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        deactivated_count = deactivate_users(user_ids)
+        
+        return Response({
+            'status': f'{deactivated_count} users deactivated successfully',
+            'deactivated_count': deactivated_count
+        })
+
+class AdminUserBulkDeleteView(AdminUserBulkView):
+    
+    def post(self, request):
+        try:
+            user_ids = self.get_user_ids(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        deleted_count = soft_delete_users(user_ids)
+        
+        return Response({
+            'status': f'{deleted_count} users deleted successfully',
+            'deleted_count': deleted_count
+        })
+
 class AdminUserRoleUpdateView(generics.GenericAPIView):
     permission_classes = [IsAdminRole]
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
     
     def post(self, request, pk):
         user = self.get_object()
@@ -131,6 +191,7 @@ class AdminUserRoleUpdateView(generics.GenericAPIView):
 
 class AdminStatsView(generics.GenericAPIView):
     permission_classes = [IsAdminRole]
+    read_replica = True
     
     def get(self, request):
         today = timezone.now().date()
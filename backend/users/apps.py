@@ -7,3 +7,6 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         import users.signals
+        from utils.bulk import check_deletable
+        from users.models import User
+        check_deletable(User)
@@ -0,0 +1,51 @@
+from decouple import config
+from .models import Profile
+from .views import AvatarUploadView
+from utils.async_views import AsyncAPIView, run_blocking
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncAvatarUploadView(AsyncAPIView):
+    sync_view = AvatarUploadView
+    
+    async def post(self, request):
+        avatar_file = request.FILES.get('avatar')
+        
+        if not avatar_file:
+            return self.respond({
+                'error': 'No avatar file provided'
+            }, status=400)
+        
+        try:
+            if not config('SUPABASE_URL', default='') or not config('SUPABASE_SERVICE_KEY', default=''):
+                return self.respond({
+                    'error': 'Image upload service not configured'
+                }, status=500)
+            
+            from utils.supabase_storage import get_supabase_storage
+            supabase_storage = await run_blocking(get_supabase_storage)
+            
+            file_path, public_url = await run_blocking(supabase_storage.upload_image, avatar_file, folder='avatars')
+            
+            profile = await Profile.objects.aget(user=request.user)
+            
+            if profile.avatar_url:
+                try:
+                    old_file_path = profile.avatar_url.split('/')[-2] + '/' + profile.avatar_url.split('/')[-1]
+                    await run_blocking(supabase_storage.delete_image, old_file_path)
+                except Exception as e:
+                    logger.warning(f"Could not delete old avatar: {str(e)}")
+            
+            profile.avatar_url = public_url
+            await profile.asave()
+            
+            return self.respond({
+                'message': 'Avatar uploaded successfully',
+                'avatar_url': public_url
+            })
+            
+        except Exception as e:
+            return self.respond({
+                'error': f'Avatar upload failed: {str(e)}'
+            }, status=500)
@@ -0,0 +1,62 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from utils.object_cache import ObjectCache, model_fields, from_row, row_values
+from .models import Follow, Profile
+from .read_serializers import count_by
+
+User = get_user_model()
+
+# The password hash never goes into the cache; it is left deferred and
+# loaded on access.
+USER_FIELDS = model_fields(User, exclude=('password',))
+PROFILE_FIELDS = model_fields(Profile)
+
+
+def load_users(user_ids):
+    """User row, profile row and profile counts per id, in four queries."""
+    Post = apps.get_model('posts', 'Post')
+    users = list(User.objects.filter(id__in=user_ids).select_related('profile'))
+    ids = [user.id for user in users]
+    followers = count_by(Follow.objects.filter(following_id__in=ids, is_active=True), 'following_id')
+    following = count_by(Follow.objects.filter(follower_id__in=ids, is_active=True), 'follower_id')
+    posts = count_by(Post.objects.filter(author_id__in=ids, deleted_at__isnull=True), 'author_id')
+
+    payloads = {}
+    for user in users:
+        profile = getattr(user, 'profile', None)
+        payloads[user.id] = (
+            row_values(user, USER_FIELDS),
+            row_values(profile, PROFILE_FIELDS) if profile is not None else None,
+            (followers.get(user.id, 0), following.get(user.id, 0), posts.get(user.id, 0)),
+        )
+    return payloads
+
+
+def build_user(payload):
+    user_values, profile_values, counts = payload
+    user = from_row(User, USER_FIELDS, user_values)
+    profile = None
+    if profile_values is not None:
+        profile = from_row(Profile, PROFILE_FIELDS, profile_values)
+        profile.set_counts(*counts)
+        Profile.user.field.set_cached_value(profile, user)
+    # Caching None as well makes user.profile raise without a query.
+    User.profile.related.set_cached_value(user, profile)
+    return user
+
+
+user_cache = ObjectCache('user', load_users, build_user)
+
+
+def attach_counts(profiles, versions=None):
+    """Sets follower, following and post counts on profiles from the user cache, with one multi-get."""
+    pending = [profile for profile in profiles if profile is not None and profile._counts is None]
+    if not pending:
+        return profiles
+    users = user_cache.get_many([profile.user_id for profile in pending], versions)
+    for profile in pending:
+        user = users.get(str(profile.user_id))
+        cached = User.profile.related.get_cached_value(user, None) if user is not None else None
+        if cached is not None and cached._counts is not None:
+            profile._counts = cached._counts
+    return profiles
@@ -0,0 +1,85 @@
+import statistics
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from utils.rate_limit import RateLimitMiddleware, bucket_key, check_backend
+from users.views import ChangePasswordView, UserLoginView
+
+BENCH_LIMITS = {
+    # Never runs out during a run, so every request is allowed.
+    'allowed': {'rate': '1000000/s', 'key': 'ip'},
+    # One request a day: everything after the first is rejected.
+    'rejected': {'rate': '1/day', 'key': 'ip'},
+    'user': {'rate': '1000000/s', 'key': 'user'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of RateLimitMiddleware; fail when a mean is over budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000, help='Requests timed per case')
+        parser.add_argument('--budget-us', type=float, default=100.0, help='Allowed mean overhead per request')
+        parser.add_argument('--cache', default=None, help='Cache alias (default: settings.RATE_LIMIT_CACHE_ALIAS)')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive')
+        alias = options['cache'] or settings.RATE_LIMIT_CACHE_ALIAS
+        if alias not in settings.CACHES:
+            raise CommandError(f'Unknown cache alias {alias}')
+        check_backend(alias)
+
+        # Scopes unique to this run keep buckets from earlier runs out of the way.
+        run = uuid.uuid4().hex[:8]
+        limits = {**settings.RATE_LIMITS, **{f'bench-{name}-{run}': limit for name, limit in BENCH_LIMITS.items()}}
+        token = AccessToken()
+        token[jwt_settings.USER_ID_CLAIM] = str(uuid.uuid4())
+        cases = [
+            ('no scope', None, UserLoginView, {}, None),
+            ('allowed, per IP', f'bench-allowed-{run}', UserLoginView, {}, None),
+            ('rejected, per IP', f'bench-rejected-{run}', UserLoginView, {}, 429),
+            ('allowed, per user', f'bench-user-{run}', ChangePasswordView, {'HTTP_AUTHORIZATION': f'Bearer {token}'}, None),
+        ]
+
+        factory = RequestFactory()
+        backend = settings.CACHES[alias]['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f'{options["requests"]} requests per case, {alias!r} cache ({backend})')
+        self.stdout.write(f'{"case":<20} {"mean us":>9} {"p50 us":>9} {"p99 us":>9}')
+
+        worst, keys = 0, []
+        with override_settings(RATE_LIMITS=limits, RATE_LIMIT_CACHE_ALIAS=alias, RATE_LIMIT_ENABLED=True):
+            middleware = RateLimitMiddleware(lambda request: None)
+            for name, scope, view_class, headers, expected in cases:
+                view = type(view_class.__name__, (view_class,), {'rate_limit': scope}).as_view()
+                request = factory.post('/', REMOTE_ADDR='198.51.100.7', **headers)
+                if scope:
+                    keys.append(bucket_key(request, scope, limits[scope]['key']))
+                # The first request creates the bucket (and spends the rejected case's only token).
+                middleware.process_view(request, view, (), {})
+
+                timings = []
+                for _ in range(options['requests']):
+                    started = time.perf_counter()
+                    response = middleware.process_view(request, view, (), {})
+                    timings.append((time.perf_counter() - started) * 1_000_000)
+                status = getattr(response, 'status_code', None)
+                if status != expected:
+                    raise CommandError(f'{name}: expected {expected or "no response"}, got {status}')
+
+                timings.sort()
+                mean = statistics.fmean(timings)
+                worst = max(worst, mean)
+                self.stdout.write(
+                    f'{name:<20} {mean:>9.1f} {timings[len(timings) // 2]:>9.1f} {timings[int(len(timings) * 0.99)]:>9.1f}'
+                )
+        caches[alias].delete_many(keys)
+
+        if worst > options['budget_us']:
+            raise CommandError(f'rate limiting takes {worst:.1f}us per request, over the {options["budget_us"]:g}us budget')
+        self.stdout.write(self.style.SUCCESS(f'rate limiting overhead within the {options["budget_us"]:g}us budget'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from users.recommendations import compute_follow_suggestions, DEFAULT_CHUNK_SIZE, SUGGESTIONS_PER_USER
+
+class Command(BaseCommand):
+    help = 'Precompute friends-of-friends follow suggestions for every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--limit', type=int, default=SUGGESTIONS_PER_USER)
+
+    def handle(self, *args, **options):
+        def progress(processed, total, suggestions):
+            self.stdout.write(f'Processed {processed}/{total} users ({suggestions} suggestions)')
+
+        total = compute_follow_suggestions(
+            chunk_size=options['chunk_size'],
+            limit=options['limit'],
+            progress=progress,
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully stored {total} follow suggestions!')
+        )
@@ -1,27 +1,47 @@
+import time
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
 from users.models import Profile
+from utils.seeding import write_rows
+from utils.versions import bump
 
 User = get_user_model()
 
 class Command(BaseCommand):
     help = 'Create missing profiles for existing users'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
     def handle(self, *args, **options):
-        users_without_profiles = User.objects.filter(profile__isnull=True)
+        # One multi-row write per batch instead of an INSERT (and the
+        # profile post_save signals) per user.
+        started = time.perf_counter()
+        created_count = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(profile__isnull=True).values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not user_ids:
+                break
+            now = timezone.now()
+            with transaction.atomic():
+                created_count += write_rows(Profile, (
+                    {'user_id': user_id, 'created_at': now, 'updated_at': now}
+                    for user_id in user_ids
+                ))
+            # Cached users without a profile would otherwise keep showing none.
+            bump('user', *user_ids)
+            self.stdout.write(f'Created {created_count} profiles ({created_count / (time.perf_counter() - started):,.0f}/s)')
         
-        if not users_without_profiles.exists():
+        if not created_count:
             self.stdout.write(
                 self.style.SUCCESS('All users already have profiles!')
             )
             return
         
-        created_count = 0
-        for user in users_without_profiles:
-            Profile.objects.create(user=user)
-            created_count += 1
-            self.stdout.write(f'Created profile for user: {user.username}')
-        
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {created_count} profiles!')
         )
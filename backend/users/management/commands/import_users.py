@@ -0,0 +1,229 @@
+import csv
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from users.models import Profile
+from utils.seeding import analyze, write_rows
+
+User = get_user_model()
+
+TRUE = {'1', 'true', 'yes', 'y', 't'}
+PROFILE_FIELDS = ('bio', 'avatar_url', 'website', 'location', 'privacy')
+ROLES = {value for value, _ in User._meta.get_field('role').choices}
+PRIVACY = {value for value, _ in Profile.PRIVACY_CHOICES}
+
+
+def hash_password(password):
+    # Runs in the pool's worker processes. No password gives an unusable
+    # one, so the user has to reset it before logging in.
+    return make_password(password or None)
+
+
+def read_records(path, input_format):
+    with open(path, newline='', encoding='utf-8') as input_file:
+        if input_format == 'csv':
+            yield from csv.DictReader(input_file)
+            return
+        for line_number, line in enumerate(input_file, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {'_error': f'line {line_number} is not valid JSON'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Import users with their profiles from CSV or NDJSON, in batches that resume from a checkpoint. '
+        'Columns: username, email, first_name, last_name, password or password_hash, role, is_active, '
+        'is_verified, created_at, bio, avatar_url, website, location, privacy'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='input_format', choices=['csv', 'ndjson'],
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes hashing passwords (default: one per CPU)')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: PATH.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be positive')
+        input_format = options['input_format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+
+        state = {'input': os.path.abspath(path), 'position': 0, 'imported': 0, 'skipped': 0, 'invalid': 0}
+        if os.path.exists(checkpoint_path) and not options['restart']:
+            with open(checkpoint_path) as checkpoint_file:
+                saved = json.load(checkpoint_file)
+            if saved.get('input') != state['input']:
+                raise CommandError(f'{checkpoint_path} belongs to {saved.get("input")}; pass --restart or --checkpoint')
+            state.update(saved)
+            self.stdout.write(f"Resuming after {state['position']} records")
+
+        self.now = timezone.now()
+        self.workers = options['workers']
+        records = islice(read_records(path, input_format), state['position'], None)
+        batches = iter(lambda: list(islice(records, options['batch_size'])), [])
+
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        started = time.perf_counter()
+        imported_before = state['imported']
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            # Hashing, the slow part, runs one batch ahead of the inserts.
+            pending = self.prepare(next(batches, None), pool)
+            while pending is not None:
+                batch = pending
+                pending = self.prepare(next(batches, None), pool)
+                self.import_batch(batch, state)
+                self.save_checkpoint(checkpoint_path, state)
+
+                elapsed = time.perf_counter() - started
+                rate = (state['imported'] - imported_before) / elapsed if elapsed else 0
+                self.stdout.write(
+                    f"{state['position']:>10} read {state['imported']:>10} imported {state['skipped']:>8} skipped "
+                    f"{state['invalid']:>8} invalid  {rate:,.0f} users/s"
+                )
+
+        analyze([User, Profile])
+        # Empty input never writes one.
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {state['imported'] - imported_before} users in {elapsed:.1f}s "
+            f"({(state['imported'] - imported_before) / elapsed if elapsed else 0:,.0f}/s); "
+            f"{state['skipped']} already existed, {state['invalid']} invalid"
+        ))
+
+    def prepare(self, records, pool):
+        """(records, valid rows, pending password hashes), or None at the end of the input."""
+        if records is None:
+            return None
+        rows, invalid = [], 0
+        for record in records:
+            row = self.clean(record)
+            if row is None:
+                invalid += 1
+            else:
+                rows.append(row)
+
+        passwords = [row.pop('_password') for row in rows]
+        hashes = pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // (4 * self.workers)))
+        return len(records), rows, invalid, hashes
+
+    def clean(self, record):
+        if '_error' in record:
+            self.stderr.write(record['_error'])
+            return None
+
+        def value(key):
+            return str(record.get(key) or '').strip()
+
+        username, email = value('username'), value('email').lower()
+        try:
+            if not username:
+                raise ValidationError('username is required')
+            User._meta.get_field('username').run_validators(username)
+            validate_email(email)
+        except ValidationError as e:
+            self.stderr.write(f'Skipping {username or email or record!r}: {"; ".join(e.messages)}')
+            return None
+
+        password_hash = value('password_hash')
+        if password_hash:
+            try:
+                identify_hasher(password_hash)
+            except ValueError:
+                self.stderr.write(f'Skipping {username}: unrecognised password_hash')
+                return None
+
+        try:
+            created_at = parse_datetime(value('created_at')) if value('created_at') else None
+        except ValueError:
+            created_at = None
+        if created_at is not None and timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+        created_at = created_at or self.now
+        role = value('role') or 'user'
+        privacy = value('privacy') or 'public'
+
+        return {
+            'id': uuid.uuid4(),
+            'username': username,
+            'email': email,
+            'first_name': value('first_name')[:30],
+            'last_name': value('last_name')[:30],
+            'role': role if role in ROLES else 'user',
+            'is_staff': False,
+            'is_active': value('is_active').lower() in TRUE if value('is_active') else True,
+            'is_verified': value('is_verified').lower() in TRUE if value('is_verified') else True,
+            'date_joined': created_at,
+            'created_at': created_at,
+            'updated_at': self.now,
+            # A password_hash already in a Django format is kept as is.
+            'password': password_hash,
+            '_password': None if password_hash else value('password'),
+            '_profile': {
+                **{field: value(field) for field in PROFILE_FIELDS},
+                'privacy': privacy if privacy in PRIVACY else 'public',
+            },
+        }
+
+    def import_batch(self, batch, state):
+        count, rows, invalid, hashes = batch
+        for row, hashed in zip(rows, hashes):
+            row['password'] = row['password'] or hashed
+
+        # Existing accounts, and repeats within the input, are skipped,
+        # which also makes re-running a batch after a crash harmless.
+        existing_usernames = set(User.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', flat=True))
+        existing_emails = set(User.objects.filter(email__in=[row['email'] for row in rows]).values_list('email', flat=True))
+        new_rows = []
+        for row in rows:
+            if row['username'] in existing_usernames or row['email'] in existing_emails:
+                continue
+            existing_usernames.add(row['username'])
+            existing_emails.add(row['email'])
+            new_rows.append(row)
+
+        profiles = [
+            {'user_id': row['id'], **row.pop('_profile'), 'created_at': row['created_at'], 'updated_at': self.now}
+            for row in new_rows
+        ]
+        # Written directly, without bulk_create (which would overwrite the
+        # imported created_at) or the post_save signals, which would create
+        # each profile with its own INSERT.
+        with transaction.atomic():
+            write_rows(User, new_rows)
+            write_rows(Profile, profiles)
+
+        state['position'] += count
+        state['imported'] += len(new_rows)
+        state['skipped'] += len(rows) - len(new_rows)
+        state['invalid'] += invalid
+
+    def save_checkpoint(self, path, state):
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temporary, path)
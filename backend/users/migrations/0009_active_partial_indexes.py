@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['follower'], include=('following',), name='users_follow_follower_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['following'], include=('follower',), name='users_follow_following_act_idx'),
+        ),
+    ]
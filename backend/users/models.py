@@ -4,9 +4,13 @@ from django.utils import timezone
 import uuid
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 from django.core.exceptions import ValidationError
+import logging
 import secrets
+from utils.dirty_fields import DirtyFieldsMixin
 
-class User(AbstractUser):
+logger = logging.getLogger(__name__)
+
+class User(DirtyFieldsMixin, AbstractUser):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField(unique=True)
     username = models.CharField(max_length=30, unique=True, validators=[
@@ -22,10 +26,29 @@ class User(AbstractUser):
     is_verified = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the account is deleted; the row is removed later by purge_deleted.
+    deleted_at = models.DateTimeField(null=True, blank=True)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='users_user_deleted_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Saves a profile edited through this user. Only one already
+        # loaded can hold edits, and it is written only if it changed;
+        # this runs even when the user itself had nothing to save.
+        try:
+            profile = User.profile.related.get_cached_value(self, None)
+            if profile is not None and profile.is_dirty():
+                profile.save()
+        except Exception as e:
+            logger.error(f"Error saving profile for user {self.username}: {e}")
+    
     def __str__(self):
         try:
             if hasattr(self, 'first_name') and hasattr(self, 'last_name') and hasattr(self, 'username'):
@@ -98,7 +121,7 @@ class EmailVerificationToken(models.Model):
                 expires_at=expires_at
             )
         except Exception as e:
-            print(f"Error creating verification token: {e}")
+            logger.error(f"Error creating verification token: {e}")
             return None
 
 class PasswordResetToken(models.Model):
@@ -147,7 +170,7 @@ class PasswordResetToken(models.Model):
                 expires_at=expires_at
             )
         except Exception as e:
-            print(f"Error creating password reset token: {e}")
+            logger.error(f"Error creating password reset token: {e}")
             return None
 
 class InvalidatedRefreshToken(models.Model):
@@ -198,7 +221,7 @@ class InvalidatedRefreshToken(models.Model):
             )
             return True
         except Exception as e:
-            print(f"Error invalidating token: {e}")
+            logger.error(f"Error invalidating token: {e}")
             return False
     
     @classmethod
@@ -206,9 +229,9 @@ class InvalidatedRefreshToken(models.Model):
         try:
             cls.objects.filter(expires_at__lt=timezone.now()).delete()
         except Exception as e:
-            print(f"Error cleaning up expired tokens: {e}")
+            logger.error(f"Error cleaning up expired tokens: {e}")
 
-class Profile(models.Model):
+class Profile(DirtyFieldsMixin, models.Model):
     PRIVACY_CHOICES = [
         ('public', 'Public'),
         ('private', 'Private'),
@@ -232,40 +255,52 @@ class Profile(models.Model):
         except Exception as e:
             return "User Profile"
     
+    # Counts preloaded by users.caches; None means query on access.
+    _counts = None
+    
+    def set_counts(self, followers, following, posts):
+        self._counts = {'followers': followers, 'following': following, 'posts': posts}
+    
     @property
     def followers_count(self):
+        if self._counts is not None:
+            return self._counts['followers']
         try:
             if hasattr(self, 'user') and self.user:
                 if hasattr(self.user, 'followers_set'):
                     try:
                         return self.user.followers_set.filter(is_active=True).count()
                     except Exception as query_error:
-                        print(f"Error querying followers_set: {query_error}")
+                        logger.error(f"Error querying followers_set: {query_error}")
                         return 0
                 return 0
             return 0
         except Exception as e:
-            print(f"Error getting followers_count: {e}")
+            logger.error(f"Error getting followers_count: {e}")
             return 0
     
     @property
     def following_count(self):
+        if self._counts is not None:
+            return self._counts['following']
         try:
             if hasattr(self, 'user') and self.user:
                 if hasattr(self.user, 'following_set'):
                     try:
                         return self.user.following_set.filter(is_active=True).count()
                     except Exception as query_error:
-                        print(f"Error querying following_set: {query_error}")
+                        logger.error(f"Error querying following_set: {query_error}")
                         return 0
                 return 0
             return 0
         except Exception as e:
-            print(f"Error getting following_count: {e}")
+            logger.error(f"Error getting following_count: {e}")
             return 0
     
     @property
     def posts_count(self):
+        if self._counts is not None:
+            return self._counts['posts']
         try:
             if hasattr(self, 'user') and self.user:
                 try:
@@ -273,17 +308,17 @@ class Profile(models.Model):
                     Post = apps.get_model('posts', 'Post')
                     if Post:
                         try:
-                            return Post.objects.filter(author=self.user).count()
+                            return Post.objects.filter(author=self.user, deleted_at__isnull=True).count()
                         except Exception as query_error:
-                            print(f"Error querying posts: {query_error}")
+                            logger.error(f"Error querying posts: {query_error}")
                             return 0
                     return 0
                 except Exception as model_error:
-                    print(f"Error getting Post model: {model_error}")
+                    logger.error(f"Error getting Post model: {model_error}")
                     return 0
             return 0
         except Exception as e:
-            print(f"Error getting posts_count: {e}")
+            logger.error(f"Error getting posts_count: {e}")
             return 0
     
     def can_be_viewed_by(self, viewer):
@@ -305,11 +340,11 @@ class Profile(models.Model):
                         try:
                             return Follow.objects.filter(follower=viewer, following=self.user, is_active=True).exists()
                         except Exception as query_error:
-                            print(f"Error querying Follow model: {query_error}")
+                            logger.error(f"Error querying Follow model: {query_error}")
                             return False
                     return False
                 except Exception as e:
-                    print(f"Error checking followers_only privacy: {e}")
+                    logger.error(f"Error checking followers_only privacy: {e}")
                     return False
             
             if privacy == 'private':
@@ -317,7 +352,7 @@ class Profile(models.Model):
             
             return False
         except Exception as e:
-            print(f"Error in can_be_viewed_by: {e}")
+            logger.error(f"Error in can_be_viewed_by: {e}")
             return False
 
 class Follow(models.Model):
@@ -332,6 +367,10 @@ class Follow(models.Model):
         indexes = [
             models.Index(fields=['follower', 'created_at']),
             models.Index(fields=['following', 'created_at']),
+            # Index-only scans for "who does X follow" (feeds) and follower
+            # counts; INCLUDE is PostgreSQL-only and ignored elsewhere.
+            models.Index(fields=['follower'], include=['following'], condition=models.Q(is_active=True), name='users_follow_follower_act_idx'),
+            models.Index(fields=['following'], include=['follower'], condition=models.Q(is_active=True), name='users_follow_following_act_idx'),
         ]
     
     def __str__(self):
@@ -348,12 +387,28 @@ class Follow(models.Model):
             if self.follower == self.following:
                 raise ValidationError("Users cannot follow themselves.")
         except Exception as e:
-            print(f"Error in Follow.clean(): {e}")
+            logger.warning(f"Error in Follow.clean(): {e}")
     
     def save(self, *args, **kwargs):
         try:
             self.clean()
             super().save(*args, **kwargs)
         except Exception as e:
-            print(f"Error in Follow.save(): {e}")
+            logger.error(f"Error in Follow.save(): {e}")
             super().save(*args, **kwargs)
+
+class FollowSuggestion(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='follow_suggestions')
+    suggested_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='suggested_to')
+    mutual_count = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        unique_together = ('user', 'suggested_user')
+        indexes = [
+            models.Index(fields=['user', '-mutual_count']),
+        ]
+    
+    def __str__(self):
+        return f"Suggest {self.suggested_user_id} to {self.user_id} ({self.mutual_count} mutual)"
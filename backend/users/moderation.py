@@ -0,0 +1,155 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.utils import timezone
+from notifications.models import Notification
+from posts.models import Post, Comment, Like
+from posts.moderation import (
+    collect_post_deletion, delete_comments, delete_likes, delete_notifications, purge_posts,
+    queue_storage_deletions, refresh_post_counts, schedule_storage_cleanup,
+)
+from posts.serializers import comments_cache_key
+from utils.bulk import Invalidations, chunked, delete_set, purge_in_batches
+from .models import Follow, Profile
+
+User = get_user_model()
+
+# Bulk user moderation and purging; see posts.moderation.
+
+
+def deactivate_users(user_ids):
+    """Deactivates the users with the given ids; returns how many were active."""
+    invalidations = Invalidations()
+    deactivated = 0
+
+    with transaction.atomic():
+        for chunk in chunked(user_ids, settings.MODERATION_CHUNK_SIZE):
+            active_ids = list(User.objects.filter(id__in=chunk, is_active=True).values_list('id', flat=True))
+            invalidations.bump('user', active_ids)
+            deactivated += User.objects.filter(id__in=active_ids, is_active=True).update(is_active=False)
+
+        invalidations.on_commit()
+
+    return deactivated
+
+
+def soft_delete_users(user_ids):
+    """
+    Deactivates the users with the given ids, marks them deleted and hides
+    their posts. Everything else they own is removed later by
+    purge_deleted_users. Returns how many users were marked.
+    """
+    invalidations = Invalidations()
+    deleted_at = timezone.now()
+    deleted = 0
+
+    with transaction.atomic():
+        for chunk in chunked(user_ids, settings.MODERATION_CHUNK_SIZE):
+            users = User.objects.filter(id__in=chunk, deleted_at__isnull=True)
+            marked_ids = list(users.values_list('id', flat=True))
+            posts = Post.objects.filter(author_id__in=marked_ids, deleted_at__isnull=True)
+
+            invalidations.bump('user', marked_ids)
+            invalidations.bump('posts-by', marked_ids)
+            invalidations.bump('post', posts.values_list('id', flat=True))
+
+            posts.update(is_active=False, deleted_at=deleted_at)
+            deleted += User.objects.filter(id__in=marked_ids).update(is_active=False, deleted_at=deleted_at)
+
+        invalidations.on_commit()
+
+    return deleted
+
+
+def delete_users(user_ids):
+    """
+    Permanently deletes the users with the given ids and everything they
+    own, recounts likes and comments on other users' posts they touched,
+    and queues their post images and avatars for removal. Returns the
+    number of users deleted.
+    """
+    invalidations = Invalidations()
+    touched_post_ids = set()
+    deleted = 0
+
+    with transaction.atomic():
+        for chunk in chunked(user_ids, settings.MODERATION_CHUNK_SIZE):
+            users = User.objects.filter(id__in=chunk)
+            collect_post_deletion(Post.objects.filter(author_id__in=chunk), invalidations)
+            queue_storage_deletions(Profile.objects.filter(
+                user_id__in=chunk, avatar_url__isnull=False
+            ).values_list('avatar_url', flat=True))
+
+            commented = set(Comment.objects.filter(author_id__in=chunk).values_list('post_id', flat=True).distinct())
+            liked = set(Like.objects.filter(user_id__in=chunk).values_list('post_id', flat=True).distinct())
+            touched_post_ids |= commented | liked
+            invalidations.bump('post', commented | liked)
+            invalidations.delete(comments_cache_key(post_id) for post_id in commented)
+
+            followers = set(Follow.objects.filter(following_id__in=chunk).values_list('follower_id', flat=True))
+            followed = set(Follow.objects.filter(follower_id__in=chunk).values_list('following_id', flat=True))
+            invalidations.bump('follows', followers)
+            invalidations.bump('user', followers | followed | set(chunk))
+            invalidations.bump('notifications', Notification.objects.filter(
+                sender_id__in=chunk
+            ).values_list('recipient_id', flat=True).distinct())
+
+            deleted += delete_set(users)[User._meta.label]
+
+        # Posts deleted with their authors simply no longer match.
+        refresh_post_counts(touched_post_ids)
+
+        invalidations.on_commit()
+        transaction.on_commit(schedule_storage_cleanup)
+
+    return deleted
+
+
+def delete_follows(follow_ids):
+    invalidations = Invalidations()
+    follows = Follow.objects.filter(id__in=follow_ids)
+    rows = list(follows.values_list('follower_id', 'following_id'))
+    delete_set(follows)
+
+    followers = {follower_id for follower_id, _ in rows}
+    invalidations.bump('follows', followers)
+    invalidations.bump('user', followers | {following_id for _, following_id in rows})
+    invalidations.on_commit()
+
+
+def purge_user(user_id, batch_size, pause=0):
+    """
+    Removes one user's rows table by table in batches of batch_size, each
+    in its own transaction, then deletes the user itself.
+    """
+    handlers = {
+        Like: delete_likes,
+        Comment: delete_comments,
+        Follow: delete_follows,
+        Notification: delete_notifications,
+    }
+
+    for relation in get_candidate_relations_to_delete(User._meta):
+        if relation.on_delete is not models.CASCADE:
+            continue
+        related = relation.related_model._base_manager.filter(**{relation.field.name: user_id})
+        if relation.related_model is Post:
+            purge_posts(related, batch_size, pause=pause)
+        else:
+            purge_in_batches(related, batch_size, handlers.get(relation.related_model), pause=pause)
+
+    return delete_users([user_id])
+
+
+def purge_deleted_users(cutoff, batch_size, progress=None, pause=0):
+    """Removes users soft-deleted before cutoff, one user at a time."""
+    user_ids = list(User.objects.filter(deleted_at__lte=cutoff).values_list('id', flat=True))
+    purged = 0
+
+    for user_id in user_ids:
+        purged += purge_user(user_id, batch_size, pause)
+        if progress:
+            progress(User, purged)
+
+    return purged
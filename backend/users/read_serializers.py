@@ -0,0 +1,115 @@
+from django.apps import apps
+from django.db.models import Count
+from utils.read_serializers import datetime_formatter, format_uuid, prefixed
+from .models import Follow
+
+# Compiled, read-only equivalents of UserBasicSerializer, UserSerializer,
+# ProfileSerializer and FollowSerializer for hot list endpoints. They
+# consume .values() rows and return the same data the DRF serializers
+# would, with the per-row count queries batched per page and the viewer's
+# follow statuses taken from the request's StatusLoader.
+
+USER_BASIC_FIELDS = ('id', 'username', 'first_name', 'last_name')
+USER_FIELDS = USER_BASIC_FIELDS + ('email', 'role', 'is_verified', 'is_staff', 'created_at')
+PROFILE_FIELDS = ('id', 'bio', 'avatar_url', 'website', 'location', 'privacy', 'created_at', 'updated_at')
+
+
+def user_basic_values(prefix=''):
+    return prefixed(prefix, USER_BASIC_FIELDS)
+
+
+def user_values(prefix=''):
+    return prefixed(prefix, USER_FIELDS) + prefixed(prefix + 'profile__', PROFILE_FIELDS)
+
+
+def user_basic_card(row, prefix=''):
+    return {
+        'id': format_uuid(row[prefix + 'id']),
+        'username': row[prefix + 'username'],
+        'first_name': row[prefix + 'first_name'],
+        'last_name': row[prefix + 'last_name'],
+    }
+
+
+def count_by(queryset, field):
+    return dict(queryset.order_by().values_list(field).annotate(total=Count('id')))
+
+
+class UserRelations:
+    """Profile counts and the viewer's follows for one page of users."""
+
+    __slots__ = ('followers', 'following', 'posts', 'followed_by_viewer')
+
+    def __init__(self, user_ids, loader):
+        user_ids = list(set(user_ids))
+        Post = apps.get_model('posts', 'Post')
+        self.followers = count_by(Follow.objects.filter(following_id__in=user_ids, is_active=True), 'following_id')
+        self.following = count_by(Follow.objects.filter(follower_id__in=user_ids, is_active=True), 'follower_id')
+        self.posts = count_by(Post.objects.filter(author_id__in=user_ids, deleted_at__isnull=True), 'author_id')
+        self.followed_by_viewer = loader.following(user_ids)
+
+
+def user_card(row, relations, format_datetime, prefix=''):
+    user_id = row[prefix + 'id']
+    first_name = row[prefix + 'first_name']
+    last_name = row[prefix + 'last_name']
+
+    profile = None
+    if row[prefix + 'profile__id'] is not None:
+        profile_prefix = prefix + 'profile__'
+        profile = {
+            'bio': row[profile_prefix + 'bio'],
+            'avatar_url': row[profile_prefix + 'avatar_url'],
+            'website': row[profile_prefix + 'website'],
+            'location': row[profile_prefix + 'location'],
+            'privacy': row[profile_prefix + 'privacy'],
+            'followers_count': relations.followers.get(user_id, 0),
+            'following_count': relations.following.get(user_id, 0),
+            'posts_count': relations.posts.get(user_id, 0),
+            'created_at': format_datetime(row[profile_prefix + 'created_at']),
+            'updated_at': format_datetime(row[profile_prefix + 'updated_at']),
+        }
+
+    return {
+        'id': format_uuid(user_id),
+        'username': row[prefix + 'username'],
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': row[prefix + 'email'],
+        'role': row[prefix + 'role'],
+        'is_verified': row[prefix + 'is_verified'],
+        'created_at': format_datetime(row[prefix + 'created_at']),
+        'profile': profile,
+        'full_name': f'{first_name} {last_name}',
+        'is_admin': row[prefix + 'role'] == 'admin' or row[prefix + 'is_staff'],
+        'is_following': user_id in relations.followed_by_viewer,
+    }
+
+
+def serialize_users(queryset, loader):
+    """Same output as UserSerializer(queryset, many=True).data."""
+    rows = list(queryset.values(*user_values()))
+    relations = UserRelations([row['id'] for row in rows], loader)
+    format_datetime = datetime_formatter()
+    return [user_card(row, relations, format_datetime) for row in rows]
+
+
+def serialize_users_in_order(queryset, user_ids, loader):
+    """serialize_users for the users of queryset with the given ids, in that order."""
+    users = {user['id']: user for user in serialize_users(queryset.filter(id__in=user_ids), loader)}
+    return [users[str(user_id)] for user_id in user_ids if str(user_id) in users]
+
+
+def serialize_follows(queryset):
+    """Same output as FollowSerializer(queryset, many=True).data."""
+    rows = queryset.values('id', 'created_at', *user_basic_values('follower__'), *user_basic_values('following__'))
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': format_uuid(row['id']),
+            'follower': user_basic_card(row, 'follower__'),
+            'following': user_basic_card(row, 'following__'),
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,100 @@
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .models import Follow, FollowSuggestion
+
+SUGGESTIONS_PER_USER = 50
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class FollowGraph:
+    """Active follow edges as a CSR adjacency list over integer user indices."""
+
+    def __init__(self, user_ids, indptr, indices):
+        self.user_ids = user_ids
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def load(cls, batch_size=10000):
+        edges = Follow.objects.filter(
+            is_active=True,
+            follower__is_active=True,
+            following__is_active=True,
+        ).values_list('follower_id', 'following_id').iterator(chunk_size=batch_size)
+
+        index_of = {}
+        followers = []
+        followings = []
+        for follower_id, following_id in edges:
+            followers.append(index_of.setdefault(follower_id, len(index_of)))
+            followings.append(index_of.setdefault(following_id, len(index_of)))
+
+        user_ids = list(index_of)
+        followers = np.asarray(followers, dtype=np.int64)
+        followings = np.asarray(followings, dtype=np.int64)
+
+        order = np.argsort(followers, kind='stable')
+        indices = followings[order]
+        indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(followers, minlength=len(user_ids)), out=indptr[1:])
+        return cls(user_ids, indptr, indices)
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def following(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def following_of_all(self, nodes):
+        starts = self.indptr[nodes]
+        lengths = self.indptr[nodes + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return self.indices[:0]
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.indices[offsets + np.arange(total)]
+
+    def suggestions_for(self, node, limit=SUGGESTIONS_PER_USER):
+        followed = self.following(node)
+        if len(followed) == 0:
+            return []
+
+        candidates, mutual_counts = np.unique(self.following_of_all(followed), return_counts=True)
+        keep = ~np.isin(candidates, followed, assume_unique=True) & (candidates != node)
+        candidates = candidates[keep]
+        mutual_counts = mutual_counts[keep]
+
+        top = np.argsort(-mutual_counts, kind='stable')[:limit]
+        return list(zip(candidates[top].tolist(), mutual_counts[top].tolist()))
+
+
+def compute_follow_suggestions(chunk_size=DEFAULT_CHUNK_SIZE, limit=SUGGESTIONS_PER_USER, progress=None):
+    graph = FollowGraph.load()
+    computed_at = timezone.now()
+    total_suggestions = 0
+
+    for start in range(0, len(graph), chunk_size):
+        nodes = range(start, min(start + chunk_size, len(graph)))
+        chunk_user_ids = [graph.user_ids[node] for node in nodes]
+
+        rows = []
+        for node in nodes:
+            for candidate, mutual_count in graph.suggestions_for(node, limit=limit):
+                rows.append(FollowSuggestion(
+                    user_id=graph.user_ids[node],
+                    suggested_user_id=graph.user_ids[candidate],
+                    mutual_count=mutual_count,
+                    computed_at=computed_at,
+                ))
+
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user_id__in=chunk_user_ids).delete()
+            FollowSuggestion.objects.bulk_create(rows, batch_size=chunk_size)
+
+        total_suggestions += len(rows)
+        if progress:
+            progress(start + len(chunk_user_ids), len(graph), total_suggestions)
+
+    FollowSuggestion.objects.filter(computed_at__lt=computed_at).delete()
+    return total_suggestions
@@ -1,7 +1,11 @@
 from rest_framework import serializers
+from django.db import models
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from .caches import attach_counts
 from .models import User, Profile, Follow
+from utils.fragments import FragmentCacheMixin
+from utils.status_loader import status_loader
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -72,6 +76,12 @@ class ProfileSerializer(serializers.ModelSerializer):
                  'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
     
+    def to_representation(self, instance):
+        # Counts come from the two-tier user cache, sharing the version
+        # lookups FragmentCacheMixin memoises on the context.
+        attach_counts([instance], self.context.setdefault('fragment_versions', {}))
+        return super().to_representation(instance)
+    
     def get_followers_count(self, obj):
         try:
             return obj.followers_count
@@ -96,6 +106,17 @@ class UserBasicSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'first_name', 'last_name']
 
+class UserListSerializer(serializers.ListSerializer):
+    """Loads the viewer's follow status and the profile counts for the whole list at once."""
+    
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, models.Manager) else data)
+        attach_counts([getattr(user, 'profile', None) for user in users], self.context.setdefault('fragment_versions', {}))
+        request = self.context.get('request')
+        if users and request and request.user.is_authenticated:
+            status_loader(request).following([user.id for user in users])
+        return super().to_representation(users)
+
 class UserSerializer(serializers.ModelSerializer):
     profile = ProfileSerializer(read_only=True)
     full_name = serializers.ReadOnlyField()
@@ -104,6 +125,7 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
+        list_serializer_class = UserListSerializer
         fields = ['id', 'username', 'first_name', 'last_name', 'email', 'role', 
                  'is_verified', 'created_at', 'profile', 'full_name', 'is_admin', 'is_following']
         read_only_fields = ['id', 'email', 'role', 'is_verified', 'created_at', 'full_name', 'is_admin']
@@ -112,12 +134,24 @@ class UserSerializer(serializers.ModelSerializer):
         try:
             request = self.context.get('request')
             if request and request.user.is_authenticated:
-                from .models import Follow
-                return Follow.objects.filter(follower=request.user, following=obj, is_active=True).exists()
+                return status_loader(request).is_following(obj.id)
             return False
         except Exception:
             return False
 
+class AuthorSerializer(FragmentCacheMixin, UserSerializer):
+    fragment_namespace = 'user'
+    fragment_dynamic_fields = ('is_following',)
+
+class SuggestedUserSerializer(UserSerializer):
+    mutual_followers_count = serializers.SerializerMethodField()
+    
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['mutual_followers_count']
+    
+    def get_mutual_followers_count(self, obj):
+        return getattr(obj, 'mutual_followers_count', 0)
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     profile = ProfileSerializer()
     
@@ -1,9 +1,17 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
 from django.contrib.auth import get_user_model
-from .models import Profile
+from .models import Profile, Follow
+from utils.versions import bump
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Sent by FollowUserView/UnfollowUserView after a follow actually changed
+# state; the upsert bypasses Follow.save(). Arguments: follower,
+# following_id, followed, created.
+follow_changed = Signal()
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -11,12 +19,23 @@ def create_user_profile(sender, instance, created, **kwargs):
         try:
             Profile.objects.get_or_create(user=instance)
         except Exception as e:
-            print(f"Error creating profile for user {instance.username}: {e}")
+            logger.error(f"Error creating profile for user {instance.username}: {e}")
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    try:
-        if hasattr(instance, 'profile') and instance.profile:
-            instance.profile.save()
-    except Exception as e:
-        print(f"Error saving profile for user {instance.username}: {e}")
+def bump_user_version(sender, instance, **kwargs):
+    bump('user', instance.id)
+
+@receiver(post_save, sender=Profile)
+def bump_profile_version(sender, instance, **kwargs):
+    bump('user', instance.user_id)
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_versions(sender, instance, **kwargs):
+    bump('follows', instance.follower_id)
+    bump('user', instance.follower_id, instance.following_id)
+
+@receiver(follow_changed)
+def handle_follow_changed(sender, follower, following_id, **kwargs):
+    bump('follows', follower.id)
+    bump('user', follower.id, following_id)
@@ -1,8 +1,14 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'users'
 
+if settings.ASGI_MODE:
+    from .async_views import AsyncAvatarUploadView as AvatarUploadView
+else:
+    AvatarUploadView = views.AvatarUploadView
+
 urlpatterns = [
     path('register/', views.UserRegistrationView.as_view(), name='user-register'),
     path('login/', views.UserLoginView.as_view(), name='user-login'),
@@ -18,7 +24,7 @@ urlpatterns = [
     
     path('me/', views.UserProfileView.as_view(), name='user-profile'),
     path('settings/', views.UserSettingsView.as_view(), name='user-settings'),
-    path('avatar-upload/', views.AvatarUploadView.as_view(), name='avatar-upload'),
+    path('avatar-upload/', AvatarUploadView.as_view(), name='avatar-upload'),
     path('avatar-remove/', views.AvatarRemoveView.as_view(), name='avatar-remove'),
     path('', views.UserListView.as_view(), name='user-list'),
     path('discover/', views.DiscoverUsersView.as_view(), name='discover-users'),
@@ -26,6 +32,7 @@ urlpatterns = [
     
     path('<uuid:user_id>/follow/', views.FollowUserView.as_view(), name='follow-user'),
     path('<uuid:user_id>/unfollow/', views.UnfollowUserView.as_view(), name='unfollow-user'),
+    path('follow-status/', views.FollowStatusBatchView.as_view(), name='follow-status-batch'),
     path('<uuid:user_id>/follow-status/', views.FollowStatusView.as_view(), name='follow-status'),
     path('<uuid:user_id>/followers/', views.UserFollowersView.as_view(), name='user-followers'),
     path('<uuid:user_id>/following/', views.UserFollowingView.as_view(), name='user-following'),
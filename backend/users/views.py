@@ -1,25 +1,40 @@
+import logging
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView as JWTTokenRefreshView
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
 from django.db.models import Q
 from django.utils import timezone
-from .models import Profile, Follow, EmailVerificationToken, PasswordResetToken
+from .models import Profile, Follow, FollowSuggestion, EmailVerificationToken, PasswordResetToken
+from utils.http_cache import ConditionalGetMixin
+from utils.object_cache import CachedObjectMixin
+from utils.versions import version_key
+from utils.status_loader import status_loader, parse_ids
+from utils.upserts import set_active
+from .signals import follow_changed
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
-    ProfileSerializer, UserUpdateSerializer, FollowSerializer,
+    SuggestedUserSerializer, ProfileSerializer, UserUpdateSerializer, FollowSerializer,
     PasswordChangeSerializer, PasswordResetSerializer, PasswordResetConfirmSerializer,
     EmailVerificationSerializer
 )
+from .caches import user_cache
+from .read_serializers import serialize_users, serialize_users_in_order, serialize_follows
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+BATCH_STATUS_MAX_IDS = 100
 
 class UserRegistrationView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
+    rate_limit = 'register'
     
     def create(self, request, *args, **kwargs):
         try:
@@ -78,6 +93,7 @@ class EmailVerificationView(APIView):
 
 class ResendVerificationView(APIView):
     permission_classes = [permissions.AllowAny]
+    rate_limit = 'verification'
     
     def post(self, request):
         email = request.data.get('email')
@@ -107,6 +123,7 @@ class ResendVerificationView(APIView):
 
 class UserLoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    rate_limit = 'login'
     
     def post(self, request):
         serializer = UserLoginSerializer(data=request.data)
@@ -117,7 +134,7 @@ class UserLoginView(APIView):
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
             
-            user.save()
+            update_last_login(None, user)
             
             return Response({
                 'access_token': access_token,
@@ -155,6 +172,7 @@ class TokenRefreshView(JWTTokenRefreshView):
 
 class PasswordResetView(APIView):
     permission_classes = [permissions.AllowAny]
+    rate_limit = 'password-reset'
     
     def post(self, request):        
         try:
@@ -176,9 +194,6 @@ class PasswordResetView(APIView):
             
             if user_count > 0:
                 sample_user = User.objects.first()
-            
-            else:
-                print("No users found in database via ORM")
         except Exception as e:
             return Response({
                 'error': 'Database connection error. Please try again.'
@@ -234,6 +249,7 @@ class PasswordResetView(APIView):
 
 class PasswordResetConfirmView(APIView):
     permission_classes = [permissions.AllowAny]
+    rate_limit = 'password-reset'
     
     def post(self, request):
         serializer = PasswordResetConfirmSerializer(data=request.data)
@@ -272,6 +288,7 @@ class PasswordResetConfirmView(APIView):
 
 class ChangePasswordView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    rate_limit = 'change-password'
     
     def post(self, request):
         serializer = PasswordChangeSerializer(data=request.data, context={'request': request})
@@ -290,18 +307,28 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
-class UserDetailView(generics.RetrieveAPIView):
+class UserDetailView(ConditionalGetMixin, CachedObjectMixin, generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
     lookup_field = 'id'
+    object_cache = user_cache
+    query_budget = 9
+    
+    def get_version_keys(self, request, *args, **kwargs):
+        return [version_key('user', kwargs['id']), version_key('follows', request.user.id)]
+    
+    def is_visible(self, user):
+        return user.deleted_at is None
 
 
 class UserListView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
-    queryset = User.objects.all().order_by('-created_at')
+    queryset = User.objects.filter(deleted_at__isnull=True).order_by('-created_at')
+    read_replica = True
+    query_budget = 9
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -325,13 +352,11 @@ class UserListView(generics.ListAPIView):
         
         users = queryset[start_index:end_index]
         
-        serializer = self.get_serializer(users, many=True)
-        
         total_users = queryset.count()
         total_pages = (total_users + page_size - 1) // page_size
         
         response_data = {
-            'users': serializer.data,
+            'users': serialize_users(users, status_loader(request)),
             'pagination': {
                 'current_page': page,
                 'total_pages': total_pages,
@@ -356,30 +381,29 @@ class FollowUserView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        user_to_follow = get_object_or_404(User, id=user_id)
-        
-        follow, created = Follow.objects.get_or_create(
-            follower=request.user, 
-            following=user_to_follow,
-            defaults={'is_active': True}
-        )
-        
-        if not created:
-            if not follow.is_active:
-                follow.is_active = True
-                follow.save()
-                return Response({'message': 'Successfully followed user'})
-            else:
-                return Response(
-                    {'error': 'You are already following this user'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        try:
+            result = set_active(Follow, True, follower=request.user.id, following=user_id)
+        except IntegrityError:
+            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if result.changed:
+            follow_changed.send(
+                sender=Follow, follower=request.user, following_id=user_id,
+                followed=True, created=result.created
+            )
         
-        return Response({'message': 'Successfully followed user'})
+        return Response({
+            'message': 'Successfully followed user' if result.changed else 'You are already following this user',
+            'is_following': True,
+            'changed': result.changed,
+        })
 
-class FollowStatusView(APIView):
+class FollowStatusView(ConditionalGetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_version_keys(self, request, user_id):
+        return [version_key('follows', request.user.id)]
+    
     def get(self, request, user_id):
         try:
             is_following = Follow.objects.filter(
@@ -391,6 +415,28 @@ class FollowStatusView(APIView):
         except Exception:
             return Response({'is_following': False})
 
+class FollowStatusBatchView(ConditionalGetMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    max_ids = BATCH_STATUS_MAX_IDS
+    query_budget = 4
+    
+    def get_version_keys(self, request):
+        return [version_key('follows', request.user.id)]
+    
+    def get(self, request):
+        try:
+            user_ids = parse_ids(request, self.max_ids)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        following = status_loader(request).following(user_ids)
+        return Response({
+            'statuses': {
+                str(user_id): {'is_following': user_id in following}
+                for user_id in user_ids
+            }
+        })
+
 class UnfollowUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -401,23 +447,26 @@ class UnfollowUserView(APIView):
         return self._unfollow_user(request, user_id)
     
     def _unfollow_user(self, request, user_id):
-        user_to_unfollow = get_object_or_404(User, id=user_id)
+        result = set_active(Follow, False, follower=request.user.id, following=user_id)
         
-        try:
-            follow = Follow.objects.get(follower=request.user, following=user_to_unfollow)
-            follow.is_active = False
-            follow.save()
-            return Response({'message': 'Successfully unfollowed user'})
-        except Follow.DoesNotExist:
-            return Response(
-                {'error': 'You are not following this user'}, 
-                status=status.HTTP_400_BAD_REQUEST
+        if result.changed:
+            follow_changed.send(
+                sender=Follow, follower=request.user, following_id=user_id,
+                followed=False, created=False
             )
+        
+        return Response({
+            'message': 'Successfully unfollowed user' if result.changed else 'You are not following this user',
+            'is_following': False,
+            'changed': result.changed,
+        })
 
 class UserFollowersView(generics.ListAPIView):
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
+    read_replica = True
+    query_budget = 6
     
     def get_queryset(self):
         user = get_object_or_404(User, id=self.kwargs['user_id'])
@@ -434,13 +483,11 @@ class UserFollowersView(generics.ListAPIView):
         
         followers = queryset[start_index:end_index]
         
-        serializer = self.get_serializer(followers, many=True)
-        
         total_followers = queryset.count()
         total_pages = (total_followers + page_size - 1) // page_size
         
         response_data = {
-            'followers': serializer.data,
+            'followers': serialize_follows(followers),
             'pagination': {
                 'current_page': page,
                 'total_pages': total_pages,
@@ -459,6 +506,8 @@ class UserFollowingView(generics.ListAPIView):
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
+    read_replica = True
+    query_budget = 6
     
     def get_queryset(self):
         user = get_object_or_404(User, id=self.kwargs['user_id'])
@@ -475,13 +524,11 @@ class UserFollowingView(generics.ListAPIView):
         
         following = queryset[start_index:end_index]
         
-        serializer = self.get_serializer(following, many=True)
-        
         total_following = queryset.count()
         total_pages = (total_following + page_size - 1) // page_size
         
         response_data = {
-            'following': serializer.data,
+            'following': serialize_follows(following),
             'pagination': {
                 'current_page': page,
                 'total_pages': total_pages,
@@ -497,9 +544,24 @@ class UserFollowingView(generics.ListAPIView):
         return Response(response_data)
 
 class DiscoverUsersView(generics.ListAPIView):
-    serializer_class = UserSerializer
+    serializer_class = SuggestedUserSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
+    read_replica = True
+    query_budget = 10
+    
+    def get_followed_ids(self):
+        return Follow.objects.filter(
+            follower=self.request.user, is_active=True
+        ).values('following_id')
+    
+    def get_suggestions(self):
+        return FollowSuggestion.objects.filter(
+            user=self.request.user,
+            suggested_user__is_active=True
+        ).exclude(
+            suggested_user_id__in=self.get_followed_ids()
+        ).select_related('suggested_user').order_by('-mutual_count')
     
     def get_queryset(self):
         user = self.request.user
@@ -513,27 +575,40 @@ class DiscoverUsersView(generics.ListAPIView):
                 Q(first_name__icontains=search) |
                 Q(last_name__icontains=search)
             )
+        else:
+            queryset = queryset.exclude(id__in=self.get_followed_ids())
         
         return queryset.order_by('-created_at')
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        
         page = int(request.query_params.get('page', 1))
         page_size = 20
         
         start_index = (page - 1) * page_size
         end_index = start_index + page_size
-
-        users = queryset[start_index:end_index]
         
-        serializer = self.get_serializer(users, many=True)
+        suggestions = self.get_suggestions()
+        total_users = 0 if request.query_params.get('search') else suggestions.count()
+        
+        loader = status_loader(request)
+        if total_users:
+            page_rows = list(suggestions[start_index:end_index].values_list('suggested_user_id', 'mutual_count'))
+            mutual_counts = {str(user_id): count for user_id, count in page_rows}
+            users = serialize_users_in_order(User.objects.all(), [user_id for user_id, _ in page_rows], loader)
+        else:
+            queryset = self.get_queryset()
+            mutual_counts = {}
+            users = serialize_users(queryset[start_index:end_index], loader)
+            total_users = queryset.count()
+        
+        # Same fields as SuggestedUserSerializer.
+        for user in users:
+            user['mutual_followers_count'] = mutual_counts.get(user['id'], 0)
         
-        total_users = queryset.count()
         total_pages = (total_users + page_size - 1) // page_size
         
         response_data = {
-            'users': serializer.data,
+            'users': users,
             'pagination': {
                 'current_page': page,
                 'total_pages': total_pages,
@@ -634,7 +709,7 @@ class AvatarUploadView(APIView):
                     old_file_path = profile.avatar_url.split('/')[-2] + '/' + profile.avatar_url.split('/')[-1]
                     supabase_storage.delete_image(old_file_path)
                 except Exception as e:
-                    print(f"Warning: Could not delete old avatar: {str(e)}")
+                    logger.warning(f"Could not delete old avatar: {str(e)}")
             
             profile.avatar_url = public_url
             profile.save()
@@ -669,7 +744,7 @@ class AvatarRemoveView(APIView):
                 file_path = profile.avatar_url.split('/')[-2] + '/' + profile.avatar_url.split('/')[-1]
                 supabase_storage.delete_image(file_path)
             except Exception as e:
-                print(f"Warning: Could not delete avatar from storage: {str(e)}")
+                logger.warning(f"Could not delete avatar from storage: {str(e)}")
             
             profile.avatar_url = ''
             profile.save()
@@ -0,0 +1,174 @@
+import time
+from collections import defaultdict
+from uuid import UUID
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, transaction
+from django.db.models.deletion import ProtectedError, get_candidate_relations_to_delete
+from .versions import bump
+
+# Set-wise helpers for bulk moderation. Deleting through Model.delete() or
+# QuerySet.delete() collects every cascaded row into Python and sends
+# pre/post_delete for each one (several of which recount the parent post),
+# so thousands of ids turn into tens of thousands of queries. Here each
+# table touched by a cascade gets a single DELETE ... WHERE fk IN
+# (subquery) per chunk, and callers invalidate caches themselves.
+#
+# Only Django's own on_delete handlers can be applied this way; apps that
+# delete with delete_set call check_deletable() from ready(), so a custom
+# handler fails at startup instead of in the middle of a purge.
+
+SET_HANDLERS = (models.SET_NULL, models.SET_DEFAULT)
+
+
+def chunked(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def clean_ids(values, max_ids):
+    """UUIDs from a request body list, deduplicated in order."""
+    if not isinstance(values, (list, tuple)):
+        raise ValueError('Expected a list of ids.')
+
+    ids = []
+    for value in values:
+        try:
+            ids.append(UUID(str(value)))
+        except ValueError:
+            raise ValueError(f'Invalid id: {value}')
+
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > max_ids:
+        raise ValueError(f'At most {max_ids} ids can be processed at once.')
+    return ids
+
+
+def is_set_handler(on_delete):
+    """SET_NULL, SET_DEFAULT or SET(value)."""
+    if on_delete in SET_HANDLERS:
+        return True
+    deconstruct = getattr(on_delete, 'deconstruct', None)
+    return deconstruct is not None and deconstruct()[0] == 'django.db.models.SET'
+
+
+def set_value(field):
+    """The value a SET_* relation is updated to when its target is deleted."""
+    on_delete = field.remote_field.on_delete
+    if on_delete is models.SET_NULL:
+        return None
+    if on_delete is models.SET_DEFAULT:
+        return field.get_default()
+    value = on_delete.deconstruct()[1][0]
+    return value() if callable(value) else value
+
+
+def check_deletable(model, seen=None):
+    """
+    Raises ImproperlyConfigured when a relation that delete_set(model)
+    would reach has an on_delete handler it cannot apply set-wise.
+    """
+    seen = set() if seen is None else seen
+    if model in seen:
+        return
+    seen.add(model)
+
+    for relation in get_candidate_relations_to_delete(model._meta):
+        field = relation.field
+        on_delete = field.remote_field.on_delete
+        if on_delete is models.CASCADE:
+            check_deletable(relation.related_model, seen)
+        elif on_delete not in (models.PROTECT, models.RESTRICT, models.DO_NOTHING) and not is_set_handler(on_delete):
+            raise ImproperlyConfigured(
+                f'delete_set({model._meta.label}) cannot apply the custom on_delete of '
+                f'{relation.related_model._meta.label}.{field.name}'
+            )
+
+
+def delete_set(queryset, counts=None):
+    """
+    Deletes the rows of queryset and everything that cascades from them,
+    children first, without loading them or sending delete signals.
+
+    Returns {model label: rows deleted}. Raises ProtectedError when a
+    PROTECT/RESTRICT relation still points at one of the rows.
+    """
+    counts = defaultdict(int) if counts is None else counts
+    model = queryset.model
+    pks = queryset.values('pk')
+
+    for relation in get_candidate_relations_to_delete(model._meta):
+        field = relation.field
+        related = relation.related_model._base_manager.filter(**{f'{field.name}__in': pks})
+        on_delete = field.remote_field.on_delete
+
+        if on_delete is models.CASCADE:
+            delete_set(related, counts)
+        elif on_delete in (models.PROTECT, models.RESTRICT):
+            if related.exists():
+                raise ProtectedError(
+                    f'Cannot delete {model._meta.label} rows referenced through {relation.related_model._meta.label}.{field.name}',
+                    set(related[:10])
+                )
+        elif is_set_handler(on_delete):
+            related.update(**{field.name: set_value(field)})
+        elif on_delete is not models.DO_NOTHING:
+            check_deletable(model)  # raises for the custom handler
+
+    # _raw_delete is what Collector itself uses for "fast" deletes.
+    counts[model._meta.label] += queryset._raw_delete(queryset.db)
+    return counts
+
+
+def purge_in_batches(queryset, batch_size, delete=None, progress=None, pause=0):
+    """
+    Deletes the rows matching queryset batch_size primary keys at a time,
+    each batch in its own short transaction, so no lock is held for the
+    whole purge. delete(pks) does the work (default: delete_set); it must
+    remove every row it is given. progress(model, total) is called after
+    each batch. Returns the number of rows deleted.
+    """
+    model = queryset.model
+    if delete is None:
+        delete = lambda pks: delete_set(model._base_manager.filter(pk__in=pks))
+
+    total = 0
+    while True:
+        pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+
+        with transaction.atomic():
+            delete(pks)
+
+        total += len(pks)
+        if progress:
+            progress(model, total)
+        if pause:
+            time.sleep(pause)
+
+
+class Invalidations:
+    """Version bumps and cache deletes applied once the transaction commits."""
+
+    def __init__(self):
+        self.versions = defaultdict(set)
+        self.cache_keys = set()
+
+    def bump(self, namespace, object_ids):
+        self.versions[namespace].update(object_ids)
+
+    def delete(self, keys):
+        self.cache_keys.update(keys)
+
+    def apply(self):
+        for namespace, object_ids in self.versions.items():
+            object_ids.discard(None)
+            if object_ids:
+                bump(namespace, *object_ids)
+        if self.cache_keys:
+            cache.delete_many(list(self.cache_keys))
+
+    def on_commit(self):
+        transaction.on_commit(self.apply)
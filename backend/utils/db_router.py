@@ -0,0 +1,116 @@
+import hashlib
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_ALIAS = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads to the replica while a read-only view is being handled.
+
+    Everything else (writes, migrations, reads outside a replica-routed
+    view) stays on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+@contextmanager
+def primary_reads():
+    """
+    Routes reads inside the block to the primary, for results that are
+    cached and shared: a lagging replica would put stale data in the cache.
+    """
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def client_key(request):
+    identity = request.META.get('HTTP_AUTHORIZATION') or request.META.get('REMOTE_ADDR', '')
+    return 'db-pinned:' + hashlib.sha256(identity.encode()).hexdigest()
+
+
+def pin_to_primary(request):
+    cache.set(client_key(request), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(request):
+    return bool(cache.get(client_key(request)))
+
+
+class ReadReplicaMiddleware:
+    """
+    Enables replica reads for safe requests to views that declare
+    read_replica = True, and pins a client to the primary for
+    REPLICA_STICKY_SECONDS after a successful write so it reads its
+    own writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request._replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request._replica_token is not None:
+                _use_replica.reset(request._replica_token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request)
+        return response
+
+    async def __acall__(self, request):
+        request._replica_token = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            # Under ASGI process_view runs in a copy of this context, so
+            # its token can't be reset here; the flag is cleared instead.
+            if request._replica_token is not None:
+                _use_replica.set(False)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            await sync_to_async(pin_to_primary)(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        if (
+            request.method in SAFE_METHODS and
+            getattr(view_class, 'read_replica', False) and
+            not is_pinned_to_primary(request)
+        ):
+            request._replica_token = _use_replica.set(True)
+        return None
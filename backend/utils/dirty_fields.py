@@ -0,0 +1,62 @@
+class DirtyFieldsMixin:
+    """
+    Model mixin that remembers the field values an instance was loaded (or
+    last saved) with. save() without update_fields then writes only the
+    changed columns, plus auto_now fields, and skips the UPDATE and its
+    signals entirely when nothing changed. New instances save as usual.
+
+    A deferred field assigned without having been loaded counts as changed.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.take_snapshot()
+        return instance
+
+    def take_snapshot(self, fields=None):
+        loaded = self.__dict__
+        values = {
+            field.attname: loaded[field.attname]
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in loaded
+            and (fields is None or field.attname in fields or field.name in fields)
+        }
+        if fields is None:
+            self._loaded_values = values
+        else:
+            self._loaded_values = {**getattr(self, '_loaded_values', {}), **values}
+
+    def get_dirty_fields(self):
+        """Attnames of the changed fields, or None when unknown (not loaded from the database)."""
+        snapshot = getattr(self, '_loaded_values', None)
+        if self._state.adding or snapshot is None:
+            return None
+        loaded = self.__dict__
+        return [
+            field.attname for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in loaded
+            and (field.attname not in snapshot or snapshot[field.attname] != loaded[field.attname])
+        ]
+
+    def is_dirty(self):
+        dirty = self.get_dirty_fields()
+        return dirty is None or bool(dirty)
+
+    def save(self, *args, **kwargs):
+        if not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                auto_now = [field.attname for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)]
+                kwargs['update_fields'] = [*dirty, *auto_now]
+
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self.take_snapshot(None if update_fields is None else set(update_fields))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Also how deferred fields are loaded on first access.
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.take_snapshot(None if fields is None else set(fields))
@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from .db_router import REPLICA_ALIAS
+from .renderers import Fragment, dumps
+from .versions import get_versions, version_key
+
+FRAGMENT_CACHE_MAX_ENTRIES = 20000
+
+
+class FragmentCache:
+    """Process-local LRU of encoded JSON fragments."""
+
+    def __init__(self, max_entries=FRAGMENT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data):
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+class FragmentCacheMixin:
+    """
+    Serializer mixin for nested sub-objects, such as author cards, that
+    repeat across responses and only change when their version is bumped.
+
+    The representation is encoded once per (serializer, object, version)
+    and returned as a Fragment, which ORJSONRenderer writes out verbatim.
+    Fields named in fragment_dynamic_fields depend on the request; they are
+    computed every time and appended, so they must come last in
+    Meta.fields. Top-level use falls back to the plain representation.
+    """
+
+    fragment_namespace = None
+    fragment_dynamic_fields = ()
+
+    def get_fragment_version(self, instance):
+        # Versions are memoised on the root serializer's context so a page
+        # repeating the same author looks its version up once.
+        key = version_key(self.fragment_namespace, instance.pk)
+        versions = self.context.setdefault('fragment_versions', {})
+        if key not in versions:
+            versions.update(get_versions([key]))
+        return versions[key]
+
+    def to_representation(self, instance):
+        if self.parent is None or getattr(instance, 'pk', None) is None:
+            return super().to_representation(instance)
+
+        key = (self.__class__.__name__, instance.pk, self.get_fragment_version(instance))
+        static = fragment_cache.get(key)
+        if static is None:
+            static = dumps(self.represent_fields(instance, exclude=self.fragment_dynamic_fields))
+            # A row read from a lagging replica may predate the version it
+            # would be stored under; only primary reads are cached.
+            if instance._state.db != REPLICA_ALIAS:
+                fragment_cache.set(key, static)
+
+        if not self.fragment_dynamic_fields:
+            return Fragment(static)
+
+        dynamic = dumps(self.represent_fields(instance, include=self.fragment_dynamic_fields))
+        if static == b'{}':
+            return Fragment(dynamic)
+        if dynamic == b'{}':
+            return Fragment(static)
+        return Fragment(static[:-1] + b',' + dynamic[1:])
+
+    def represent_fields(self, instance, include=None, exclude=()):
+        ret = OrderedDict()
+        for field in self._readable_fields:
+            if field.field_name in exclude or (include is not None and field.field_name not in include):
+                continue
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            if check_for_none is None:
+                ret[field.field_name] = None
+            else:
+                ret[field.field_name] = field.to_representation(attribute)
+        return ret
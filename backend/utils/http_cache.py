@@ -0,0 +1,82 @@
+import hashlib
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from .versions import get_versions
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        super().__init__('Not modified')
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET with 304 Not Modified from version counters alone.
+
+    Views list the version keys their payload depends on in
+    get_version_keys(); the ETag is a hash of those versions, the viewer
+    and the full path. It is checked right after authentication and
+    permission checks, before the handler evaluates any queryset or
+    serializer. No Last-Modified is sent: versions change within a
+    second, which HTTP dates cannot express, so If-Modified-Since could
+    answer 304 for a stale copy.
+
+    cache_policy 'private' asks clients to revalidate every time;
+    'public' lets shared caches keep anonymous responses for
+    cache_max_age seconds.
+    """
+
+    cache_policy = 'private'
+    cache_max_age = 60
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Fails when the URLconf is loaded (manage.py check, app startup)
+        # rather than on the first request.
+        if cls.get_version_keys is ConditionalGetMixin.get_version_keys:
+            raise ImproperlyConfigured(f'{cls.__name__} uses ConditionalGetMixin but does not define get_version_keys()')
+        return super().as_view(**initkwargs)
+
+    def get_version_keys(self, request, *args, **kwargs):
+        """Version keys (utils.versions.version_key) the response depends on."""
+        raise ImproperlyConfigured(f'{self.__class__.__name__} must define get_version_keys()')
+
+    def get_etag(self, request, *args, **kwargs):
+        versions = get_versions(self.get_version_keys(request, *args, **kwargs))
+        # Kept for CachedObjectMixin, which needs some of the same versions.
+        self.versions = versions
+        fingerprint = '|'.join([
+            self.__class__.__name__,
+            str(getattr(request.user, 'pk', '')),
+            request.get_full_path(),
+        ] + [f'{key}={versions[key]}' for key in sorted(versions)])
+        return '"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method in ('GET', 'HEAD'):
+            self.etag = self.get_etag(request, *args, **kwargs)
+            response = get_conditional_response(request, etag=self.etag)
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code in (200, 304):
+            response.headers.setdefault('ETag', self.etag)
+            self.patch_cache_headers(request, response)
+        return response
+
+    def patch_cache_headers(self, request, response):
+        if self.cache_policy == 'public' and not request.user.is_authenticated:
+            patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
@@ -0,0 +1,140 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone as dt_timezone
+from logging.handlers import QueueHandler, QueueListener
+from .metrics import log_records, log_records_dropped, log_records_suppressed
+
+# Logging plumbing wired up by settings.LOGGING. Request threads only put
+# records on a bounded queue; a listener thread formats them (JSON lines
+# by default) and writes to stdout, so a slow or blocked stdout never
+# stalls a request, and a full queue drops records instead of waiting.
+# Warnings and errors are rate limited per call site: a failing query in
+# a hot path logs its first few occurrences, then one in every N.
+
+# LogRecord attributes that are not user-supplied `extra` fields.
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'suppressed'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, dt_timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in entry:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through `limit` records per call site every `interval` seconds,
+    then one in every `sample_every`. A record that follows suppressed
+    ones carries their count as record.suppressed. Records below
+    `min_level` are never limited.
+    """
+
+    def __init__(self, limit=10, interval=60, sample_every=100, min_level='WARNING', max_sites=10000):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.sample_every = max(1, sample_every)
+        self.min_level = logging._checkLevel(min_level)
+        self.max_sites = max_sites
+        self._lock = threading.Lock()
+        self._window = 0
+        self._sites = {}
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+
+        site = (record.name, record.levelno, record.pathname, record.lineno)
+        window = int(record.created // self.interval)
+        with self._lock:
+            if window != self._window or len(self._sites) > self.max_sites:
+                self._window, self._sites = window, {}
+            seen, suppressed = self._sites.get(site, (0, 0))
+            seen += 1
+            allowed = seen <= self.limit or (seen - self.limit) % self.sample_every == 0
+            self._sites[site] = (seen, 0 if allowed else suppressed + 1)
+
+        if not allowed:
+            log_records_suppressed.inc(level=record.levelname)
+            return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    QueueHandler writing through a QueueListener thread to `stream`
+    (default stdout). The formatter set on this handler is used by the
+    listener, so formatting also happens off the request thread.
+    """
+
+    def __init__(self, queue_size=10000, stream=None):
+        super().__init__(queue.Queue(queue_size))
+        self.queue_size = queue_size
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.listener = None
+        self.start()
+        atexit.register(self.stop)
+        # A listener thread started before a fork (gunicorn --preload)
+        # does not exist in the child, and its queue's locks may be held.
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.restart)
+
+    def start(self):
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def restart(self):
+        self.queue = queue.Queue(self.queue_size)
+        self.start()
+
+    def stop(self):
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Only resolve what cannot cross threads: message arguments and
+        # the live traceback. The target's formatter does the rest.
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+    def emit(self, record):
+        log_records.inc(level=record.levelname)
+        super().emit(record)
+
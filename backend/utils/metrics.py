@@ -0,0 +1,183 @@
+import hmac
+import logging
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+
+# Process-wide counters exposed in the Prometheus text format at /metrics.
+# Counting is an in-memory add under a lock. Each worker publishes its
+# totals to the shared cache at most every METRICS_PUBLISH_INTERVAL
+# seconds, and /metrics sums the published totals of every worker, so a
+# scrape that lands on any one worker sees the whole deployment. Totals
+# of a worker that stopped publishing expire after METRICS_WORKER_TTL;
+# Prometheus treats the resulting drop as a counter reset.
+
+WORKERS_KEY = 'metrics:workers'
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+REGISTRY = []
+
+http_requests = Counter('http_requests_total', 'HTTP requests handled', ('view', 'method', 'status'))
+http_errors = Counter('http_request_errors_total', 'Requests answered with a 5xx status', ('view',))
+http_seconds = Counter('http_request_duration_seconds_total', 'Time spent handling requests', ('view',))
+db_queries = Counter('db_queries_total', 'SQL statements executed while handling requests', ('view',))
+db_seconds = Counter('db_query_duration_seconds_total', 'Time spent in SQL while handling requests', ('view',))
+log_records = Counter('log_records_total', 'Log records written', ('level',))
+log_records_suppressed = Counter('log_records_suppressed_total', 'Log records dropped by rate limiting', ('level',))
+log_records_dropped = Counter('log_records_dropped_total', 'Log records dropped because the log queue was full')
+
+
+class Publisher:
+    def __init__(self):
+        self.worker = f'{socket.gethostname()}:{os.getpid()}'
+        self._published_at = 0.0
+
+    def snapshot(self):
+        return {counter.name: counter.snapshot() for counter in REGISTRY}
+
+    def due(self):
+        return time.monotonic() - self._published_at >= settings.METRICS_PUBLISH_INTERVAL
+
+    def publish(self, force=False):
+        if not force and not self.due():
+            return
+        self._published_at = time.monotonic()
+        if self.worker.rsplit(':', 1)[1] != str(os.getpid()):
+            # Forked after the first publish.
+            self.worker = f'{socket.gethostname()}:{os.getpid()}'
+
+        try:
+            cache.set(f'metrics:worker:{self.worker}', self.snapshot(), settings.METRICS_WORKER_TTL)
+            workers = cache.get(WORKERS_KEY) or []
+            if self.worker not in workers:
+                # Concurrent updates may drop a name; it is re-added on
+                # that worker's next publish.
+                cache.set(WORKERS_KEY, [*workers, self.worker][-settings.METRICS_MAX_WORKERS:], None)
+        except Exception as e:
+            logger.warning(f"Could not publish metrics: {e}")
+
+    def totals(self):
+        """Counter values summed over every worker that published recently."""
+        self.publish(force=True)
+        workers = cache.get(WORKERS_KEY) or []
+        snapshots = cache.get_many([f'metrics:worker:{worker}' for worker in workers]).values()
+        if not snapshots:
+            snapshots = [self.snapshot()]
+
+        totals = defaultdict(lambda: defaultdict(float))
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                for key, value in values:
+                    totals[name][tuple(key)] += value
+        return totals
+
+
+publisher = Publisher()
+
+
+def render(totals):
+    lines = []
+    for counter in REGISTRY:
+        lines.append(f'# HELP {counter.name} {counter.help_text}')
+        lines.append(f'# TYPE {counter.name} counter')
+        values = totals.get(counter.name, {})
+        if not counter.labels and not values:
+            values = {(): 0}
+        for key, value in sorted(values.items()):
+            labels = ','.join(f'{label}="{_escape(part)}"' for label, part in zip(counter.labels, key))
+            lines.append(f"{counter.name}{'{' + labels + '}' if labels else ''} {value:g}")
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint; requires METRICS_TOKEN as a bearer token.
+    Without a token it is only served with DEBUG on.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404()
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            raise Http404()
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'):
+        return HttpResponse(status=401)
+    return HttpResponse(render(publisher.totals()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class MetricsMiddleware:
+    """
+    Counts requests, 5xx responses, handling time and SQL per view. The
+    SQL figures come from the QueryStats that QueryBudgetMiddleware leaves
+    on the request, so it must sit inside this middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        publisher.publish()
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        if publisher.due():
+            await sync_to_async(publisher.publish)()
+        return response
+
+    def record(self, request, response, seconds):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None and match.view_name else 'unmatched'
+
+        http_requests.inc(view=view, method=request.method, status=response.status_code)
+        http_seconds.inc(seconds, view=view)
+        if response.status_code >= 500:
+            http_errors.inc(view=view)
+
+        stats = getattr(request, '_query_stats', None)
+        if stats is not None:
+            db_queries.inc(stats.count, view=view)
+            db_seconds.inc(stats.seconds, view=view)
@@ -0,0 +1,144 @@
+import math
+import random
+import time
+from django.conf import settings
+from django.http import Http404
+from .db_router import primary_reads
+from .tiered_cache import TieredCache
+from .versions import get_versions, version_key
+
+# Versioned object cache. An entry's key embeds the current version of
+# its object (see utils.versions), and every write path already bumps
+# that version -- post_save/post_delete receivers, the like/follow
+# upserts, counter refreshes and bulk moderation -- so a write makes the
+# old entry unreachable instead of having to delete it. Entries also
+# expire after OBJECT_CACHE_TTL, which bounds anything updated without a
+# bump.
+#
+# Entries are read through a TieredCache, so a hot object is usually
+# answered from the worker's own LRU; since keys embed versions, a bump
+# makes every worker's local copy unreachable too.
+#
+# Stampedes on expiry are avoided with probabilistic early recomputation
+# (XFetch): each reader recomputes slightly before expiry with a
+# probability that grows as expiry nears and with how long the value took
+# to load, so one request usually refreshes a hot entry before the rest
+# see it expire.
+
+
+class ObjectCache:
+    """
+    Caches load_many(ids) -> {id: payload} results per object and version;
+    build(payload) turns a payload back into the object. Payloads must be
+    picklable and should be plain values rather than model instances.
+    """
+
+    def __init__(self, namespace, load_many, build, ttl=None, beta=None, alias=None):
+        self.namespace = namespace
+        self.load_many = load_many
+        self.build = build
+        self.ttl = ttl
+        self.beta = beta
+        self.alias = alias
+        self._cache = None
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = TieredCache(f'object:{self.namespace}', self.alias or settings.OBJECT_CACHE_ALIAS)
+        return self._cache
+
+    def entry_key(self, object_id, version):
+        return f'object:{self.namespace}:{object_id}:{version}'
+
+    def get(self, object_id, versions=None):
+        return self.get_many([object_id], versions).get(str(object_id))
+
+    def get_many(self, object_ids, versions=None):
+        """
+        {str(id): object} for the ids that exist. versions may hold
+        version numbers the caller already looked up, by version key; the
+        ones looked up here are added to it.
+        """
+        object_ids = list(dict.fromkeys(str(object_id) for object_id in object_ids))
+        if not object_ids:
+            return {}
+
+        versions = {} if versions is None else versions
+        wanted = [version_key(self.namespace, object_id) for object_id in object_ids]
+        missing = [key for key in wanted if key not in versions]
+        if missing:
+            versions.update(get_versions(missing))
+        keys = {object_id: self.entry_key(object_id, versions[key]) for object_id, key in zip(object_ids, wanted)}
+
+        now = time.time()
+        beta = settings.OBJECT_CACHE_BETA if self.beta is None else self.beta
+        entries = self.cache.get_many(list(keys.values()))
+        payloads = {}
+        for object_id, key in keys.items():
+            entry = entries.get(key)
+            if entry is not None and not self.expired(entry, now, beta):
+                payloads[object_id] = entry[0]
+
+        stale = [object_id for object_id in object_ids if object_id not in payloads]
+        if stale:
+            started = time.time()
+            # Stored under the current version, so never loaded from a
+            # replica that may not have the write behind it yet.
+            with primary_reads():
+                loaded = {str(object_id): payload for object_id, payload in self.load_many(stale).items()}
+            delta = time.time() - started
+            ttl = settings.OBJECT_CACHE_TTL if self.ttl is None else self.ttl
+            self.cache.set_many(
+                {keys[object_id]: (payload, delta, started + ttl) for object_id, payload in loaded.items()},
+                ttl
+            )
+            payloads.update(loaded)
+
+        return {object_id: self.build(payload) for object_id, payload in payloads.items()}
+
+    @staticmethod
+    def expired(entry, now, beta):
+        _, delta, expiry = entry
+        # -log(U) is exponentially distributed: usually small, now and
+        # then large enough to trigger an early refresh.
+        return now - delta * beta * math.log(1.0 - random.random()) >= expiry
+
+
+class CachedObjectMixin:
+    """
+    Generic view mixin answering get_object() for GET and HEAD from
+    object_cache. Writes still load the row through get_queryset(), so
+    a cached instance is never saved back. Override is_visible() to
+    apply the filtering get_queryset() would have done.
+    """
+
+    object_cache = None
+
+    def get_object(self):
+        if self.request.method not in ('GET', 'HEAD'):
+            return super().get_object()
+
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        obj = self.object_cache.get(lookup, getattr(self, 'versions', None))
+        if obj is None or not self.is_visible(obj):
+            raise Http404()
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def is_visible(self, obj):
+        return True
+
+
+def model_fields(model, exclude=()):
+    """Attnames of model's concrete fields, minus exclude, for row_values/from_row."""
+    return tuple(field.attname for field in model._meta.concrete_fields if field.name not in exclude)
+
+
+def row_values(instance, fields):
+    return tuple(getattr(instance, field) for field in fields)
+
+
+def from_row(model, fields, values, using='default'):
+    """A model instance as if loaded from the database; fields left out are deferred."""
+    return model.from_db(using, fields, values)
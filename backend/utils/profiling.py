@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from users.permissions import IsAdminRole
+
+logger = logging.getLogger(__name__)
+
+# Opt-in request profiling for production. A sampled request (one in
+# 1/PROFILING_SAMPLE_RATE), or one an admin asks for with ?__profile=1 or
+# an "X-Profile: 1" header, has its thread's stack sampled every
+# PROFILING_INTERVAL_MS by a background thread. The samples are written as
+# collapsed stacks ("view;outer;...;inner count", the input format of
+# flamegraph.pl and speedscope) to PROFILING_DIR, which keeps the newest
+# PROFILING_MAX_FILES profiles. Every worker writes to the same
+# directory, so the admin endpoint aggregates across all of them.
+#
+# Under ASGI, sync views run on the request's thread-sensitive executor
+# thread rather than on the event loop, so the sampled thread is chosen in
+# process_view, which Django runs on the same thread as the view: that
+# thread for a sync view, the event loop for an async one (whose profile
+# then also contains whatever else the loop ran meanwhile). Middleware
+# that runs before the view is not sampled under ASGI.
+
+PROFILE_ID = re.compile(r'^[0-9]+-[0-9]+-[0-9a-f]{8}$')
+MAX_DEPTH = 128
+
+
+@lru_cache(maxsize=8192)
+def frame_label(code):
+    path = code.co_filename
+    if 'site-packages' + os.sep in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+    elif path.startswith(str(settings.BASE_DIR)):
+        path = os.path.relpath(path, settings.BASE_DIR)
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+def collapse(frame):
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Samples the stacks of registered threads from one background thread,
+    which exits when nothing is registered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._targets = {}
+        self._thread = None
+
+    def start(self, thread_id, stacks=None):
+        stacks = Counter() if stacks is None else stacks
+        with self._lock:
+            self._targets.setdefault(thread_id, []).append(stacks)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        return stacks
+
+    def stop(self, thread_id, stacks):
+        with self._lock:
+            collectors = self._targets.get(thread_id, [])
+            if stacks in collectors:
+                collectors.remove(stacks)
+            if not collectors:
+                self._targets.pop(thread_id, None)
+
+    def _run(self):
+        interval = settings.PROFILING_INTERVAL_MS / 1000
+        own_id = threading.get_ident()
+        while True:
+            time.sleep(interval)
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                for thread_id, collectors in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is None or thread_id == own_id:
+                        continue
+                    stack = collapse(frame)
+                    for stacks in collectors:
+                        stacks[stack] += 1
+
+
+sampler = StackSampler()
+
+
+def profile_dir():
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    return settings.PROFILING_DIR
+
+
+def save_profile(meta, stacks):
+    """Writes one profile and prunes the oldest beyond PROFILING_MAX_FILES; returns its id."""
+    directory = profile_dir()
+    profile_id = f'{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+    meta = {'id': profile_id, **meta}
+    root = meta['view']
+
+    temporary = os.path.join(directory, f'.{profile_id}.tmp')
+    with open(temporary, 'w') as profile_file:
+        profile_file.write(f'# {json.dumps(meta)}\n')
+        for stack, count in stacks.most_common():
+            profile_file.write(f'{root};{stack} {count}\n')
+    os.replace(temporary, os.path.join(directory, f'{profile_id}.folded'))
+
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.folded'))
+    for name in names[:max(0, len(names) - settings.PROFILING_MAX_FILES)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+    return profile_id
+
+
+def read_profiles(view=None, limit=None, profile_id=None):
+    """[(meta, [(stack, count)])] for stored profiles, newest first."""
+    directory = profile_dir()
+    if profile_id is not None:
+        names = [f'{profile_id}.folded']
+    else:
+        names = sorted((name for name in os.listdir(directory) if name.endswith('.folded')), reverse=True)
+
+    profiles = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name)) as profile_file:
+                meta = json.loads(profile_file.readline()[2:])
+                if view and meta.get('view') != view:
+                    continue
+                stacks = []
+                for line in profile_file:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    stacks.append((stack, int(count)))
+        except (OSError, ValueError):
+            continue
+        profiles.append((meta, stacks))
+        if limit and len(profiles) >= limit:
+            break
+    return profiles
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        reason = self.reason(request)
+        if reason is None:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        thread_id = threading.get_ident()
+        stacks = sampler.start(thread_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop(thread_id, stacks)
+        return self.finish(request, response, stacks, started, reason)
+
+    async def __acall__(self, request):
+        reason = await sync_to_async(self.reason)(request) if self.requested(request) else self.sampled()
+        if reason is None:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        request._profile_stacks = stacks = Counter()
+        request._profile_loop_thread = threading.get_ident()
+        request._profile_thread = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            if request._profile_thread is not None:
+                sampler.stop(request._profile_thread, stacks)
+        return self.finish(request, response, stacks, started, reason)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Only set by __acall__; under WSGI the whole request is on one thread.
+        stacks = getattr(request, '_profile_stacks', None)
+        if stacks is not None and request._profile_thread is None:
+            if iscoroutinefunction(view_func):
+                request._profile_thread = request._profile_loop_thread
+            else:
+                request._profile_thread = threading.get_ident()
+            sampler.start(request._profile_thread, stacks)
+        return None
+
+    def requested(self, request):
+        return request.GET.get('__profile') == '1' or request.headers.get('X-Profile') == '1'
+
+    def sampled(self):
+        rate = settings.PROFILING_SAMPLE_RATE
+        return 'sampled' if rate > 0 and random.random() < rate else None
+
+    def reason(self, request):
+        if self.requested(request) and is_admin(request):
+            return 'requested'
+        return self.sampled()
+
+    def finish(self, request, response, stacks, started, reason):
+        duration_ms = (time.perf_counter() - started) * 1000
+        match = getattr(request, 'resolver_match', None)
+        meta = {
+            'view': match.view_name if match is not None and match.view_name else 'unmatched',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'samples': sum(stacks.values()),
+            'interval_ms': settings.PROFILING_INTERVAL_MS,
+            'reason': reason,
+            'pid': os.getpid(),
+            'at': timezone.now().isoformat(),
+        }
+        try:
+            response['X-Profile-Id'] = save_profile(meta, stacks)
+        except OSError as e:
+            logger.warning(f"Could not store profile: {e}")
+        return response
+
+
+def is_admin(request):
+    # Runs before DRF authenticates the view, so check the JWT here.
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except Exception:
+        return False
+    return authenticated is not None and getattr(authenticated[0], 'role', None) == 'admin'
+
+
+class ProfileListView(APIView):
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), 500)
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=400)
+
+        profiles = read_profiles(view=request.query_params.get('view'), limit=limit)
+        return Response({'profiles': [meta for meta, _ in profiles]})
+
+
+class ProfileDownloadView(APIView):
+    """
+    Collapsed stacks summed over the stored profiles (optionally one
+    ?id=, or the newest ?limit= of one ?view=), ready for flamegraph.pl
+    or speedscope.
+    """
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        profile_id = request.query_params.get('id')
+        if profile_id is not None and not PROFILE_ID.match(profile_id):
+            return Response({'error': 'Invalid profile id'}, status=400)
+        try:
+            limit = int(request.query_params['limit']) if 'limit' in request.query_params else None
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=400)
+
+        profiles = read_profiles(view=request.query_params.get('view'), limit=limit, profile_id=profile_id)
+        if not profiles:
+            return Response({'error': 'No matching profiles'}, status=404)
+
+        totals = Counter()
+        for _, stacks in profiles:
+            for stack, count in stacks:
+                totals[stack] += count
+
+        response = HttpResponse(
+            ''.join(f'{stack} {count}\n' for stack, count in totals.most_common()),
+            content_type='text/plain; charset=utf-8'
+        )
+        response['Content-Disposition'] = 'attachment; filename="profiles.folded"'
+        return response
@@ -0,0 +1,106 @@
+import json
+from contextlib import ExitStack
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+# Query-shape audit: run an endpoint, capture the SQL it issues, EXPLAIN
+# every statement and report full scans of the large tables. On
+# PostgreSQL sequential scans are disabled for the EXPLAIN, so a seq scan
+# in the plan means no index can serve the query at all, regardless of
+# how small the local tables are. Other vendors have no plan parser, so
+# their statements are captured but never reported.
+
+AUDITED_TABLES = (
+    'posts_post',
+    'posts_like',
+    'posts_comment',
+    'users_follow',
+    'notifications_notification',
+)
+
+
+def capture_queries(call):
+    """
+    Runs call() and returns (its result, [(database alias, sql), ...]) for
+    the statements it executed on any database, replicas included.
+    """
+    with ExitStack() as stack:
+        captured = {alias: stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections}
+        result = call()
+    return result, [(alias, query['sql']) for alias, queries in captured.items() for query in queries.captured_queries]
+
+
+def plans_supported(using='default'):
+    return connections[using].vendor in ('postgresql', 'sqlite')
+
+
+def explain(sql, using='default'):
+    """
+    The plan of sql as a list of (node, table, index) triples; empty on
+    vendors without a plan parser.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return list(_postgres_nodes(plan[0]['Plan']))
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [_sqlite_node(row[-1]) for row in cursor.fetchall()]
+
+    return []
+
+
+def _postgres_nodes(node):
+    yield node['Node Type'], node.get('Relation Name'), node.get('Index Name')
+    for child in node.get('Plans', []):
+        yield from _postgres_nodes(child)
+
+
+def _sqlite_node(detail):
+    # "SCAN posts_post" is a full scan; "SCAN t USING INDEX i" and
+    # "SEARCH t USING [COVERING] INDEX i (...)" are index accesses.
+    words = detail.split()
+    if words[0] in ('SCAN', 'SEARCH') and len(words) > 1:
+        node = 'Seq Scan' if words[0] == 'SCAN' and 'USING' not in words else 'Index Scan'
+        index = words[words.index('INDEX') + 1] if 'INDEX' in words[:-1] else None
+        return node, words[1], index
+    return detail, None, None
+
+
+def is_statement(sql):
+    return sql.lstrip().split(' ', 1)[0].upper() in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH')
+
+
+def full_scans(sql, using='default', tables=AUDITED_TABLES):
+    """Tables from `tables` that the plan of sql reads with a full scan."""
+    if not is_statement(sql):
+        return []
+    return sorted({table for node, table, _ in explain(sql, using) if node == 'Seq Scan' and table in tables})
+
+
+def indexes_used(sql, using='default'):
+    """Names of the indexes the plan of sql reads."""
+    if not is_statement(sql):
+        return set()
+    return {index for _, _, index in explain(sql, using) if index}
+
+
+def audit(call, tables=AUDITED_TABLES):
+    """
+    Runs call() and returns (its result, findings), where findings lists
+    (sql, [fully scanned tables]) for each offending statement.
+    """
+    result, statements = capture_queries(call)
+    findings = []
+    for using, sql in statements:
+        scanned = full_scans(sql, using, tables)
+        if scanned:
+            findings.append((sql, scanned))
+    return result, findings
@@ -0,0 +1,218 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from functools import lru_cache
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Per-request SQL instrumentation. Every database connection gets an
+# execute wrapper that, while a QueryStats is active in the current
+# context, records the statement's time and its fingerprint (the SQL
+# template with IN-lists collapsed). The middleware reports the totals as
+# Server-Timing and a structured log line per request, and checks them
+# against the view's declared query_budget; query_budget() enforces a
+# budget around any block of code, which is how tests fail on N+1s.
+
+_active = ContextVar('query_stats', default=())
+
+_IN_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+_SPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    return _SPACE.sub(' ', _IN_LIST.sub('%s, ...', sql)).strip()
+
+
+class QueryStats:
+    __slots__ = ('count', 'seconds', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def add(self, sql, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[fingerprint(sql)] += 1
+
+    @property
+    def milliseconds(self):
+        return self.seconds * 1000
+
+    def repeated(self, threshold=None):
+        """[(fingerprint, count)] for statements run at least threshold times."""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def problems(self, budget=None, max_repeats=None):
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(f'{self.count} queries, budget is {budget}')
+        for sql, count in self.repeated(max_repeats + 1 if max_repeats is not None else None):
+            problems.append(f'{count}x {sql[:200]}')
+        return problems
+
+
+def _record(execute, sql, params, many, context):
+    active = _active.get()
+    if not active:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for stats in active:
+            stats.add(sql, elapsed)
+
+
+def instrument(connection, **kwargs):
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+connection_created.connect(instrument)
+
+
+def collect():
+    """Starts recording into a new QueryStats; returns (stats, token for stop())."""
+    for connection in connections.all(initialized_only=True):
+        instrument(connection)
+    stats = QueryStats()
+    return stats, _active.set(_active.get() + (stats,))
+
+
+def stop(token):
+    _active.reset(token)
+
+
+class query_budget(ContextDecorator):
+    """
+    Fails with QueryBudgetExceeded when the block (or decorated function)
+    runs more than max_queries statements, or repeats one statement more
+    than max_repeats times (default: QUERY_REPEAT_THRESHOLD - 1):
+
+        with query_budget(6):
+            client.get('/api/posts/feed/')
+    """
+
+    def __init__(self, max_queries=None, max_repeats=None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    def __enter__(self):
+        self.stats, self._token = collect()
+        return self.stats
+
+    def __exit__(self, exc_type, exc, traceback):
+        stop(self._token)
+        if exc_type is None:
+            problems = self.stats.problems(self.max_queries, self.max_repeats)
+            if problems:
+                raise QueryBudgetExceeded('; '.join(problems))
+        return False
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None and match.view_name else request.path
+
+
+class QueryBudgetMiddleware:
+    """
+    Records the SQL of each request. Views declare their budget with a
+    query_budget class attribute (a number, or a dict per HTTP method).
+    Going over it, or repeating one statement QUERY_REPEAT_THRESHOLD
+    times, logs a warning, or raises QueryBudgetExceeded when
+    QUERY_BUDGET_STRICT is on. Works in both WSGI and ASGI stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        request._query_budget = None
+        started = time.perf_counter()
+        stats, token = collect()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop(token)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        request._query_budget = None
+        started = time.perf_counter()
+        stats, token = collect()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop(token)
+        return self.finish(request, response, stats, started)
+
+    def finish(self, request, response, stats, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        request._query_stats = stats
+        problems = stats.problems(request._query_budget)
+        self.log(request, response, stats, total_ms, problems)
+
+        if problems and settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(f'{view_name(request)}: ' + '; '.join(problems))
+
+        if settings.QUERY_TIMING_HEADERS:
+            response['Server-Timing'] = (
+                f'db;dur={stats.milliseconds:.1f};desc="{stats.count} queries", '
+                f'app;dur={total_ms:.1f}'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        # Async views (utils.async_views) inherit their sync view's budget.
+        budget = getattr(view_class, 'query_budget', None) or getattr(getattr(view_class, 'sync_view', None), 'query_budget', None)
+        if isinstance(budget, dict):
+            budget = budget.get(request.method)
+        request._query_budget = budget
+        return None
+
+    def log(self, request, response, stats, total_ms, problems):
+        level = logging.WARNING if problems else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            'view': view_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.count,
+            'budget': request._query_budget,
+            'db_ms': round(stats.milliseconds, 2),
+            'total_ms': round(total_ms, 2),
+            'repeated': [{'sql': sql[:200], 'count': count} for sql, count in stats.repeated()],
+        }
+        summary = f"{record['view']}: {stats.count} queries, {record['db_ms']}ms in SQL, {record['total_ms']}ms total"
+        if problems:
+            summary += ' (' + '; '.join(problems) + ')'
+        logger.log(level, summary, extra={'query_stats': record})
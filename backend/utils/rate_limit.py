@@ -0,0 +1,204 @@
+import math
+import re
+import time
+from functools import lru_cache
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .metrics import Counter
+
+# Rate limiting for views that declare rate_limit = 'scope' (or a tuple of
+# scopes), configured in settings.RATE_LIMITS. It runs in process_view,
+# after URL resolution but before DRF authenticates the user or parses
+# the body, so a rejected request costs one cache round trip.
+#
+# Each bucket is a token bucket kept as a GCRA "theoretical arrival time"
+# (TAT) in microseconds: every request moves the TAT one emission
+# interval (period / count) forward, and is allowed while the TAT stays
+# within `burst` intervals of now. The TAT changes only through
+# cache.incr()/decr(), which are atomic on LocMem, Redis and Memcached,
+# so concurrent requests never lose an update. Backends that emulate incr
+# with get and set (file, database) would lose updates under contention,
+# so the middleware refuses to start with them.
+# An idle bucket's TAT falls behind now and is moved up to now on its
+# next request.
+
+RATE = re.compile(r'^(\d+)/(\d*)([a-z]+)$')
+PERIODS = {
+    's': 1, 'sec': 1, 'second': 1,
+    'm': 60, 'min': 60, 'minute': 60,
+    'h': 3600, 'hour': 3600,
+    'd': 86400, 'day': 86400,
+}
+# Buckets expire this long after their last reset. A bucket still busy
+# then starts again full, which allows at most one extra burst per day.
+BUCKET_TTL = 86400
+
+# Backends whose incr() is a single atomic operation.
+ATOMIC_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django_redis.cache.RedisCache',
+)
+
+rate_limited = Counter('rate_limited_total', 'Requests rejected by rate limiting', ('scope',))
+
+
+@lru_cache(maxsize=256)
+def parse_rate(rate):
+    """'10/minute', '5/15m' -> (count, period in seconds)."""
+    match = RATE.match(rate.replace(' ', '').lower())
+    if match is None or match.group(3) not in PERIODS or int(match.group(1)) < 1:
+        raise ValueError(f'Invalid rate {rate!r}; expected e.g. "10/minute" or "5/15m"')
+    return int(match.group(1)), int(match.group(2) or 1) * PERIODS[match.group(3)]
+
+
+def check_backend(alias):
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in ATOMIC_BACKENDS:
+        raise ImproperlyConfigured(
+            f'Rate limiting needs a cache with an atomic incr(), but the {alias!r} cache is {backend}; '
+            f'set RATE_LIMIT_CACHE_ALIAS to a LocMem, Redis or Memcached cache'
+        )
+
+
+def take(cache, key, count, period, burst, now=None):
+    """
+    Spends one token from the bucket at key. Returns 0 when the request
+    is allowed, else the seconds until it would be.
+    """
+    interval = int(period * 1_000_000 / count)
+    tolerance = interval * burst
+    now = int(time.time() * 1_000_000) if now is None else now
+    timeout = max(BUCKET_TTL, math.ceil(tolerance / 1_000_000))
+
+    try:
+        tat = cache.incr(key, interval)
+    except ValueError:
+        # No bucket yet: it starts full. add() only fails if another
+        # request created it first, in which case spend from that one.
+        if cache.add(key, now + interval, timeout):
+            return 0
+        try:
+            tat = cache.incr(key, interval)
+        except ValueError:
+            return 0
+
+    if tat < now + interval:
+        # Idle long enough to be full again. Concurrent resets only
+        # happen on a full bucket, so they can only undercount.
+        cache.set(key, now + interval, timeout)
+        return 0
+    if tat - now > tolerance:
+        # Rejected requests do not spend a token.
+        cache.decr(key, interval)
+        return (tat - tolerance - now) / 1_000_000
+    return 0
+
+
+def client_ip(request):
+    # Each trusted proxy appends the address it received the request
+    # from, so the client is RATE_LIMIT_PROXY_COUNT entries from the end.
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    if proxies:
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+@lru_cache(maxsize=4096)
+def token_claims(raw_token):
+    # Verifying the signature is most of the cost of a per-user limit, and
+    # a client sends the same token until it expires, so the outcome is
+    # memoized per token; expiry is still checked on every request.
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return None
+    return token.get(jwt_settings.USER_ID_CLAIM), token.get('exp')
+
+
+def token_user_id(request):
+    """User id from a valid bearer token, without touching the database."""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not header.startswith('Bearer '):
+        return None
+    claims = token_claims(header[len('Bearer '):])
+    if claims is None or (claims[1] is not None and claims[1] <= time.time()):
+        return None
+    return claims[0]
+
+
+def bucket_key(request, scope, key_type):
+    if key_type == 'user':
+        user_id = token_user_id(request)
+        if user_id is not None:
+            return f'ratelimit:{scope}:user:{user_id}'
+    return f'ratelimit:{scope}:ip:{client_ip(request)}'
+
+
+def check(request, scopes):
+    """Largest wait in seconds over the request's buckets in scopes; 0 when allowed."""
+    cache = caches[settings.RATE_LIMIT_CACHE_ALIAS]
+    wait = 0
+    for scope in scopes:
+        config = settings.RATE_LIMITS[scope]
+        count, period = parse_rate(config['rate'])
+        scope_wait = take(cache, bucket_key(request, scope, config.get('key', 'ip')), count, period, config.get('burst', count))
+        if scope_wait:
+            rate_limited.inc(scope=scope)
+            wait = max(wait, scope_wait)
+    return wait
+
+
+def view_scopes(view_func):
+    view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+    scopes = getattr(view_class, 'rate_limit', None) or getattr(getattr(view_class, 'sync_view', None), 'rate_limit', None)
+    if not scopes:
+        return ()
+    return (scopes,) if isinstance(scopes, str) else tuple(scopes)
+
+
+def throttled(wait):
+    response = JsonResponse(
+        {'detail': f'Request was throttled. Expected available in {math.ceil(wait)} seconds.'},
+        status=429
+    )
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+class RateLimitMiddleware:
+    """Answers 429 with Retry-After for requests over a view's rate_limit scopes."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        if settings.RATE_LIMIT_ENABLED:
+            check_backend(settings.RATE_LIMIT_CACHE_ALIAS)
+
+    def __call__(self, request):
+        # Under ASGI this returns the coroutine for the handler to await.
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # CORS preflights never spend tokens.
+        if not settings.RATE_LIMIT_ENABLED or request.method == 'OPTIONS':
+            return None
+        scopes = view_scopes(view_func)
+        if not scopes:
+            return None
+        wait = check(request, scopes)
+        return throttled(wait) if wait else None
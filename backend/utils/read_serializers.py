@@ -0,0 +1,31 @@
+from django.utils import timezone
+
+# Helpers for the compiled read-path serializers: they turn .values() rows
+# into the exact primitives DRF's fields would produce, without
+# instantiating models or field objects.
+
+
+def datetime_formatter():
+    # Mirrors rest_framework.fields.DateTimeField.to_representation with the
+    # default ISO 8601 output format.
+    current_timezone = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if value is None:
+            return None
+        if timezone.is_aware(value):
+            value = value.astimezone(current_timezone)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return format_datetime
+
+
+def format_uuid(value):
+    return str(value) if value is not None else None
+
+
+def prefixed(prefix, fields):
+    return [prefix + field for field in fields]
@@ -0,0 +1,138 @@
+import secrets
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+DUMPS_OPTIONS = orjson.OPT_UTC_Z
+
+# orjson leaves U+2028/U+2029 unescaped; DRF escapes them so responses stay
+# a strict JavaScript subset.
+LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+_drf_encoder = JSONEncoder()
+
+
+class Fragment:
+    """
+    Pre-encoded JSON bytes that are written into a response verbatim.
+
+    Falls back to the decoded value (through tolist) when rendered by the
+    stock JSON encoder, so a Fragment is safe to return from any serializer.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __repr__(self):
+        return f'Fragment({self.data!r})'
+
+    def __eq__(self, other):
+        return isinstance(other, Fragment) and other.data == self.data
+
+    def __getstate__(self):
+        return self.data
+
+    def __setstate__(self, state):
+        self.data = state
+
+    def tolist(self):
+        return orjson.loads(self.data)
+
+
+def default(obj):
+    # Types orjson does not handle natively (lazy strings, Decimal, QuerySet,
+    # timedelta, ...) are converted exactly as DRF's JSONEncoder does.
+    return _drf_encoder.default(obj)
+
+
+def dumps(data, default=default, option=DUMPS_OPTIONS):
+    try:
+        return orjson.dumps(data, default=default, option=option)
+    except orjson.JSONEncodeError:
+        # Non-string dict keys are rare and allowing them makes every dump
+        # slower, so only retry with them enabled when they actually occur.
+        return orjson.dumps(data, default=default, option=option | orjson.OPT_NON_STR_KEYS)
+
+
+class _FragmentSplicer:
+    # orjson releases before 3.10 have no Fragment type, so fragments are
+    # rendered as a placeholder string and swapped for their bytes after
+    # encoding. orjson writes values in order, so the n-th placeholder is
+    # the n-th fragment. The per-render token keeps user content from ever
+    # matching a placeholder.
+
+    def __init__(self):
+        self.token = secrets.token_hex(8)
+        self.placeholder = f'\x00{self.token}\x00'
+        self.fragments = []
+
+    def default(self, obj):
+        if isinstance(obj, Fragment):
+            self.fragments.append(obj.data)
+            return self.placeholder
+        return default(obj)
+
+    def splice(self, rendered):
+        if not self.fragments:
+            return rendered
+        parts = rendered.split(b'"\\u0000' + self.token.encode() + b'\\u0000"')
+        # If the dump was retried, default ran again for every fragment;
+        # only the last len(parts) - 1 belong to this output.
+        fragments = self.fragments[len(self.fragments) - (len(parts) - 1):]
+        spliced = [parts[0]]
+        for fragment, part in zip(fragments, parts[1:]):
+            spliced.append(fragment)
+            spliced.append(part)
+        return b''.join(spliced)
+
+
+def _native_fragment_default(obj):
+    if isinstance(obj, Fragment):
+        return orjson.Fragment(obj.data)
+    return default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Drop-in replacement for rest_framework.renderers.JSONRenderer backed by
+    orjson. Output matches the stock renderer's compact UTF-8 form, and
+    Fragment values are spliced in without being re-encoded.
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        option = DUMPS_OPTIONS
+        if accepted_media_type and 'indent=' in accepted_media_type:
+            option |= orjson.OPT_INDENT_2
+
+        if hasattr(orjson, 'Fragment'):
+            rendered = dumps(data, default=_native_fragment_default, option=option)
+        else:
+            splicer = _FragmentSplicer()
+            rendered = splicer.splice(dumps(data, default=splicer.default, option=option))
+
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in rendered:
+                rendered = rendered.replace(separator, escaped)
+        return rendered
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
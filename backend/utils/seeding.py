@@ -0,0 +1,102 @@
+import csv
+import io
+from itertools import chain, islice
+from django.db import connection, models
+from .bulk import chunked
+
+# Fast row loading for synthetic data. Rows are plain dicts keyed by field
+# attname and are written straight to the table: COPY on PostgreSQL,
+# chunked multi-row INSERTs elsewhere. Model.save(), bulk_create() and
+# signals are skipped on purpose -- bulk_create would overwrite the
+# generated auto_now_add timestamps, and the signals would create
+# notifications and recount posts for every row.
+
+NULL = r'\N'
+
+
+def power_law(rng, size, exponent, mean=None):
+    """
+    Pareto-distributed weights >= 1 (heavier tail for a smaller
+    exponent), optionally rescaled so they average to mean.
+    """
+    weights = rng.pareto(exponent, size) + 1.0
+    if mean is not None:
+        weights *= mean / weights.mean()
+    return weights
+
+
+def normalized(weights):
+    return weights / weights.sum()
+
+
+def write_rows(model, rows, chunk_size=5000):
+    """
+    Inserts rows into model's table and returns how many were written.
+    Fields missing from the first row take their default.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+
+    # Auto-incrementing keys are left to the database unless given.
+    fields = [
+        field for field in model._meta.concrete_fields
+        if field.attname in first or not isinstance(field, models.AutoField)
+    ]
+    defaults = {field.attname: field.get_default() for field in fields if field.attname not in first}
+    write = _copy_chunk if connection.vendor == 'postgresql' else _insert_chunk
+
+    written = 0
+    rows = chain([first], rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return written
+        values = [
+            [field.get_db_prep_save(row.get(field.attname, defaults.get(field.attname)), connection) for field in fields]
+            for row in chunk
+        ]
+        write(model._meta.db_table, [field.column for field in fields], values)
+        written += len(values)
+
+
+def _copy_chunk(table, columns, values):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in values:
+        writer.writerow([NULL if value is None else value for value in row])
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    sql = f"COPY {quote(table)} ({', '.join(quote(column) for column in columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')"
+    with connection.cursor() as cursor:
+        if hasattr(cursor, 'copy_expert'):
+            cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _insert_chunk(table, columns, values):
+    quote = connection.ops.quote_name
+    # Stay under the backend's bound-parameter limit (999 on old SQLite).
+    per_statement = max(1, (connection.features.max_query_params or 10000) // len(columns))
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+    with connection.cursor() as cursor:
+        for batch in chunked(values, per_statement):
+            cursor.execute(
+                f"INSERT INTO {quote(table)} ({', '.join(quote(column) for column in columns)}) "
+                f"VALUES {', '.join([placeholders] * len(batch))}",
+                [value for row in batch for value in row]
+            )
+
+
+def analyze(models):
+    """Refreshes planner statistics after a large load (PostgreSQL only)."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
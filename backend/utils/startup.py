@@ -0,0 +1,37 @@
+import gc
+import importlib
+import logging
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+# Process startup. Heavy optional dependencies (settings.DEFERRED_IMPORTS)
+# are imported where they are used, so manage.py commands and a worker's
+# import of the app stay cheap; check_import_time enforces this.
+#
+# Under gunicorn --preload the master calls warm_up() once before forking:
+# it imports everything a worker would import on its first requests,
+# including the deferred modules, then freezes the garbage collector so
+# those objects are shared copy-on-write with every worker instead of
+# being copied when a worker's collector walks them.
+
+
+def warm_up():
+    # Imports every view module, which Django otherwise does on the first
+    # request each worker serves.
+    get_resolver().url_patterns
+
+    for module in settings.DEFERRED_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"Could not preload {module}: {e}")
+
+    # Connections opened while loading must not be shared with workers.
+    connections.close_all()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded app; {gc.get_freeze_count()} objects frozen")
@@ -0,0 +1,81 @@
+from uuid import UUID
+from django.apps import apps
+
+
+class StatusLoader:
+    """
+    Batches and memoises the viewer's like and follow lookups.
+
+    Every id asked about is answered with at most one IN query per batch,
+    and ids already answered are never queried again, so serializers,
+    compiled serializers and batch endpoints sharing a loader within a
+    request never repeat a lookup.
+    """
+
+    def __init__(self, viewer):
+        self.viewer = viewer
+        self._liked = {}
+        self._following = {}
+
+    @property
+    def is_authenticated(self):
+        return self.viewer is not None and self.viewer.is_authenticated
+
+    def _load(self, known, ids, fetch):
+        ids = {UUID(str(object_id)) for object_id in ids}
+        missing = [object_id for object_id in ids if object_id not in known]
+        if missing:
+            found = set(fetch(missing)) if self.is_authenticated else set()
+            for object_id in missing:
+                known[object_id] = object_id in found
+        return {object_id for object_id in ids if known[object_id]}
+
+    def liked(self, post_ids):
+        """Ids among post_ids that the viewer currently likes."""
+        Like = apps.get_model('posts', 'Like')
+        return self._load(self._liked, post_ids, lambda missing: Like.objects.filter(
+            user=self.viewer, post_id__in=missing, is_active=True
+        ).values_list('post_id', flat=True))
+
+    def following(self, user_ids):
+        """Ids among user_ids that the viewer follows."""
+        Follow = apps.get_model('users', 'Follow')
+        return self._load(self._following, user_ids, lambda missing: Follow.objects.filter(
+            follower=self.viewer, following_id__in=missing, is_active=True
+        ).values_list('following_id', flat=True))
+
+    def is_liked(self, post_id):
+        return bool(self.liked([post_id]))
+
+    def is_following(self, user_id):
+        return bool(self.following([user_id]))
+
+
+def status_loader(request):
+    """The StatusLoader shared by everything handling this request."""
+    request = getattr(request, '_request', request)
+    loader = getattr(request, '_status_loader', None)
+    if loader is None or loader.viewer is not getattr(request, 'user', None):
+        loader = StatusLoader(getattr(request, 'user', None))
+        request._status_loader = loader
+    return loader
+
+
+def parse_ids(request, max_ids):
+    """UUIDs from ?ids=a,b,c (or repeated ids=), deduplicated in order."""
+    ids = []
+    for value in ','.join(request.query_params.getlist('ids')).split(','):
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            ids.append(UUID(value))
+        except ValueError:
+            raise ValueError(f'Invalid id: {value}')
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError('Provide at least one id in the ids query parameter.')
+    if len(ids) > max_ids:
+        raise ValueError(f'At most {max_ids} ids can be requested at once.')
+    return ids
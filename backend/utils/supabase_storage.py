@@ -1,10 +1,17 @@
+import logging
 import os
+import threading
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
-from supabase import create_client, Client
 from decouple import config
 import uuid
-from typing import Tuple
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The supabase SDK (httpx, realtime, postgrest, ...) takes longer to import
+# than the rest of the app, so it is imported on first use rather than by
+# every worker and manage.py command that imports this module.
 
 class SupabaseStorage:
     
@@ -16,12 +23,13 @@ class SupabaseStorage:
             raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in environment variables")
         
         try:
-            self.client: Client = create_client(self.supabase_url, self.supabase_key)
+            from supabase import create_client
+            self.client = create_client(self.supabase_url, self.supabase_key)
             self.bucket_name = 'socialconnect'
             
             self.ensure_bucket_exists()
         except Exception as e:
-            print(f"Failed to initialize Supabase client: {str(e)}")
+            logger.error(f"Failed to initialize Supabase client: {str(e)}")
             raise ValueError(f"Failed to initialize Supabase client: {str(e)}")
     
     def ensure_bucket_exists(self):
@@ -35,7 +43,7 @@ class SupabaseStorage:
                     options={"public": True}
                 )
         except Exception as e:
-            print(f"Warning: Could not ensure bucket exists: {str(e)}")
+            logger.warning(f"Could not ensure bucket exists: {str(e)}")
     
     def upload_image(self, image_file: UploadedFile, folder: str = 'posts') -> Tuple[str, str]:
         try:
@@ -65,7 +73,7 @@ class SupabaseStorage:
                 raise Exception("Failed to upload image to Supabase")
                 
         except Exception as e:
-            print(f"Upload failed with error: {str(e)}")
+            logger.error(f"Upload failed with error: {str(e)}")
             raise Exception(f"Image upload failed: {str(e)}")
     
     def delete_image(self, file_path: str) -> bool:
@@ -73,11 +81,38 @@ class SupabaseStorage:
             response = self.client.storage.from_(self.bucket_name).remove([file_path])
             return bool(response)
         except Exception as e:
-            print(f"Failed to delete image {file_path}: {str(e)}")
+            logger.error(f"Failed to delete image {file_path}: {str(e)}")
             return False
     
+    def delete_images(self, file_paths: List[str]) -> int:
+        # One request for the whole batch; errors propagate so queued
+        # deletions can be retried.
+        response = self.client.storage.from_(self.bucket_name).remove(list(file_paths))
+        return len(response or [])
+    
     def get_image_url(self, file_path: str) -> str:
         return self.client.storage.from_(self.bucket_name).get_public_url(file_path)
 
+_storage = None
+_storage_lock = threading.Lock()
+
+
 def get_supabase_storage() -> SupabaseStorage:
-    return SupabaseStorage()
+    # One client per process: creating it checks the bucket over the
+    # network, which used to happen on every upload.
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = SupabaseStorage()
+    return _storage
+
+
+def _reset_after_fork():
+    # The client's connection pool must not be shared with the parent.
+    global _storage, _storage_lock
+    _storage, _storage_lock = None, threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
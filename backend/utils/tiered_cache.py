@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from .metrics import Counter
+from .versions import get_versions, bump, version_key
+
+# Two-tier cache: a bounded per-process LRU in front of a shared Django
+# cache alias. Reads that hit the LRU cost neither a network hop nor an
+# unpickle; misses fall through to the shared tier and fill the LRU.
+#
+# Local entries cannot be reached by other workers' writes, so they stay
+# coherent in one of two ways. Keys that embed a version (as ObjectCache
+# keys do) are never overwritten: a bump makes every worker look up a new
+# key. Anything else is covered by delete_many()/clear(), which bump a
+# per-cache generation counter in the shared cache; every worker compares
+# it at most every TIERED_CACHE_SYNC_INTERVAL seconds and drops its local
+# tier when it changed. TIERED_CACHE_LOCAL_TTL bounds both.
+
+cache_lookups = Counter('cache_lookups_total', 'Two-tier cache lookups per key', ('cache', 'tier', 'result'))
+
+
+class LocalCache:
+    """Thread-safe LRU with a per-entry expiry and hit/miss statistics."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[key] = entry[0]
+        return found
+
+    def set_many(self, mapping, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        expiry = time.monotonic() + ttl
+        with self._lock:
+            for key, value in mapping.items():
+                self._entries[key] = (value, expiry)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class TieredCache:
+    """
+    get_many/set_many/delete_many with the semantics of a Django cache,
+    answered from a LocalCache first and the `alias` cache second.
+    """
+
+    def __init__(self, name, alias='default', max_entries=None, local_ttl=None):
+        self.name = name
+        self.alias = alias
+        self.local = LocalCache(
+            settings.TIERED_CACHE_MAX_ENTRIES if max_entries is None else max_entries,
+            settings.TIERED_CACHE_LOCAL_TTL if local_ttl is None else local_ttl
+        )
+        self._generation = None
+        self._synced_at = 0.0
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        self.sync()
+        found = self.local.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        cache_lookups.inc(len(found), cache=self.name, tier='local', result='hit')
+        if missing:
+            shared = self.shared.get_many(missing)
+            cache_lookups.inc(len(shared), cache=self.name, tier='shared', result='hit')
+            cache_lookups.inc(len(missing) - len(shared), cache=self.name, tier='shared', result='miss')
+            self.local.set_many(shared)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+
+    def set_many(self, mapping, timeout=None):
+        self.shared.set_many(mapping, timeout)
+        self.local.set_many(mapping, timeout)
+
+    def delete_many(self, keys):
+        self.shared.delete_many(keys)
+        self.local.delete_many(keys)
+        self.broadcast()
+
+    def clear(self):
+        # Only this cache's local tiers; shared entries are left to expire.
+        self.local.clear()
+        self.broadcast()
+
+    def broadcast(self):
+        bump('tier', self.name)
+        self._generation = get_versions([self.generation_key])[self.generation_key]
+
+    @property
+    def generation_key(self):
+        return version_key('tier', self.name)
+
+    def sync(self):
+        now = time.monotonic()
+        if now - self._synced_at < settings.TIERED_CACHE_SYNC_INTERVAL:
+            return
+        self._synced_at = now
+        generation = get_versions([self.generation_key])[self.generation_key]
+        if self._generation is not None and generation != self._generation:
+            self.local.clear()
+        self._generation = generation
+
+    def stats(self):
+        return {'name': self.name, 'alias': self.alias, **self.local.stats()}
@@ -0,0 +1,88 @@
+from collections import namedtuple
+from django.db import connection
+
+# Single-statement toggles for "is_active" relationship rows (likes,
+# follows). Both PostgreSQL and SQLite >= 3.35 support the
+# INSERT ... ON CONFLICT DO UPDATE ... RETURNING form used here, so the
+# database settles concurrent requests instead of unique_together errors.
+
+ToggleResult = namedtuple('ToggleResult', ['changed', 'created'])
+
+
+def _column(model, name):
+    return connection.ops.quote_name(model._meta.get_field(name).column)
+
+
+def _prep(model, name, value):
+    return model._meta.get_field(name).get_db_prep_value(value, connection)
+
+
+def set_active(model, active, **lookup):
+    """
+    Sets is_active on the row matching lookup (its unique_together fields,
+    given as field name=pk), inserting the row when activating one that
+    does not exist yet. One round trip.
+
+    Returns ToggleResult(changed, created): changed is False when the row
+    was already in the requested state. Raises IntegrityError when a
+    related row does not exist.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    is_active = _column(model, 'is_active')
+    pk_field = model._meta.pk
+
+    if not active:
+        conditions = ' AND '.join(f'{_column(model, name)} = %s' for name in lookup)
+        sql = (
+            f'UPDATE {table} SET {is_active} = %s '
+            f'WHERE {conditions} AND {is_active} = %s '
+            f'RETURNING {connection.ops.quote_name(pk_field.column)}'
+        )
+        params = [False] + [_prep(model, name, value) for name, value in lookup.items()] + [True]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return ToggleResult(changed=cursor.fetchone() is not None, created=False)
+
+    instance = model(is_active=True, **{model._meta.get_field(name).attname: value for name, value in lookup.items()})
+    fields = model._meta.concrete_fields
+    values = [field.get_db_prep_save(field.pre_save(instance, True), connection) for field in fields]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    conflict = ', '.join(_column(model, name) for name in lookup)
+
+    sql = (
+        f'INSERT INTO {table} ({columns}) VALUES ({placeholders}) '
+        f'ON CONFLICT ({conflict}) DO UPDATE SET {is_active} = EXCLUDED.{is_active} '
+        f'WHERE {table}.{is_active} <> EXCLUDED.{is_active} '
+        f'RETURNING {connection.ops.quote_name(pk_field.column)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, values)
+        row = cursor.fetchone()
+
+    if row is None:
+        return ToggleResult(changed=False, created=False)
+    return ToggleResult(changed=True, created=pk_field.to_python(row[0]) == instance.pk)
+
+
+def increment(model, pk, field_name, delta, returning=()):
+    """
+    Adds delta to a counter column (clamped at zero) in one statement and
+    returns {field_name: new value, **returning fields}, or None when no
+    row has that primary key.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = _column(model, field_name)
+    fields = [model._meta.get_field(field_name)] + [model._meta.get_field(name) for name in returning]
+    sql = (
+        f'UPDATE {table} SET {column} = CASE WHEN {column} + %s < 0 THEN 0 ELSE {column} + %s END '
+        f'WHERE {connection.ops.quote_name(model._meta.pk.column)} = %s '
+        f"RETURNING {', '.join(connection.ops.quote_name(field.column) for field in fields)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [delta, delta, model._meta.pk.get_db_prep_value(pk, connection)])
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+    return {field.attname: field.to_python(value) for field, value in zip(fields, row)}
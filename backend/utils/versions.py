@@ -0,0 +1,55 @@
+import time
+from collections import defaultdict
+from django.core.cache import cache
+
+# Versions are wall-clock microseconds of the last change, so they keep
+# increasing across evictions and restarts. A missing key (never bumped, or
+# evicted) is initialised to "now", which can only make clients refetch.
+
+
+# Versions derived from others, registered with add_dependent(): bumping
+# `namespace` for some ids also bumps the keys returned for those ids.
+_dependents = defaultdict(list)
+
+
+def version_key(namespace, object_id):
+    return f'version:{namespace}:{object_id}'
+
+
+def _now_version():
+    return time.time_ns() // 1000
+
+
+def get_versions(keys):
+    keys = list(dict.fromkeys(keys))
+    versions = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        fresh = _now_version()
+        for key in missing:
+            cache.add(key, fresh, None)
+        versions.update(cache.get_many(missing))
+        for key in missing:
+            versions.setdefault(key, fresh)
+
+    return versions
+
+
+def bump_versions(*keys):
+    if keys:
+        version = _now_version()
+        cache.set_many({key: version for key in keys}, None)
+
+
+def add_dependent(namespace, dependent_keys):
+    """Makes bumps of namespace also bump dependent_keys(object_ids)."""
+    _dependents[namespace].append(dependent_keys)
+
+
+def bump(namespace, *object_ids):
+    keys = [version_key(namespace, object_id) for object_id in object_ids]
+    if object_ids:
+        for dependent_keys in _dependents.get(namespace, ()):
+            keys.extend(dependent_keys(object_ids))
+    bump_versions(*keys)
@@ -88,6 +88,7 @@ export const endpoints = {
     follow: (id: string) => `/users/${id}/follow/`,
     unfollow: (id: string) => `/users/${id}/unfollow/`,
     followStatus: (id: string) => `/users/${id}/follow-status/`,
+    followStatuses: (ids: string[]) => `/users/follow-status/?ids=${ids.join(',')}`,
     followers: (id: string) => `/users/${id}/followers/`,
     following: (id: string) => `/users/${id}/following/`,
     avatarUpload: '/users/avatar-upload/',
@@ -99,6 +100,7 @@ export const endpoints = {
     detail: (id: string) => `/posts/${id}/`,
     like: (id: string) => `/posts/${id}/like/`,
     likeStatus: (id: string) => `/posts/${id}/like-status/`,
+    likeStatuses: (ids: string[]) => `/posts/like-status/?ids=${ids.join(',')}`,
     comments: (id: string) => `/posts/${id}/comments/`,
     createComment: (id: string) => `/posts/${id}/comments/create/`,
     deleteComment: (id: string) => `/posts/comments/${id}/`,